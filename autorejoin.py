@@ -6,36 +6,73 @@ Automatically rejoins Roblox game when disconnected or crashed
 
 import os
 import sys
+import argparse
+import asyncio
 import json
 import signal
-from modules import ColoredLogger, RobloxMonitor
+from modules import ColoredLogger, ConfigLoader, Fleet, RobloxMonitor, tracing
 
 
-def load_config(config_path: str = "config.json") -> dict:
+def load_config(loader: ConfigLoader) -> dict:
     """
-    Load configuration from JSON file
+    Load configuration from JSON file (profile and overrides applied)
     
     Args:
-        config_path: Path to config file
+        loader: Config file, profile and overrides
         
     Returns:
         Configuration dictionary
     """
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        return loader.load()
     except FileNotFoundError:
-        print(f"❌ Config file not found: {config_path}")
+        print(f"❌ Config file not found: {loader.path}")
         sys.exit(1)
     except json.JSONDecodeError as e:
         print(f"❌ Invalid JSON in config file: {e}")
         sys.exit(1)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+def can_prompt(args: argparse.Namespace) -> bool:
+    """
+    Check if the game may be asked for interactively
+    
+    Args:
+        args: Parsed options
+        
+    Returns:
+        False for --no-prompt, AUTOREJOIN_NO_PROMPT=1 or when stdin is not a
+        terminal (run.sh under a supervisor, nohup, ...)
+    """
+    if args.no_prompt or os.environ.get('AUTOREJOIN_NO_PROMPT', '') not in ('', '0'):
+        return False
+    return sys.stdin is not None and sys.stdin.isatty()
+
+
+def devices_have_games(config: dict) -> bool:
+    """
+    Check if every fleet device names its own game
+    
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        True if 'devices' is set and each entry has game_id, vip_server_link or instances
+    """
+    devices = config.get('devices') or []
+    
+    return bool(devices) and all(
+        isinstance(entry, dict) and (entry.get('game_id') or entry.get('vip_server_link') or entry.get('instances'))
+        for entry in devices
+    )
 
 
 def prompt_game_info() -> dict:
     """
-    Prompt user for game information every time the tool runs
+    Prompt user for game information when none is configured
     
     Returns:
         Game configuration dictionary
@@ -86,6 +123,38 @@ def prompt_game_info() -> dict:
     return game_config
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command line options
+    
+    Args:
+        argv: Arguments (default: sys.argv)
+        
+    Returns:
+        Parsed options
+    """
+    parser = argparse.ArgumentParser(
+        description="Roblox AutoRejoin Tool",
+        epilog="Environment: AUTOREJOIN_CONFIG, AUTOREJOIN_PROFILE, AUTOREJOIN_GAME_ID, "
+               "AUTOREJOIN_VIP_LINK, AUTOREJOIN_SERVERS, AUTOREJOIN_LOG_LEVEL, AUTOREJOIN_NO_PROMPT"
+    )
+    parser.add_argument("--config", default=os.environ.get('AUTOREJOIN_CONFIG', 'config.json'),
+                        help="config file (default: config.json)")
+    parser.add_argument("--use", metavar="PROFILE",
+                        help="apply a named entry of the config's 'profiles'")
+    parser.add_argument("--game-id", help="place ID to join (skips the game prompt)")
+    parser.add_argument("--vip-link", help="VIP server link to join (skips the game prompt)")
+    parser.add_argument("--no-prompt", action="store_true",
+                        help="never ask for the game; exit if none is configured")
+    parser.add_argument("--daemon", action="store_true",
+                        help="run unattended: no prompt, ignore SIGHUP, always serve the control socket "
+                             "(use autorejoinctl.py for status and commands)")
+    parser.add_argument("--profile", nargs="?", const="", metavar="TRACE_PATH",
+                        help="trace every shell command, detector check and rejoin phase; "
+                             "writes Chrome trace JSON + latency summary on exit (default: trace_path)")
+    return parser.parse_args(argv)
+
+
 def print_banner():
     """Print welcome banner"""
     banner = """
@@ -101,36 +170,135 @@ def print_banner():
     print(banner)
 
 
+def run_fleet(config: dict, logger: ColoredLogger, loader: ConfigLoader):
+    """
+    Monitor every phone in 'devices' over adb from this host
+    
+    Args:
+        config: Configuration dictionary
+        logger: Fleet-wide logger
+        loader: Config file, profile and overrides
+    """
+    try:
+        fleet = Fleet(config, logger, loader)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    if not fleet.build():
+        logger.critical("No device could be set up (check `adb devices`)")
+        sys.exit(1)
+    
+    # Devices finish their current step and clean up on their own threads
+    def signal_handler(sig, frame):
+        logger.warning("\n⚠️  Received shutdown signal")
+        fleet.stop()
+    
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    
+    try:
+        if config.get('async_mode'):
+            asyncio.run(fleet.run_async())
+        else:
+            fleet.run()
+    except Exception as e:
+        logger.critical(f"Fatal error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
 def main():
     """Main entry point"""
+    args = parse_args()
+    
+    if args.daemon:
+        args.no_prompt = True
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    
     # Print banner
     print_banner()
     
+    # Command line wins over environment, environment over profile, profile over config.json
+    overrides = {}
+    if args.game_id:
+        overrides['game_id'] = args.game_id
+    if args.vip_link:
+        overrides['vip_server_link'] = args.vip_link
+    
+    # Opt-in profiling: spans around commands, checks and rejoin phases
+    if args.profile is not None:
+        overrides['profile'] = True
+        if args.profile:
+            overrides['trace_path'] = args.profile
+    
     # Load general configuration
     print("📋 Loading configuration...")
-    config = load_config()
+    loader = ConfigLoader(args.config, args.use, overrides)
+    config = load_config(loader)
     
-    # Prompt for game information (every time)
-    game_config = prompt_game_info()
+    # Default socket only when none is configured; kept as an override so config reloads don't drop it
+    if args.daemon and not config.get('control_socket'):
+        loader.overrides['control_socket'] = config['control_socket'] = "logs/control.sock"
     
-    # Merge configs
-    config.update(game_config)
+    if config.get('active_profile'):
+        print(f"✓ Profile: {config['active_profile']}")
     
-    # Display configuration
-    if config.get('vip_server_link'):
-        print(f"✓ VIP Server: Đã cấu hình")
-    else:
-        print(f"✓ Game ID: {config.get('game_id', 'N/A')}")
+    if config.get('instances'):
+        # Multi-instance: every package has its game in config.json
+        for instance in config['instances']:
+            name = instance.get('name', instance.get('package', config['roblox_package']))
+            target = "VIP Server" if instance.get('vip_server_link') else f"Game ID {instance.get('game_id', 'N/A')}"
+            print(f"✓ {name}: {target}")
+    elif not devices_have_games(config):
+        if not (config.get('game_id') or config.get('vip_server_link')):
+            if not can_prompt(args):
+                print("❌ No game configured: set game_id/vip_server_link (config.json or a profile), "
+                      "--game-id/--vip-link or AUTOREJOIN_GAME_ID/AUTOREJOIN_VIP_LINK")
+                sys.exit(2)
+            
+            # Prompt for game information; kept as an override so config reloads don't drop it
+            game_config = prompt_game_info()
+            loader.overrides.update(game_config)
+            config.update(game_config)
+        
+        # Display configuration
+        if config.get('vip_server_link'):
+            print(f"✓ VIP Server: Đã cấu hình")
+        else:
+            print(f"✓ Game ID: {config.get('game_id', 'N/A')}")
+    
+    if config.get('devices'):
+        print(f"✓ Devices: {len(config['devices'])} (adb)")
     
     print(f"✓ Check Interval: {config['check_interval']}s")
     print(f"✓ Max Retries: {config['max_retries']}")
+    
+    if config.get('profile'):
+        tracing.enable()
+        print(f"✓ Profiling: {config.get('trace_path', 'logs/trace.json')}")
+    if config.get('config_reload'):
+        print(f"✓ Live reload: {loader.path}")
+    
+    if config.get('control_socket'):
+        print(f"✓ Control socket: {config['control_socket']}")
     print()
     
     # Initialize logger
-    logger = ColoredLogger("AutoRejoin")
+    logger = ColoredLogger(
+        "AutoRejoin",
+        level=config.get('log_level', 'INFO'),
+        max_bytes=config.get('log_max_bytes', 5 * 1024 * 1024)
+    )
+    
+    if config.get('devices'):
+        run_fleet(config, logger, loader)
+        return
     
     # Initialize monitor
-    monitor = RobloxMonitor(config, logger)
+    monitor = RobloxMonitor(config, logger, loader)
     
     # Setup signal handler for graceful shutdown
     def signal_handler(sig, frame):
@@ -143,7 +311,10 @@ def main():
     
     # Start monitoring
     try:
-        monitor.start_monitoring()
+        if config.get('async_mode'):
+            asyncio.run(monitor.start_monitoring_async())
+        else:
+            monitor.start_monitoring()
     except Exception as e:
         logger.critical(f"Fatal error: {e}")
         import traceback
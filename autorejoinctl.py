@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Roblox AutoRejoin Control
+Talks to a running autorejoin.py over its control socket (standard library only, starts fast)
+"""
+
+import os
+import sys
+import argparse
+import json
+import socket
+
+
+def send_command(path: str, command: str, args: dict, timeout: float = 15.0) -> dict:
+    """
+    Send one command and read the reply
+    
+    Args:
+        path: Control socket file
+        command: Command name
+        args: Command arguments
+        timeout: Seconds to wait for the reply
+        
+    Returns:
+        Reply {'ok': bool, 'result' | 'error'}
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps({'command': command, 'args': args}).encode('utf-8') + b"\n")
+        
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+    
+    return json.loads(b"".join(chunks))
+
+
+def print_status(status: dict):
+    """
+    Print a status reply as a short table
+    
+    Args:
+        status: Result of the status command
+    """
+    stats = status['stats']
+    profile = f", profile {status['profile']}" if status.get('profile') else ""
+    print(f"Uptime {status['uptime_seconds'] / 60:.0f}m, checks every {status['check_interval']}{profile}")
+    print(f"Rejoins: {stats['rejoin_attempts']} ({stats['rejoin_success']} ok, {stats['rejoin_failed']} failed)")
+    device = status.get('device')
+    if device and device['breaker'] != 'closed':
+        print(f"Device not responding: commands held for {device['held_seconds']:.0f}s")
+    print()
+    
+    for instance in status['instances']:
+        state = instance['state'] or 'unknown'
+        if instance['state_seconds'] is not None:
+            state += f" for {instance['state_seconds']:.0f}s"
+        
+        notes = []
+        if instance['paused']:
+            notes.append("paused")
+        if instance['rejoin']:
+            rejoin = instance['rejoin']
+            strategy = f" {rejoin['strategy']}" if rejoin.get('strategy') else ""
+            notes.append(f"rejoining{strategy} ({rejoin['state']})")
+        if instance['cooldown_seconds'] > 0:
+            notes.append(f"cooldown {instance['cooldown_seconds']:.0f}s")
+        if instance['consecutive_failures']:
+            notes.append(f"{instance['consecutive_failures']} failed")
+        if instance['next_check_seconds'] is not None and not instance['paused']:
+            notes.append(f"next check in {instance['next_check_seconds']:.0f}s")
+        
+        print(f"{instance['name']}: {state} - {instance['target']} [{instance['server']}]")
+        if notes:
+            print(f"    {', '.join(notes)}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command line options
+    
+    Args:
+        argv: Arguments (default: sys.argv)
+        
+    Returns:
+        Parsed options
+    """
+    parser = argparse.ArgumentParser(description="Control a running Roblox AutoRejoin")
+    parser.add_argument("--socket", default=os.environ.get('AUTOREJOIN_SOCKET', 'logs/control.sock'),
+                        help="control socket (default: logs/control.sock)")
+    parser.add_argument("--json", action="store_true", help="print the raw JSON reply")
+    parser.add_argument("command",
+                        choices=["status", "pause", "resume", "force-rejoin", "switch-target", "dump-stats"])
+    parser.add_argument("--instance", help="instance name (default: all; needed for switch-target "
+                                           "with several instances)")
+    parser.add_argument("--game-id", help="switch-target: place ID")
+    parser.add_argument("--vip-link", help="switch-target: VIP server link")
+    parser.add_argument("--servers", nargs="*", help="switch-target: backup servers (default: keep)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    
+    command_args = {}
+    if args.instance:
+        command_args['instance'] = args.instance
+    if args.game_id:
+        command_args['game_id'] = args.game_id
+    if args.vip_link:
+        command_args['vip_server_link'] = args.vip_link
+    if args.servers is not None:
+        command_args['servers'] = args.servers
+    
+    try:
+        reply = send_command(args.socket, args.command, command_args)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ AutoRejoin is not running (no control socket at {args.socket})")
+        sys.exit(2)
+    except (OSError, ValueError) as e:
+        print(f"❌ Control socket error: {e}")
+        sys.exit(1)
+    
+    if not reply.get('ok'):
+        print(f"❌ {reply.get('error')}")
+        sys.exit(1)
+    
+    result = reply['result']
+    if args.json or args.command != 'status':
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_status(result)
+
+
+if __name__ == "__main__":
+    main()
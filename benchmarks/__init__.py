@@ -0,0 +1 @@
+"""Benchmarks package (runs without a device, see benchmarks/run.py)"""
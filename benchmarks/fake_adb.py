@@ -0,0 +1,136 @@
+"""
+Fake ADB Module
+Canned device output with configurable latency, as an ADBHelper (no device needed)
+"""
+
+import struct
+import time
+from typing import Dict, Iterator, List, Optional
+from modules.adb_helper import ADBHelper
+
+
+# Texts the default in-game screen shows (match RobloxDetector.INGAME_KEYWORDS)
+INGAME_TEXTS = ["Chat", "Leaderboard", "Settings", "Menu"]
+
+
+def make_ui_dump(node_count: int, texts: Optional[List[str]] = None) -> str:
+    """
+    Build a uiautomator dump with a given number of nodes
+    
+    Args:
+        node_count: Total nodes (filler nodes have no text)
+        texts: Texts placed on the last nodes
+        
+    Returns:
+        XML as printed by `uiautomator dump /dev/tty`
+    """
+    texts = texts or []
+    nodes = []
+    
+    for index in range(node_count):
+        text_index = index - (node_count - len(texts))
+        text = texts[text_index] if text_index >= 0 else ""
+        top = (index * 20) % 2400
+        
+        nodes.append(
+            f'<node index="{index}" text="{text}" resource-id="com.roblox.client:id/n{index}" '
+            f'class="android.widget.FrameLayout" package="com.roblox.client" content-desc="" '
+            f'checkable="false" checked="false" clickable="false" enabled="true" focusable="false" '
+            f'focused="false" scrollable="false" long-clickable="false" password="false" '
+            f'selected="false" bounds="[0,{top}][1080,{top + 20}]" />'
+        )
+    
+    return ("<?xml version='1.0' encoding='UTF-8' standalone='yes' ?><hierarchy rotation=\"0\">"
+            + "".join(nodes) + "</hierarchy>\nUI hierchary dumped to: /dev/tty")
+
+
+def make_raw_frame(width: int = 1080, height: int = 2400, value: int = 40) -> bytes:
+    """Raw screencap output (Android 9+ header) filled with one gray level"""
+    return struct.pack('<IIII', width, height, 1, 0) + bytes([value, value, value, 255]) * (width * height)
+
+
+class FakeDevice:
+    """A phone running Roblox, answering shell commands from canned output after a simulated delay"""
+    
+    # Command prefix -> latency key
+    COMMANDS = ('pidof', 'dumpsys', 'uiautomator', 'wm size', 'ps', 'am', 'input', 'screencap')
+    
+    def __init__(self, package_name: str = "com.roblox.client", ui_dump: Optional[str] = None,
+                 latency: Optional[Dict[str, float]] = None, default_latency: float = 0.0):
+        """
+        Args:
+            package_name: Package the fake device runs
+            ui_dump: uiautomator output (default: small in-game screen)
+            latency: Seconds per command prefix (see COMMANDS)
+            default_latency: Seconds for commands without an entry
+        """
+        self.package_name = package_name
+        self.ui_dump = ui_dump if ui_dump is not None else make_ui_dump(30, INGAME_TEXTS)
+        self.frame = make_raw_frame()
+        self.latency = latency or {}
+        self.default_latency = default_latency
+        self.running = True
+        self.calls: Dict[str, int] = {}
+    
+    def respond(self, command: str) -> Optional[str]:
+        """Canned output for a command (after its latency)"""
+        kind = next((prefix for prefix in self.COMMANDS if command.startswith(prefix)), command.split(' ')[0])
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+        
+        delay = self.latency.get(kind, self.default_latency)
+        if delay:
+            time.sleep(delay)
+        
+        if kind == 'echo':
+            return command[5:].strip().strip("'\"")
+        
+        if kind == 'pidof':
+            return "12345" if self.running else None
+        
+        if kind == 'dumpsys':
+            activity = f"{self.package_name}/com.roblox.client.ActivityNativeMain"
+            return f"  mCurrentFocus=Window{{1a2b3c u0 {activity}}}"
+        
+        if kind == 'uiautomator':
+            return self.ui_dump
+        
+        if kind == 'wm size':
+            return "Physical size: 1080x2400"
+        
+        if kind == 'ps':
+            return "NAME\n" + (self.package_name if self.running else "")
+        
+        if kind == 'am':
+            if 'force-stop' in command:
+                self.running = False
+            elif 'start' in command:
+                self.running = True
+            return ""
+        
+        return ""
+
+
+class FakeADBHelper(FakeDevice, ADBHelper):
+    """ADBHelper whose shell is a FakeDevice"""
+    
+    def __init__(self, package_name: str = "com.roblox.client", ui_dump: Optional[str] = None,
+                 latency: Optional[Dict[str, float]] = None, default_latency: float = 0.0):
+        FakeDevice.__init__(self, package_name, ui_dump, latency, default_latency)
+        ADBHelper.__init__(self, "subprocess")
+    
+    def shell_command(self, command: str, timeout: int = 10) -> Optional[str]:
+        output = self.respond(command)
+        return output.strip() if output is not None else None
+    
+    def stream_command(self, command: str, timeout: int = 10, label: Optional[str] = None) -> Iterator[bytes]:
+        if command.startswith('screencap'):
+            self.respond(command)
+            yield self.frame
+            return
+        
+        output = self.respond(command)
+        data = (output or "").encode('utf-8')
+        
+        # Arrive in pipe-sized chunks like the real stream
+        for start in range(0, len(data), 65536):
+            yield data[start:start + 65536]
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner
+Times the detection/probe hot path against FakeADBHelper and saves JSON results
+
+Usage:
+    python -m benchmarks.run [--profile cpu|device] [--iterations N]
+                             [--output DIR] [--compare RESULTS.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from modules.detector import RobloxDetector
+from modules.keyword_matcher import KeywordMatcher
+from modules.launcher import RobloxLauncher
+from modules.logger import ColoredLogger
+from modules.screen_cache import ScreenCache
+from modules.ui_parser import find_nodes
+from benchmarks.fake_adb import FakeADBHelper, INGAME_TEXTS, make_ui_dump
+
+
+# Seconds per command on a typical mid-range phone (profile 'device')
+DEVICE_LATENCY = {
+    'pidof': 0.02,
+    'dumpsys': 0.15,
+    'uiautomator': 1.5,
+    'wm size': 0.05,
+    'ps': 0.08,
+    'am': 0.2,
+    'input': 0.1,
+    'screencap': 0.12
+}
+
+# UI dump sizes: a menu screen and a busy in-game screen
+DUMP_SIZES = {
+    'small': 30,
+    'large': 2000
+}
+
+# Median slowdown reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def measure(func: Callable[[], object], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time a function
+    
+    Args:
+        func: Code under test
+        iterations: Timed runs
+        warmup: Untimed runs first
+        
+    Returns:
+        Milliseconds: min, median, p95, mean, max (+ iterations)
+    """
+    for _ in range(warmup):
+        func()
+    
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'min_ms': round(samples[0], 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'mean_ms': round(statistics.fmean(samples), 4),
+        'max_ms': round(samples[-1], 4)
+    }
+
+
+def git_version() -> str:
+    """Commit of the tree being measured"""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def run_suite(latency: Dict[str, float], iterations: int) -> Dict[str, Dict[str, float]]:
+    """
+    Run every benchmark
+    
+    Args:
+        latency: Fake per-command latency in seconds
+        iterations: Runs per CPU-bound benchmark (device-bound ones use fewer)
+        
+    Returns:
+        Benchmark name -> timing stats
+    """
+    results = {}
+    device_iterations = iterations if not latency else max(3, iterations // 40)
+    logger = ColoredLogger("Benchmark", log_dir=tempfile.mkdtemp(prefix="autorejoin-bench-"), level="CRITICAL")
+    matcher = KeywordMatcher(RobloxDetector.default_keywords())
+    
+    for size, node_count in DUMP_SIZES.items():
+        # Texts before the in-game ones so matching has to scan them
+        filler = [f"Item {index}" for index in range(node_count // 4)]
+        dump = make_ui_dump(node_count, filler + INGAME_TEXTS)
+        texts = [node.text for node in find_nodes(dump)]
+        
+        results[f"ui_parse/{size}"] = measure(lambda: find_nodes(dump), iterations)
+        results[f"keyword_scan/{size}"] = measure(lambda: matcher.scan(texts), iterations)
+        
+        adb = FakeADBHelper(ui_dump=dump, latency=latency)
+        results[f"get_screen_text/{size}"] = measure(adb.get_screen_text, device_iterations)
+        
+        detector = RobloxDetector(adb, logger, adb.package_name, matcher)
+        results[f"detect_state/{size}"] = measure(detector.detect_state, device_iterations)
+        
+        # Unchanged frame: the fingerprint replaces the UI dump
+        cached = RobloxDetector(adb, logger, adb.package_name, matcher, screen_cache=ScreenCache(3600))
+        results[f"detect_state_fingerprint/{size}"] = measure(cached.detect_state, device_iterations)
+    
+    adb = FakeADBHelper(latency=latency)
+    detector = RobloxDetector(adb, logger, adb.package_name, matcher)
+    launcher = RobloxLauncher(adb, logger, detector, adb.package_name, "920587237")
+    results["launch_and_join"] = measure(lambda: launcher.launch_and_join(max_retries=0),
+                                         max(3, device_iterations // 10))
+    
+    logger.close()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline_path: str) -> List[str]:
+    """
+    Compare medians with an earlier results file
+    
+    Args:
+        results: Current results
+        baseline_path: Earlier JSON written by this script
+        
+    Returns:
+        Report lines
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    lines = [f"Compared with {baseline.get('version', '?')} ({baseline_path}):"]
+    
+    for name, stats in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before or not before.get('median_ms'):
+            lines.append(f"  {name:<36} new")
+            continue
+        
+        change = stats['median_ms'] / before['median_ms'] - 1
+        flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+        lines.append(f"  {name:<36} {before['median_ms']:>10.3f} -> {stats['median_ms']:>10.3f} ms "
+                     f"({change:+.1%}){flag}")
+    
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="AutoRejoin hot path benchmarks (no device needed)")
+    parser.add_argument("--profile", choices=["cpu", "device"], default="cpu",
+                        help="cpu: zero command latency; device: typical phone latencies")
+    parser.add_argument("--iterations", type=int, default=200, help="runs per CPU-bound benchmark")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results"),
+                        help="directory for the results JSON")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args(argv)
+    
+    latency = DEVICE_LATENCY if args.profile == "device" else {}
+    results = run_suite(latency, args.iterations)
+    
+    report = {
+        'version': git_version(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'profile': args.profile,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+    
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{args.profile}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    
+    for name, stats in results.items():
+        print(f"{name:<36} median {stats['median_ms']:>10.3f} ms   p95 {stats['p95_ms']:>10.3f} ms")
+    
+    if args.compare:
+        print()
+        print("\n".join(compare(results, args.compare)))
+    
+    print(f"\nResults saved to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
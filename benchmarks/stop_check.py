@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Stop Check
+Times Fleet.stop() while every fake device is still in its initial join (fake adb, no device needed)
+
+Usage:
+    python -m benchmarks.stop_check [--devices N] [--latency SECONDS] [--async]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+from modules.fleet import Fleet
+from modules.logger import ColoredLogger
+
+
+# Longest acceptable stop: the loops only need to finish the step they are in
+MAX_STOP_SECONDS = 5.0
+
+# Longest wait for every device to be in its initial join
+JOIN_WAIT_SECONDS = 30.0
+
+
+def fleet_config(devices: int, state_dir: str) -> dict:
+    """Fleet of fake devices whose game is stopped, so each starts with a join"""
+    with open("config.json", encoding='utf-8') as f:
+        config = json.load(f)
+    
+    config.pop('profiles', None)
+    config.update(
+        devices=[f"fake-{index + 1}" for index in range(devices)],
+        game_id="1",
+        check_interval=1,
+        min_check_interval=1,
+        max_retries=10,
+        retry_delay=30,
+        logcat_watch=False,
+        control_socket="",
+        metrics_path="",
+        strategy_stats_path="",
+        screenshot_on_error=False
+    )
+    
+    # .stopped marker: benchmarks/bin/adb reports the game as not running
+    for serial in config['devices']:
+        open(os.path.join(state_dir, f"{serial}.stopped"), 'w').close()
+    
+    return config
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Check that a fleet stops promptly mid-join (no device needed)")
+    parser.add_argument("--devices", type=int, default=3, help="fake devices in the fleet")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds every fake adb command takes")
+    parser.add_argument("--async", dest="async_mode", action="store_true", help="run the fleet on asyncio")
+    args = parser.parse_args(argv)
+    
+    # Fake adb first on PATH; device state and logs in throwaway directories
+    state_dir = tempfile.mkdtemp(prefix="autorejoin-stop-")
+    os.environ['PATH'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin") + os.pathsep + os.environ['PATH']
+    os.environ['FAKE_ADB_STATE'] = state_dir
+    os.environ['FAKE_ADB_LATENCY'] = str(args.latency)
+    
+    config = fleet_config(args.devices, state_dir)
+    config['async_mode'] = args.async_mode
+    logger = ColoredLogger("StopCheck", log_dir=os.path.join(state_dir, "logs"), level="WARNING")
+    
+    fleet = Fleet(config, logger)
+    if fleet.build() != args.devices:
+        print("Not every fake device could be set up")
+        return 1
+    
+    if args.async_mode:
+        runner = threading.Thread(target=lambda: asyncio.run(fleet.run_async()), daemon=True)
+    else:
+        runner = threading.Thread(target=fleet.run, daemon=True)
+    runner.start()
+    
+    # Wait until every device is joining
+    deadline = time.monotonic() + JOIN_WAIT_SECONDS
+    while not all(monitor.instances[0].rejoin_active() for monitor in fleet.monitors.values()):
+        if time.monotonic() > deadline or not runner.is_alive():
+            print("Devices never started their initial join")
+            return 1
+        time.sleep(0.05)
+    
+    started = time.monotonic()
+    fleet.stop()
+    runner.join(MAX_STOP_SECONDS * 4)
+    seconds = time.monotonic() - started
+    
+    for monitor in fleet.monitors.values():
+        monitor.logger.close()
+    logger.close()
+    
+    ok = not runner.is_alive() and seconds <= MAX_STOP_SECONDS
+    print(f"Fleet of {args.devices} stopped mid-join in {seconds:.2f}s "
+          f"({'ok' if ok else f'FAILED, limit {MAX_STOP_SECONDS:.0f}s'})")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,54 @@
 """Modules package"""
 
 from .adb_helper import ADBHelper
+from .async_adb import AsyncADBHelper
+from .command_guard import CommandGuard
+from .shell_session import ShellSession
 from .logger import ColoredLogger
+from .config_loader import ConfigLoader
+from .control import ControlServer
+from .snapshot import DeviceSnapshot
+from .ui_parser import UINode
 from .detector import RobloxDetector
+from .keyword_matcher import KeywordMatcher
 from .launcher import RobloxLauncher
+from .rejoin import RejoinMachine
+from .logcat_watcher import LogcatWatcher
+from .instance import RobloxInstance
+from .async_roblox import AsyncRobloxDetector, AsyncRobloxLauncher
+from .metrics import Metrics
 from .monitor import RobloxMonitor
+from .fleet import Fleet
+from .pixel_classifier import PixelClassifier
+from .screen_cache import ScreenCache
 from .screenshot import ScreenshotManager
+from .server_pool import ServerPool
+from .tracing import Tracer
 
 __all__ = [
     'ADBHelper',
+    'AsyncADBHelper',
+    'AsyncRobloxDetector',
+    'AsyncRobloxLauncher',
     'ColoredLogger',
+    'CommandGuard',
+    'ConfigLoader',
+    'ControlServer',
+    'DeviceSnapshot',
+    'Fleet',
+    'KeywordMatcher',
+    'LogcatWatcher',
+    'Metrics',
+    'PixelClassifier',
+    'RejoinMachine',
     'RobloxDetector',
+    'RobloxInstance',
     'RobloxLauncher',
     'RobloxMonitor',
-    'ScreenshotManager'
+    'ScreenCache',
+    'ScreenshotManager',
+    'ServerPool',
+    'ShellSession',
+    'Tracer',
+    'UINode'
 ]
@@ -3,19 +3,130 @@ ADB Helper Module
 Wrapper for Android Debug Bridge commands
 """
 
+import os
+import contextlib
+import html
+import json
+import select
+import shutil
+import signal
 import subprocess
 import time
 import re
-from typing import Optional, List, Tuple
+from typing import Callable, Iterator, Optional, List, Set, Tuple
+from .shell_session import ShellSession, ShellSessionError
+from .wait import wait_until
+from .process_tracker import ProcessTracker
+from .ui_parser import UINode, find_nodes
+from .screen_cache import fingerprint_frame
+from .metrics import Metrics
+from .command_guard import CommandGuard
+from .logger import ColoredLogger, log_warning
+from . import tracing
 
 
 class ADBHelper:
     """Helper class for ADB operations"""
     
-    def __init__(self):
-        self.device_id = None
+    # Backends that keep one shell process open for every command
+    PERSISTENT_BACKENDS = ("sh", "su")
+    
+    # Where install_probe() puts the on-device probe script
+    PROBE_SCRIPT_PATH = "/data/local/tmp/autorejoin_probe.sh"
+    
+    def __init__(self, shell_backend: str = "subprocess", guard: Optional[CommandGuard] = None,
+                 serial: Optional[str] = None, logger: Optional[ColoredLogger] = None):
+        """
+        Args:
+            shell_backend: 'subprocess', or 'sh'/'su' for one persistent shell
+            guard: Timeouts/dedup/circuit breaker (default: a fresh one)
+            serial: adb serial of a remote device; None runs commands locally (Termux on the phone)
+            logger: Device's logger for setup and command failures (default: print)
+        """
+        self.device_id = serial
+        self.logger = logger
+        self.shell_backend = shell_backend
+        self.session: Optional[ShellSession] = None
+        self.probe_path: Optional[str] = None
+        self.process_tracker: Optional[ProcessTracker] = None
+        
+        # Per-command latency histograms (set by the monitor)
+        self.metrics: Optional[Metrics] = None
+        
+        # Receives every captured raw frame (screenshot ring buffer, set by the monitor)
+        self.on_frame: Optional[Callable[[bytes], None]] = None
+        
+        # Per-class timeouts, no stacked duplicate probes, backoff when the device hangs
+        self.guard = guard or CommandGuard()
+        
+        if serial is not None:
+            self.connect()
+        
+        if shell_backend in self.PERSISTENT_BACKENDS:
+            self.session = ShellSession(self.session_argv(shell_backend))
+            if not self.session.start():
+                log_warning(self.logger, f"Persistent shell '{self.session.describe()}' unavailable, using subprocess")
+                self.session = None
+        
         self._check_adb_available()
     
+    def session_argv(self, shell_backend: str) -> List[str]:
+        """
+        Command line of the persistent shell
+        
+        Args:
+            shell_backend: 'sh' or 'su'
+            
+        Returns:
+            The shell itself locally, `adb -s <serial> shell [su]` for a remote device
+        """
+        if self.device_id is None:
+            return [shell_backend]
+        
+        return ['adb', '-s', self.device_id, 'shell'] + ([] if shell_backend == 'sh' else [shell_backend])
+    
+    @staticmethod
+    def device_argv(command: str, serial: Optional[str] = None, raw: bool = False) -> List[str]:
+        """
+        Command line that runs one shell command on the device
+        
+        Args:
+            command: Shell command
+            serial: adb serial (None = this device)
+            raw: Binary output (adb exec-out, no line-ending translation)
+            
+        Returns:
+            Arguments for Popen
+        """
+        if serial is None:
+            return ['sh', '-c', command]
+        
+        return ['adb', '-s', serial, 'exec-out' if raw else 'shell', command]
+    
+    def connect(self) -> bool:
+        """
+        Attach a network device (host:port serial) to the adb server
+        
+        Returns:
+            True if adb reports it connected (USB serials need nothing)
+        """
+        if self.device_id is None or ':' not in self.device_id:
+            return True
+        
+        try:
+            result = subprocess.run(
+                ['adb', 'connect', self.device_id],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                timeout=15
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            log_warning(self.logger, f"adb connect {self.device_id} failed: {e}")
+            return False
+        
+        return 'connected to' in result.stdout
+    
     def _check_adb_available(self) -> bool:
         """Check if ADB is available"""
         try:
@@ -24,40 +135,275 @@ class ADBHelper:
         except Exception as e:
             raise RuntimeError(f"ADB not available: {e}")
     
-    def shell_command(self, command: str, timeout: int = 10) -> Optional[str]:
+    def shell_command(self, command: str, timeout: Optional[float] = None) -> Optional[str]:
         """
         Execute ADB shell command
         
         Args:
             command: Shell command to execute
-            timeout: Command timeout in seconds
+            timeout: Command timeout in seconds (default: the guard's budget for its class)
             
         Returns:
-            Command output or None if failed
+            Command output or None if failed or refused by the guard
         """
+        label = self.command_label(command, self.probe_path)
+        timeout = self.guard.timeout_for(label, timeout)
+        
+        admitted, trial = self._admit(label)
+        if not admitted:
+            return None
+        
+        started = time.monotonic()
+        timed_out = False
+        
         try:
-            # On Termux with root, we can directly execute shell commands
-            full_command = command
-            
-            result = subprocess.run(
-                full_command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+            if self.session is not None:
+                try:
+                    returncode, stdout = self.session.run(command, timeout)
+                except ShellSessionError as e:
+                    # Shell died and could not be restarted, fall back for this call
+                    log_warning(self.logger, f"Shell session error: {e}")
+                    if self.device_id is not None:
+                        # A network device may have dropped off the adb server
+                        self.connect()
+                    returncode, stdout = self._run_subprocess(command, timeout)
+            else:
+                returncode, stdout = self._run_subprocess(command, timeout)
             
-            if result.returncode == 0:
-                return result.stdout.strip()
+            if returncode == 0:
+                return stdout.strip()
             else:
                 return None
                 
         except subprocess.TimeoutExpired:
-            print(f"Command timeout: {command}")
+            log_warning(self.logger, f"Command timeout: {command}")
+            timed_out = True
             return None
         except Exception as e:
-            print(f"Command error: {e}")
+            log_warning(self.logger, f"Command error: {e}")
+            return None
+        finally:
+            self.guard.release(label, timed_out, trial)
+            self._observe_command(command, started, timed_out)
+    
+    def _admit(self, label: str) -> Tuple[bool, bool]:
+        """
+        Ask the guard whether a command may run, counting refusals in metrics
+        
+        Args:
+            label: Command class
+            
+        Returns:
+            (True if admitted (release() must follow), whether it is the breaker's trial command)
+        """
+        reason, trial = self.guard.acquire(label)
+        
+        if reason is not None and self.metrics is not None:
+            self.metrics.inc('commands_refused_total', command=label, reason=reason)
+        
+        return reason is None, trial
+    
+    def _observe_command(self, command: str, started: float, timed_out: bool = False):
+        """Record a command's latency (and trace span), labelled by the program it runs"""
+        if self.metrics is None and tracing.get_tracer() is None:
+            return
+        
+        duration = time.monotonic() - started
+        label = self.command_label(command, self.probe_path)
+        
+        if self.metrics is not None:
+            self.metrics.observe('command_seconds', duration, command=label)
+            if timed_out:
+                self.metrics.inc('command_timeouts_total', command=label)
+        tracing.record(label, 'adb', started, duration, command=command)
+    
+    @staticmethod
+    def command_label(command: str, probe_path: Optional[str] = None) -> str:
+        """Short, bounded label for a shell command (its program name)"""
+        if probe_path and probe_path in command:
+            return "probe"
+        
+        words = command.split(None, 1)
+        return os.path.basename(words[0]) if words else ""
+    
+    def _run_subprocess(self, command: str, timeout: float) -> Tuple[int, str]:
+        """
+        Execute a command in a fresh shell process
+        
+        The shell gets its own process group, so on timeout everything it
+        started (a hung uiautomator, say) is killed with it.
+        
+        Args:
+            command: Shell command to execute
+            timeout: Command timeout in seconds
+            
+        Returns:
+            (exit code, stdout)
+            
+        Raises:
+            subprocess.TimeoutExpired: Command did not finish in time
+        """
+        # Locally (Termux) the command runs as is, remote devices go through adb
+        process = subprocess.Popen(
+            self.device_argv(command, self.device_id),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            start_new_session=True
+        )
+        
+        try:
+            stdout, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill_group(process)
+            raise
+        
+        return process.returncode, stdout
+    
+    @staticmethod
+    def _kill_group(process: subprocess.Popen):
+        """Kill a command's whole process group and reap it"""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        
+        try:
+            process.communicate(timeout=2)
+        except (subprocess.TimeoutExpired, ValueError, OSError):
+            pass
+    
+    def close(self):
+        """Close the persistent shell session if one is open"""
+        if self.session is not None:
+            self.session.close()
+    
+    def enable_process_tracker(self) -> bool:
+        """
+        Answer liveness checks from /proc instead of forking pidof
+        
+        Returns:
+            True if /proc is readable; otherwise pidof stays in use
+        """
+        if self.device_id is not None:
+            log_warning(self.logger, "/proc scan only works on the phone running the tool, using pidof")
+            return False
+        
+        tracker = ProcessTracker()
+        
+        if not tracker.is_available():
+            log_warning(self.logger, "/proc is restricted, using pidof for process checks")
+            return False
+        
+        self.process_tracker = tracker
+        return True
+    
+    def install_probe(self, device_path: str = PROBE_SCRIPT_PATH) -> bool:
+        """
+        Install the probe script that reports all device state in one call
+        
+        Args:
+            device_path: Where to put the script on the device
+            
+        Returns:
+            True if installed and working
+        """
+        source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'probe.sh')
+        
+        if self.device_id is not None:
+            if not self._push(source, device_path):
+                return False
+        else:
+            try:
+                # We run on the device itself, so "pushing" is a plain copy
+                shutil.copyfile(source, device_path)
+                os.chmod(device_path, 0o755)
+            except OSError as e:
+                log_warning(self.logger, f"Probe install failed: {e}")
+                return False
+        
+        self.probe_path = device_path
+        
+        if self.probe([]) is None:
+            log_warning(self.logger, "Probe script did not return valid output, disabling it")
+            self.probe_path = None
+            return False
+        
+        return True
+    
+    def _push(self, source: str, device_path: str) -> bool:
+        """
+        Copy a file to a remote device and make it executable
+        
+        Args:
+            source: Local file
+            device_path: Destination on the device
+            
+        Returns:
+            True if copied
+        """
+        try:
+            result = subprocess.run(
+                ['adb', '-s', self.device_id, 'push', source, device_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            log_warning(self.logger, f"Probe install failed: {e}")
+            return False
+        
+        if result.returncode != 0:
+            log_warning(self.logger, f"Probe install failed: {result.stderr.strip()}")
+            return False
+        
+        return self.shell_command(f"chmod 755 {device_path}") is not None
+    
+    def probe(self, package_names: List[str], include_ui: bool = False) -> Optional[dict]:
+        """
+        Read pids, focused window, screen size and optionally UI texts in one call
+        
+        Args:
+            package_names: Packages to look up
+            include_ui: Also dump UI texts (skipped by the script if none is running)
+            
+        Returns:
+            {'pids', 'current_activity', 'screen_size', 'screen_texts'} or None
+            if the probe is not installed or failed; 'screen_texts' is None
+            when no UI dump was taken
+        """
+        if not self.probe_path:
             return None
+        
+        flag = "-u " if include_ui else ""
+        output = self.shell_command(
+            f"sh {self.probe_path} {flag}{' '.join(package_names)}",
+            timeout=20 if include_ui else 10
+        )
+        
+        return self.parse_probe(output)
+    
+    @staticmethod
+    def parse_probe(output: Optional[str]) -> Optional[dict]:
+        """Turn the probe script's JSON line into parsed facts"""
+        if not output:
+            return None
+        
+        try:
+            data = json.loads(output.splitlines()[-1], strict=False)
+        except ValueError:
+            return None
+        
+        texts = data.get('texts')
+        
+        return {
+            'pids': data.get('pids', {}),
+            'current_activity': ADBHelper.parse_current_activity(data.get('focus')),
+            'screen_size': ADBHelper.parse_screen_size(data.get('size')),
+            # The script greps raw XML, so entities are still escaped
+            'screen_texts': None if texts is None else [html.unescape(t) for t in texts if t]
+        }
     
     def is_package_running(self, package_name: str) -> bool:
         """
@@ -69,9 +415,37 @@ class ADBHelper:
         Returns:
             True if package is running
         """
+        if self.process_tracker is not None:
+            return self.process_tracker.find_pid(package_name) is not None
+        
         output = self.shell_command(f"pidof {package_name}")
         return output is not None and len(output) > 0
     
+    def get_running_packages(self, package_names: List[str]) -> Optional[Set[str]]:
+        """
+        Check several packages with one process listing
+        
+        Args:
+            package_names: Android package names
+            
+        Returns:
+            Subset of package_names that are running, or None if ps failed
+        """
+        if self.process_tracker is not None:
+            return self.process_tracker.running_packages(package_names)
+        
+        output = self.shell_command("ps -A -o NAME")
+        return self.parse_running_packages(output, package_names)
+    
+    @staticmethod
+    def parse_running_packages(output: Optional[str], package_names: List[str]) -> Optional[Set[str]]:
+        """Pick running packages out of 'ps -A -o NAME' output"""
+        if output is None:
+            return None
+        
+        names = {line.strip() for line in output.splitlines()}
+        return {name for name in package_names if name in names}
+    
     def get_current_activity(self) -> Optional[str]:
         """
         Get current foreground activity
@@ -80,7 +454,11 @@ class ADBHelper:
             Current activity name or None
         """
         output = self.shell_command("dumpsys window windows | grep -E 'mCurrentFocus'")
-        
+        return self.parse_current_activity(output)
+    
+    @staticmethod
+    def parse_current_activity(output: Optional[str]) -> Optional[str]:
+        """Extract package/activity from mCurrentFocus output"""
         if output:
             # Extract activity name from output
             match = re.search(r'([a-zA-Z0-9.]+)/([a-zA-Z0-9.]+)', output)
@@ -89,27 +467,29 @@ class ADBHelper:
         
         return None
     
-    def force_stop_package(self, package_name: str) -> bool:
+    def force_stop_package(self, package_name: str, timeout: float = 5) -> bool:
         """
         Force stop a package
         
         Args:
             package_name: Package to stop
+            timeout: Max seconds to wait for the process to exit
             
         Returns:
             True if successful
         """
         output = self.shell_command(f"am force-stop {package_name}")
-        time.sleep(1)
-        return not self.is_package_running(package_name)
+        return wait_until(lambda: not self.is_package_running(package_name), timeout)
     
-    def start_activity(self, package_name: str, activity_name: Optional[str] = None) -> bool:
+    def start_activity(self, package_name: str, activity_name: Optional[str] = None,
+                       timeout: float = 5) -> bool:
         """
         Start an activity
         
         Args:
             package_name: Package name
             activity_name: Activity name (optional)
+            timeout: Max seconds to wait for the process to appear
             
         Returns:
             True if successful
@@ -120,13 +500,15 @@ class ADBHelper:
             cmd = f"monkey -p {package_name} -c android.intent.category.LAUNCHER 1"
         
         output = self.shell_command(cmd)
-        time.sleep(2)
-        return self.is_package_running(package_name)
+        return wait_until(lambda: self.is_package_running(package_name), timeout)
     
     def open_url(self, url: str, package_name: Optional[str] = None) -> bool:
         """
         Open URL with intent
         
+        Returns as soon as the intent is sent; callers wait for the app to
+        come to the foreground.
+        
         Args:
             url: URL to open (e.g., roblox://placeId=123 or https://www.roblox.com/share?...)
             package_name: Optional package to force open with (e.g., com.roblox.client)
@@ -142,7 +524,6 @@ class ADBHelper:
             cmd = f"am start -a android.intent.action.VIEW -d '{url}'"
         
         output = self.shell_command(cmd)
-        time.sleep(3)
         return output is not None
     
     def tap(self, x: int, y: int) -> bool:
@@ -214,7 +595,11 @@ class ADBHelper:
             (width, height) or None
         """
         output = self.shell_command("wm size")
-        
+        return self.parse_screen_size(output)
+    
+    @staticmethod
+    def parse_screen_size(output: Optional[str]) -> Optional[Tuple[int, int]]:
+        """Extract (width, height) from 'wm size' output"""
         if output:
             match = re.search(r'(\d+)x(\d+)', output)
             if match:
@@ -222,31 +607,144 @@ class ADBHelper:
         
         return None
     
+    def get_screen_frame(self, label: Optional[str] = None) -> Optional[bytes]:
+        """
+        Capture the current frame as raw screencap output (no PNG encoding)
+        
+        Args:
+            label: Command class for the guard (default: screencap; 'screenshot' gives way to checks)
+            
+        Returns:
+            Header + RGBA pixels, or None if screencap failed or was refused
+        """
+        data = b''.join(self.stream_command("screencap", label=label))
+        
+        if data and self.on_frame is not None:
+            self.on_frame(data)
+        
+        return data or None
+    
+    def get_screen_fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint the current frame from raw screencap output
+        
+        Much cheaper than a UI dump; used to tell whether the screen changed.
+        
+        Returns:
+            Fingerprint or None if screencap failed
+        """
+        return fingerprint_frame(self.get_screen_frame())
+    
     def take_screenshot(self, save_path: str) -> bool:
         """
         Take screenshot
         
+        The PNG is read from screencap's stdout and written once, with no
+        temporary file on /sdcard.
+        
         Args:
             save_path: Path to save screenshot
             
         Returns:
             True if successful
         """
-        # Take screenshot to device
-        device_path = "/sdcard/screenshot_temp.png"
-        self.shell_command(f"screencap -p {device_path}")
+        data = b''.join(self.stream_command("screencap -p"))
+        if not data.startswith(b'\x89PNG'):
+            return False
         
-        # Copy to destination
         try:
-            subprocess.run(
-                f"cp {device_path} {save_path}",
-                shell=True,
-                check=True
-            )
+            with open(save_path, 'wb') as f:
+                f.write(data)
             return True
-        except:
+        except OSError:
             return False
     
+    def stream_command(self, command: str, timeout: Optional[float] = None,
+                       label: Optional[str] = None) -> Iterator[bytes]:
+        """
+        Execute a command and yield its output as it arrives
+        
+        Runs in its own process (not the persistent session) so the reader
+        can stop early; closing the iterator kills the command.
+        
+        Args:
+            command: Shell command to execute
+            timeout: Command timeout in seconds (default: the guard's budget for its class)
+            label: Command class (default: from the command, see command_label)
+            
+        Yields:
+            Output chunks (none if it failed or the guard refused it)
+        """
+        label = label or self.command_label(command, self.probe_path)
+        timeout = self.guard.timeout_for(label, timeout)
+        
+        admitted, trial = self._admit(label)
+        if not admitted:
+            return
+        
+        try:
+            process = subprocess.Popen(
+                self.device_argv(command, self.device_id, raw=True),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            self.guard.release(label, trial=trial)
+            log_warning(self.logger, f"Command error: {e}")
+            return
+        
+        started = time.monotonic()
+        deadline = started + timeout
+        fd = process.stdout.fileno()
+        finished = False
+        timed_out = False
+        
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    log_warning(self.logger, f"Command timeout: {command}")
+                    timed_out = True
+                    return
+                
+                ready, _, _ = select.select([fd], [], [], remaining)
+                if not ready:
+                    continue
+                
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    finished = True
+                    return
+                
+                yield chunk
+        finally:
+            if not finished or process.poll() is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass
+            process.stdout.close()
+            process.wait()
+            self.guard.release(label, timed_out, trial)
+            self._observe_command(command, started, timed_out)
+    
+    def get_ui_nodes(self, predicate: Optional[Callable[[UINode], bool]] = None,
+                     limit: Optional[int] = None) -> List[UINode]:
+        """
+        Dump the UI hierarchy and parse it while it streams in
+        
+        Args:
+            predicate: Node filter (default: nodes with text)
+            limit: Stop the dump once this many nodes matched
+            
+        Returns:
+            Matching nodes with text, resource-id, class and bounds
+        """
+        # Close explicitly so an early stop kills the dump right away, not at GC time
+        with contextlib.closing(self.stream_command("uiautomator dump /dev/tty")) as chunks:
+            return find_nodes(chunks, predicate, limit)
+    
     def get_screen_text(self) -> List[str]:
         """
         Get all text visible on screen using UI dump
@@ -254,12 +752,12 @@ class ADBHelper:
         Returns:
             List of text strings
         """
-        # Dump UI hierarchy
-        output = self.shell_command("uiautomator dump /dev/tty")
-        
+        return [node.text for node in self.get_ui_nodes()]
+    
+    @staticmethod
+    def parse_screen_text(output: Optional[str]) -> List[str]:
+        """Extract non-empty text attributes from a UI dump"""
         if not output:
             return []
         
-        # Extract text attributes
-        texts = re.findall(r'text="([^"]*)"', output)
-        return [t for t in texts if t]  # Filter empty strings
+        return [node.text for node in find_nodes(output)]
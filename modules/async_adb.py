@@ -0,0 +1,369 @@
+"""
+Async ADB Module
+asyncio-native device commands and per-tick snapshot
+"""
+
+import asyncio
+import os
+import signal
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+from .adb_helper import ADBHelper
+from .process_tracker import ProcessTracker
+from .ui_parser import UINode, find_nodes
+from .screen_cache import fingerprint_frame
+from .metrics import Metrics
+from .command_guard import CommandGuard, note_refusals, record_refusals
+from .logger import ColoredLogger, log_warning
+from . import tracing
+
+
+class AsyncADBHelper:
+    """Non-blocking counterpart of ADBHelper built on asyncio subprocesses"""
+    
+    def __init__(self, probe_path: Optional[str] = None,
+                 process_tracker: Optional[ProcessTracker] = None,
+                 metrics: Optional[Metrics] = None, guard: Optional[CommandGuard] = None,
+                 serial: Optional[str] = None, logger: Optional[ColoredLogger] = None):
+        """
+        Args:
+            probe_path: Probe script installed by ADBHelper.install_probe (optional)
+            process_tracker: /proc tracker from ADBHelper (optional)
+            metrics: Per-command latency histograms (optional)
+            guard: Timeouts/dedup/circuit breaker, shared with ADBHelper (optional)
+            serial: adb serial of a remote device (default: run locally)
+            logger: Device's logger for command failures (default: print)
+        """
+        self.serial = serial
+        self.logger = logger
+        self.probe_path = probe_path
+        self.process_tracker = process_tracker
+        self.metrics = metrics
+        self.guard = guard or CommandGuard()
+        
+        # Receives every captured raw frame (screenshot ring buffer, set by the monitor)
+        self.on_frame: Optional[Callable[[bytes], None]] = None
+    
+    async def shell_command(self, command: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Execute shell command without blocking the event loop
+        
+        The command runs in its own process group; on timeout or task
+        cancellation the whole group is killed so nothing keeps running.
+        
+        Args:
+            command: Shell command to execute
+            timeout: Command timeout in seconds (default: the guard's budget for its class)
+            
+        Returns:
+            Command output or None if failed
+        """
+        stdout = await self.shell_command_bytes(command, timeout)
+        
+        if stdout is None:
+            return None
+        
+        return stdout.decode('utf-8', errors='replace').strip()
+    
+    async def shell_command_bytes(self, command: str, timeout: Optional[float] = None,
+                                  raw: bool = False) -> Optional[bytes]:
+        """Execute shell command and return stdout (None if failed or refused by the guard; raw = binary-safe)"""
+        label = ADBHelper.command_label(command, self.probe_path)
+        reason, trial = self.guard.acquire(label)
+        
+        if reason is not None:
+            if self.metrics is not None:
+                self.metrics.inc('commands_refused_total', command=label, reason=reason)
+            return None
+        
+        started = asyncio.get_running_loop().time()
+        timed_out = False
+        
+        try:
+            return await self._exec(command, self.guard.timeout_for(label, timeout), raw)
+        except asyncio.TimeoutError:
+            timed_out = True
+            return None
+        finally:
+            self.guard.release(label, timed_out, trial)
+            
+            if self.metrics is not None or tracing.get_tracer() is not None:
+                duration = asyncio.get_running_loop().time() - started
+                
+                if self.metrics is not None:
+                    self.metrics.observe('command_seconds', duration, command=label)
+                    if timed_out:
+                        self.metrics.inc('command_timeouts_total', command=label)
+                tracing.record(label, 'adb', started, duration, command=command)
+    
+    async def _exec(self, command: str, timeout: float, raw: bool = False) -> Optional[bytes]:
+        """Run one command in its own process group (asyncio.TimeoutError once it is killed)"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *ADBHelper.device_argv(command, self.serial, raw),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            log_warning(self.logger, f"Command error: {e}")
+            return None
+        
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            log_warning(self.logger, f"Command timeout: {command}")
+            raise
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+        
+        if process.returncode == 0:
+            return stdout
+        else:
+            return None
+    
+    async def _kill(self, process: asyncio.subprocess.Process):
+        """Kill a command's process group and reap it"""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        
+        try:
+            await asyncio.wait_for(process.wait(), 2)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def wait_until(self, condition: Callable[[], Awaitable[bool]], timeout: float,
+                         interval: float = 0.25, max_interval: float = 2.0,
+                         backoff: float = 1.5) -> bool:
+        """
+        Poll an async condition with backoff until it holds or the deadline passes
+        
+        Args:
+            condition: Coroutine function returning True when ready
+            timeout: Deadline in seconds
+            interval: First delay between checks in seconds
+            max_interval: Longest delay between checks in seconds
+            backoff: Delay multiplier after each failed check
+            
+        Returns:
+            True if the condition held before the deadline
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = interval
+        
+        while True:
+            if await condition():
+                return True
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * backoff, max_interval)
+    
+    async def probe(self, package_names: List[str], include_ui: bool = False) -> Optional[dict]:
+        """All device facts in one probe script call (see ADBHelper.probe)"""
+        if not self.probe_path:
+            return None
+        
+        flag = "-u " if include_ui else ""
+        output = await self.shell_command(
+            f"sh {self.probe_path} {flag}{' '.join(package_names)}",
+            timeout=20 if include_ui else 10
+        )
+        
+        return ADBHelper.parse_probe(output)
+    
+    async def is_package_running(self, package_name: str) -> bool:
+        """Check if a package is currently running"""
+        if self.process_tracker is not None:
+            return self.process_tracker.find_pid(package_name) is not None
+        
+        output = await self.shell_command(f"pidof {package_name}")
+        return output is not None and len(output) > 0
+    
+    async def get_running_packages(self, package_names: List[str]) -> Optional[Set[str]]:
+        """Check several packages with one process listing"""
+        if self.process_tracker is not None:
+            return self.process_tracker.running_packages(package_names)
+        
+        output = await self.shell_command("ps -A -o NAME")
+        return ADBHelper.parse_running_packages(output, package_names)
+    
+    async def get_current_activity(self) -> Optional[str]:
+        """Get current foreground activity"""
+        output = await self.shell_command("dumpsys window windows | grep -E 'mCurrentFocus'")
+        return ADBHelper.parse_current_activity(output)
+    
+    async def force_stop_package(self, package_name: str, timeout: float = 5) -> bool:
+        """Force stop a package and wait for its process to exit"""
+        await self.shell_command(f"am force-stop {package_name}")
+        
+        async def stopped() -> bool:
+            return not await self.is_package_running(package_name)
+        
+        return await self.wait_until(stopped, timeout)
+    
+    async def open_url(self, url: str, package_name: Optional[str] = None) -> bool:
+        """Open URL with intent (see ADBHelper.open_url)"""
+        if package_name:
+            cmd = f"am start -a android.intent.action.VIEW -d '{url}' -p {package_name}"
+        else:
+            cmd = f"am start -a android.intent.action.VIEW -d '{url}'"
+        
+        output = await self.shell_command(cmd)
+        return output is not None
+    
+    async def tap(self, x: int, y: int) -> bool:
+        """Tap at coordinates"""
+        output = await self.shell_command(f"input tap {x} {y}")
+        await asyncio.sleep(0.5)
+        return output is not None
+    
+    async def get_screen_size(self) -> Optional[Tuple[int, int]]:
+        """Get screen resolution"""
+        output = await self.shell_command("wm size")
+        return ADBHelper.parse_screen_size(output)
+    
+    async def get_screen_frame(self) -> Optional[bytes]:
+        """Capture the current frame as raw screencap output"""
+        data = await self.shell_command_bytes("screencap", raw=True)
+        
+        if data and self.on_frame is not None:
+            self.on_frame(data)
+        
+        return data or None
+    
+    async def get_screen_fingerprint(self) -> Optional[str]:
+        """Fingerprint the current frame from raw screencap output"""
+        return fingerprint_frame(await self.get_screen_frame())
+    
+    async def get_ui_nodes(self, predicate: Optional[Callable[[UINode], bool]] = None,
+                           limit: Optional[int] = None) -> List[UINode]:
+        """Dump the UI hierarchy into nodes (see ADBHelper.get_ui_nodes)"""
+        output = await self.shell_command("uiautomator dump /dev/tty")
+        return find_nodes(output or "", predicate, limit)
+    
+    async def get_screen_text(self) -> List[str]:
+        """Get all text visible on screen using UI dump"""
+        return [node.text for node in await self.get_ui_nodes()]
+
+
+class AsyncDeviceSnapshot:
+    """Async DeviceSnapshot: each fact is loaded once, concurrent awaiters share the probe"""
+    
+    def __init__(self, adb: AsyncADBHelper, packages: Optional[List[str]] = None, ui: bool = True):
+        self.adb = adb
+        self.packages = list(packages or [])
+        self.ui = ui
+        self._loads: Dict[Hashable, asyncio.Future] = {}
+        
+        # Commands refused while loading each fact
+        self._refused: Dict[Hashable, List[str]] = {}
+    
+    async def _run_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Load one fact, keeping the refusals it ran into"""
+        with record_refusals() as refused:
+            value = await loader()
+        self._refused[key] = refused
+        return value
+    
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Start a probe once; later callers await the same future
+        
+        Every awaiting check gets the load's refusals, not just the one that started it.
+        """
+        if key not in self._loads:
+            self._loads[key] = asyncio.ensure_future(self._run_load(key, loader))
+        
+        value = await asyncio.shield(self._loads[key])
+        note_refusals(self._refused.get(key, ()))
+        return value
+    
+    async def _probe_facts(self) -> Optional[dict]:
+        """All facts from one probe script call (None if not installed or failed)"""
+        if not self.adb.probe_path:
+            return None
+        
+        return await self._load('probe', lambda: self.adb.probe(self.packages, self.ui))
+    
+    async def is_package_running(self, package_name: str) -> bool:
+        """Check if a package is running (see DeviceSnapshot.is_package_running)"""
+        if self.adb.process_tracker is not None:
+            return await self.adb.is_package_running(package_name)
+        
+        probe = await self._probe_facts()
+        
+        if probe is not None and package_name in probe['pids']:
+            return bool(probe['pids'][package_name])
+        
+        if probe is None and len(self.packages) > 1 and package_name in self.packages:
+            running = await self._load(
+                'running_packages',
+                lambda: self.adb.get_running_packages(self.packages)
+            )
+            if running is not None:
+                return package_name in running
+        
+        return await self._load(
+            ('running', package_name),
+            lambda: self.adb.is_package_running(package_name)
+        )
+    
+    async def current_activity(self) -> Optional[str]:
+        """Current foreground activity (once)"""
+        probe = await self._probe_facts()
+        
+        if probe is not None:
+            return probe['current_activity']
+        
+        return await self._load('current_activity', self.adb.get_current_activity)
+    
+    async def screen_texts(self) -> List[str]:
+        """Visible screen texts (once)"""
+        probe = await self._probe_facts()
+        
+        if probe is not None and probe['screen_texts'] is not None:
+            return probe['screen_texts']
+        
+        return [node.text for node in await self.ui_nodes()]
+    
+    async def ui_nodes(self) -> List[UINode]:
+        """UI nodes with text (once)"""
+        return await self._load('ui_nodes', self.adb.get_ui_nodes)
+    
+    async def find_nodes(self, predicate: Callable[[UINode], bool], limit: Optional[int] = None) -> List[UINode]:
+        """Find UI nodes, reusing this tick's dump if one was loaded"""
+        if 'ui_nodes' not in self._loads:
+            return await self.adb.get_ui_nodes(predicate, limit)
+        
+        found = [node for node in await self.ui_nodes() if predicate(node)]
+        return found if limit is None else found[:limit]
+    
+    async def screen_size(self) -> Optional[Tuple[int, int]]:
+        """Screen resolution (once)"""
+        probe = await self._probe_facts()
+        
+        if probe is not None and probe['screen_size'] is not None:
+            return probe['screen_size']
+        
+        return await self._load('screen_size', self.adb.get_screen_size)
+    
+    async def screen_frame(self) -> Optional[bytes]:
+        """Raw frame (once)"""
+        return await self._load('screen_frame', self.adb.get_screen_frame)
+    
+    async def screen_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the current frame (shares the screencap with screen_frame)"""
+        return fingerprint_frame(await self.screen_frame())
+    
+    async def memoize(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Compute a value derived from this snapshot once"""
+        return await self._load(('derived', key), loader)
@@ -0,0 +1,413 @@
+"""
+Async Roblox Module
+asyncio versions of RobloxDetector and RobloxLauncher
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Union
+from .async_adb import AsyncADBHelper, AsyncDeviceSnapshot
+from .command_guard import record_refusals
+from .detector import RobloxDetector
+from .keyword_matcher import KeywordMatch
+from .launcher import RobloxLauncher
+from .rejoin import WARM, RejoinMachine
+from . import tracing
+
+
+class AsyncRobloxDetector:
+    """Async RobloxDetector; package, keywords and options come from a sync detector"""
+    
+    def __init__(self, adb: AsyncADBHelper, detector: RobloxDetector):
+        self.adb = adb
+        self.detector = detector
+        self.logger = detector.logger
+        self.package_name = detector.package_name
+    
+    def snapshot(self, ui: bool = True) -> AsyncDeviceSnapshot:
+        """Start a fresh async snapshot for one tick"""
+        return AsyncDeviceSnapshot(self.adb, [self.package_name],
+                                   ui and self.detector.screen_cache is None)
+    
+    @tracing.traced('detector')
+    async def match_keywords(self, snapshot: AsyncDeviceSnapshot) -> Dict[str, KeywordMatch]:
+        """Match all keyword categories against the screen texts (once per snapshot)"""
+        async def scan():
+            screen_cache = self.detector.screen_cache
+            
+            if screen_cache is None:
+                return self.detector.matcher.scan(await snapshot.screen_texts())
+            
+            fingerprint = await snapshot.screen_fingerprint()
+            matches = screen_cache.get(fingerprint)
+            
+            if matches is None:
+                matches = self.detector.matcher.scan(await snapshot.screen_texts())
+                screen_cache.put(fingerprint, matches)
+            
+            return matches
+        
+        return await snapshot.memoize(('keywords', id(self.detector.matcher)), scan)
+    
+    @tracing.traced('detector')
+    async def classify_pixels(self, snapshot: AsyncDeviceSnapshot) -> Optional[str]:
+        """Classify the raw frame with the pixel classifier (once per snapshot)"""
+        classifier = self.detector.pixel_classifier
+        
+        if classifier is None:
+            return None
+        
+        async def classify():
+            return classifier.classify(await snapshot.screen_frame())
+        
+        return await snapshot.memoize(('pixels', id(classifier)), classify)
+    
+    @tracing.traced('detector')
+    async def is_roblox_running(self, snapshot: Optional[AsyncDeviceSnapshot] = None) -> bool:
+        """Check if Roblox is running"""
+        snapshot = snapshot or self.snapshot()
+        return await snapshot.is_package_running(self.package_name)
+    
+    @tracing.traced('detector')
+    async def is_roblox_foreground(self, snapshot: Optional[AsyncDeviceSnapshot] = None) -> bool:
+        """Check if Roblox is in foreground"""
+        snapshot = snapshot or self.snapshot()
+        return self.detector.is_own_activity(await snapshot.current_activity())
+    
+    @tracing.traced('detector')
+    async def is_disconnected(self, snapshot: Optional[AsyncDeviceSnapshot] = None) -> bool:
+        """Check if showing disconnect message"""
+        snapshot = snapshot or self.snapshot()
+        
+        if not await self.is_roblox_running(snapshot):
+            self.logger.debug("Roblox not running - considered disconnected")
+            return True
+        
+        match = (await self.match_keywords(snapshot)).get('disconnected')
+        
+        if match:
+            self.logger.warning(f"Disconnect detected: '{match.text}' (keyword: {match.keyword})")
+            return True
+        
+        return False
+    
+    @tracing.traced('detector')
+    async def is_in_game(self, snapshot: Optional[AsyncDeviceSnapshot] = None) -> bool:
+        """Check if currently in game"""
+        snapshot = snapshot or self.snapshot()
+        
+        if not await self.is_roblox_running(snapshot):
+            return False
+        
+        return 'in_game' in await self.match_keywords(snapshot)
+    
+    @tracing.traced('detector')
+    async def is_on_home_screen(self, snapshot: Optional[AsyncDeviceSnapshot] = None) -> bool:
+        """Check if on Android home screen"""
+        snapshot = snapshot or self.snapshot()
+        return RobloxDetector.is_home_activity(await snapshot.current_activity())
+    
+    @tracing.traced('detector')
+    async def detect_state(self, snapshot: Optional[AsyncDeviceSnapshot] = None) -> str:
+        """
+        Detect current state (same states as RobloxDetector.detect_state)
+        
+        Args:
+            snapshot: Tick snapshot to reuse (optional)
+            
+        Returns:
+            State string
+        """
+        snapshot = snapshot or self.snapshot()
+        
+        if not await self.is_roblox_running(snapshot):
+            return 'not_running'
+        
+        if self.detector.ui_requires_foreground and not await self.is_roblox_foreground(snapshot):
+            return 'background'
+        
+        pixel_state = await self.classify_pixels(snapshot)
+        if pixel_state is not None:
+            return pixel_state
+        
+        if await self.is_disconnected(snapshot):
+            return 'disconnected'
+        
+        if await self.is_in_game(snapshot):
+            return 'in_game'
+        
+        if await self.is_on_home_screen(snapshot):
+            return 'not_running'
+        
+        return 'loading'
+    
+    async def wait_for(self, condition: Callable[[AsyncDeviceSnapshot], Awaitable[bool]],
+                       timeout: float = 30, check_interval: float = 2,
+                       initial_interval: float = 0.5, ui: bool = True) -> Optional[AsyncDeviceSnapshot]:
+        """
+        Wait until an async condition holds on a fresh snapshot
+        
+        Returns:
+            Snapshot that satisfied the condition, or None on timeout
+        """
+        matched = []
+        
+        async def poll() -> bool:
+            snapshot = self.snapshot(ui)
+            if await condition(snapshot):
+                matched.append(snapshot)
+                return True
+            return False
+        
+        if await self.adb.wait_until(poll, timeout, initial_interval, check_interval):
+            return matched[0]
+        
+        return None
+    
+    async def wait_for_state(self, target_state: Union[str, Iterable[str]], timeout: float = 30,
+                             check_interval: float = 2, initial_interval: float = 0.5) -> bool:
+        """Wait for a specific state (or one of several)"""
+        targets = {target_state} if isinstance(target_state, str) else set(target_state)
+        
+        async def reached(snapshot: AsyncDeviceSnapshot) -> bool:
+            return await self.detect_state(snapshot) in targets
+        
+        return await self.wait_for(reached, timeout, check_interval, initial_interval) is not None
+
+
+class AsyncRobloxLauncher:
+    """Async RobloxLauncher; game target and timeouts come from a sync launcher"""
+    
+    def __init__(self, adb: AsyncADBHelper, detector: AsyncRobloxDetector, launcher: RobloxLauncher):
+        self.adb = adb
+        self.detector = detector
+        self.launcher = launcher
+        self.logger = launcher.logger
+        self.package_name = launcher.package_name
+    
+    @property
+    def phase_timeouts(self) -> Dict[str, float]:
+        """Per-phase deadlines of the sync launcher"""
+        return self.launcher.phase_timeouts
+    
+    @property
+    def last_join_state(self) -> Optional[str]:
+        """State verify saw on the last successful join"""
+        return self.launcher.last_join_state
+    
+    @last_join_state.setter
+    def last_join_state(self, state: Optional[str]):
+        self.launcher.last_join_state = state
+    
+    def record_phase(self, phase: str, duration: float):
+        """Report how long a rejoin phase took"""
+        self.launcher.record_phase(phase, duration)
+    
+    def record_strategy(self, strategy: str, success: bool, duration: float):
+        """Add one rejoin try to the strategy's track record"""
+        self.launcher.record_strategy(strategy, success, duration)
+    
+    def record_join(self, success: bool, duration: float):
+        """Add a join result to the server pool"""
+        self.launcher.record_join(success, duration)
+    
+    async def kill_roblox(self) -> bool:
+        """Force stop Roblox"""
+        self.logger.debug("Killing Roblox process...")
+        success = await self.adb.force_stop_package(self.package_name,
+                                                    self.launcher.phase_timeouts['kill'])
+        
+        if self.detector.detector.screen_cache is not None:
+            self.detector.detector.screen_cache.invalidate()
+        
+        if success:
+            self.logger.debug("Roblox killed successfully")
+        else:
+            self.logger.warning("Failed to kill Roblox")
+        
+        return success
+    
+    async def _find_play_button(self, snapshot: AsyncDeviceSnapshot) -> Optional[str]:
+        """Find a Play/Join/Continue button text on screen"""
+        for text in await snapshot.screen_texts():
+            if text.lower() in self.launcher.PLAY_BUTTON_TEXTS:
+                return text
+        
+        return None
+    
+    async def _is_load_settled(self, snapshot: AsyncDeviceSnapshot) -> bool:
+        """Check if loading finished one way or another"""
+        if await self.detector.detect_state(snapshot) in ['in_game', 'disconnected']:
+            return True
+        
+        return await self._find_play_button(snapshot) is not None
+    
+    async def _handle_play_button(self, snapshot: Optional[AsyncDeviceSnapshot] = None) -> bool:
+        """Handle clicking Play button if present (True if tapped)"""
+        snapshot = snapshot or self.detector.snapshot()
+        text = await self._find_play_button(snapshot)
+        
+        if not text:
+            return False
+        
+        self.logger.debug(f"Found button: {text}")
+        
+        nodes = await snapshot.find_nodes(
+            lambda node: node.text.lower() in self.launcher.PLAY_BUTTON_TEXTS, limit=1
+        )
+        target = nodes[0].center if nodes else None
+        
+        if target is None:
+            screen_size = await snapshot.screen_size()
+            
+            if screen_size:
+                width, height = screen_size
+                target = (width // 2, int(height * 0.6))
+        
+        if not target:
+            return False
+        
+        self.logger.debug(f"Tapping Play button at {target}")
+        return await self.adb.tap(*target)
+    
+    async def tap_reconnect(self) -> bool:
+        """Tap the Reconnect button of a disconnect dialog (True if tapped)"""
+        texts = self.launcher.RECONNECT_BUTTON_TEXTS
+        nodes = await self.detector.snapshot().find_nodes(
+            lambda node: node.text.strip().lower() in texts and node.bounds is not None, limit=1
+        )
+        
+        if not nodes:
+            return False
+        
+        self.logger.debug(f"Tapping {nodes[0].text} at {nodes[0].center}")
+        return await self.adb.tap(*nodes[0].center)
+    
+    def rejoin_machine(self, max_retries: Optional[int] = None) -> 'AsyncRejoinMachine':
+        """Create an async rejoin state machine (see RobloxLauncher.rejoin_machine)"""
+        return AsyncRejoinMachine(
+            self,
+            self.launcher.max_retries if max_retries is None else max_retries,
+            self.launcher.retry_delay,
+            self.launcher.max_retry_delay,
+            self.launcher.strategy_order()
+        )
+    
+    async def launch_and_join(self, max_retries: Optional[int] = None) -> bool:
+        """
+        Complete launch and join sequence
+        
+        Args:
+            max_retries: Maximum retry attempts (default: launcher.max_retries)
+            
+        Returns:
+            True if successful
+        """
+        return await self.rejoin_machine(max_retries).run()
+    
+    @tracing.traced('launcher')
+    async def rejoin_game(self) -> bool:
+        """Rejoin game (wrapper for launch_and_join)"""
+        return await self.launch_and_join()
+
+
+class AsyncRejoinMachine(RejoinMachine):
+    """RejoinMachine whose steps await an AsyncRobloxLauncher"""
+    
+    async def step(self) -> float:
+        """Run the current state once (see RejoinMachine.step)"""
+        if self._check_cancelled():
+            return 0.0
+        
+        with tracing.span(self.state, 'launcher', instance=self.launcher.package_name, attempt=self.attempt):
+            try:
+                await getattr(self, f"_step_{self.state}")()
+            except asyncio.CancelledError:
+                self.cancel()
+                self._check_cancelled()
+                raise
+            except Exception as e:
+                self.logger.error(f"Launch error: {e}")
+                self._fail_attempt()
+        
+        return self.delay()
+    
+    async def run(self) -> bool:
+        """Step until finished; cancelling the task cancels the machine"""
+        while not self.done:
+            delay = await self.step()
+            if delay:
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self.cancel()
+                    self._check_cancelled()
+                    raise
+        
+        return self.succeeded
+    
+    async def _step_kill(self):
+        """Force stop Roblox"""
+        await self.launcher.kill_roblox()
+        self._enter(self.OPEN_LINK)
+    
+    async def _step_dismiss(self):
+        """Tap Reconnect on the disconnect dialog"""
+        if not await self.launcher.tap_reconnect():
+            self._skip_strategy("no reconnect button on screen")
+            return
+        
+        self.logger.status("Waiting for game to load...")
+        self._enter(self.LOAD, self.POLL_INTERVALS[self.LOAD][0])
+    
+    async def _step_open_link(self):
+        """Open the game link, then poll until Roblox is in the foreground"""
+        detector = self.launcher.detector
+        
+        if not self._link_opened:
+            if self.strategy == WARM and not await detector.is_roblox_running():
+                self._skip_strategy("Roblox is not running")
+                return
+            
+            link_to_open, package_filter = self.launcher.launcher._resolve_link()
+            
+            if not await self.launcher.adb.open_url(link_to_open, package_name=package_filter):
+                self.logger.error("Failed to open deep link")
+                self._fail_attempt()
+                return
+            
+            self.logger.success(f"Link opened: {link_to_open}")
+            self._mark_link_opened()
+        
+        if not await detector.is_roblox_foreground(detector.snapshot(ui=False)):
+            if not self._expired():
+                self._poll_again()
+                return
+            self.logger.warning("Roblox did not reach the foreground in time")
+        
+        self.logger.status("Waiting for game to load...")
+        self._enter(self.LOAD)
+    
+    async def _step_load(self):
+        """Poll until the load settles; tap Play"""
+        snapshot = self.launcher.detector.snapshot()
+        
+        with record_refusals() as refused:
+            settled = await self.launcher._is_load_settled(snapshot)
+        
+        if (refused or not settled) and not self._expired():
+            self._poll_again()
+            return
+        
+        tapped = await self.launcher._handle_play_button(snapshot)
+        self.logger.status("Verifying game join...")
+        self._enter(self.VERIFY, 2 if tapped else 0)
+    
+    async def _step_verify(self):
+        """Poll for in_game; at the deadline accept loading too"""
+        with record_refusals() as refused:
+            state = await self.launcher.detector.detect_state()
+        self._finish_verify(state, bool(refused))
+    
+    async def _step_backoff(self):
+        """Backoff elapsed: start the next attempt"""
+        self._next_attempt()
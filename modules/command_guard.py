@@ -0,0 +1,210 @@
+"""
+Command Guard Module
+Per-command timeouts, in-flight dedup and a circuit breaker for an unresponsive device
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .wait import backoff_delay
+
+
+# Labels of commands refused during the current check (per thread and asyncio task)
+_refused: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar('refused_commands', default=None)
+
+
+@contextlib.contextmanager
+def record_refusals() -> Iterator[List[str]]:
+    """
+    Collect the commands refused while the block runs in this thread (or asyncio task)
+    
+    A check that saw refusals worked with missing facts and should not be acted on.
+    
+    Yields:
+        Labels of refused commands, filled as refusals happen (an enclosing block sees them too)
+    """
+    refused: List[str] = []
+    token = _refused.set(refused)
+    try:
+        yield refused
+    finally:
+        _refused.reset(token)
+        note_refusals(refused)
+
+
+def note_refusals(labels: Iterable[str]):
+    """
+    Add refusals to the current check (e.g. of a shared load it awaited)
+    
+    Args:
+        labels: Refused command labels
+    """
+    refused = _refused.get()
+    if refused is not None:
+        refused.extend(labels)
+
+
+class CommandGuard:
+    """Decides whether a shell command may run now and how long it gets"""
+    
+    # Timeout per command class (program name, see ADBHelper.command_label)
+    TIMEOUTS = {
+        'pidof': 3,
+        'ps': 5,
+        'dumpsys': 5,
+        'wm': 3,
+        'input': 3,
+        'screencap': 5,
+        'screenshot': 5,
+        'uiautomator': 15,
+        'am': 10,
+        'probe': 10
+    }
+    
+    # Timeout for commands not listed above
+    DEFAULT_TIMEOUT = 10
+    
+    # Expensive probes never stacked: a second one is refused while one runs
+    EXCLUSIVE = ('uiautomator', 'screencap', 'probe')
+    
+    # Background work -> class it gives way to: refused while that runs, never blocks it
+    YIELDS_TO = {
+        'screenshot': 'screencap'
+    }
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, timeouts: Optional[Dict[str, float]] = None, failure_threshold: int = 3,
+                 open_seconds: float = 5, max_open_seconds: float = 120):
+        """
+        Args:
+            timeouts: Per-class timeouts merged over TIMEOUTS
+            failure_threshold: Consecutive timeouts that open the breaker
+            open_seconds: First pause once open (doubles while the device stays unresponsive)
+            max_open_seconds: Longest pause
+        """
+        self.timeouts = {**self.TIMEOUTS, **(timeouts or {})}
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        
+        # Called with (state, seconds open) when the breaker opens or closes (any thread)
+        self.on_change: Optional[Callable[[str, float], None]] = None
+        
+        self.state = self.CLOSED
+        self.in_flight: Dict[str, int] = {}
+        
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+    
+    def timeout_for(self, label: str, requested: Optional[float] = None) -> float:
+        """
+        Get the timeout of a command
+        
+        Args:
+            label: Command class
+            requested: Timeout asked for by the caller (wins when given)
+            
+        Returns:
+            Seconds
+        """
+        if requested is not None:
+            return requested
+        return self.timeouts.get(label, self.DEFAULT_TIMEOUT)
+    
+    def acquire(self, label: str) -> Tuple[Optional[str], bool]:
+        """
+        Ask to run a command; pair every admitted call with release()
+        
+        While the breaker is open nothing runs; once the pause is over a
+        single trial command decides whether it closes again.
+        
+        Args:
+            label: Command class
+            
+        Returns:
+            (None if the command may run, otherwise why it is refused
+            ('circuit_open', 'duplicate' or 'yielded'); whether it is the trial command,
+            to be passed back to release()). Refusals are also noted for
+            the current record_refusals() block.
+        """
+        with self._lock:
+            trial = False
+            reason = None
+            
+            if self.state != self.CLOSED:
+                if self._trial_running or time.monotonic() < self._open_until:
+                    reason = 'circuit_open'
+                else:
+                    self.state = self.HALF_OPEN
+                    self._trial_running = True
+                    trial = True
+            
+            elif label in self.EXCLUSIVE and self.in_flight.get(label):
+                reason = 'duplicate'
+            
+            elif label in self.YIELDS_TO and self.in_flight.get(self.YIELDS_TO[label]):
+                reason = 'yielded'
+            
+            if reason is None:
+                self.in_flight[label] = self.in_flight.get(label, 0) + 1
+        
+        if reason is not None:
+            note_refusals([label])
+        
+        return reason, trial
+    
+    def release(self, label: str, timed_out: bool = False, trial: bool = False):
+        """
+        Report that an admitted command finished
+        
+        Only the trial command settles a half-open breaker; commands
+        admitted before it opened just finish.
+        
+        Args:
+            label: Command class
+            timed_out: Whether it was killed at its timeout
+            trial: What acquire() returned for this command
+        """
+        change = None
+        
+        with self._lock:
+            count = self.in_flight.get(label, 0) - 1
+            if count > 0:
+                self.in_flight[label] = count
+            else:
+                self.in_flight.pop(label, None)
+            
+            if trial:
+                self._trial_running = False
+            
+            if not timed_out:
+                self._failures = 0
+                if trial:
+                    self.state = self.CLOSED
+                    self._trips = 0
+                    change = (self.CLOSED, 0.0)
+            else:
+                self._failures += 1
+                if trial or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                    self._trips += 1
+                    pause = backoff_delay(self._trips, self.open_seconds, self.max_open_seconds, jitter=0.2)
+                    self.state = self.OPEN
+                    self._open_until = time.monotonic() + pause
+                    change = (self.OPEN, pause)
+        
+        if change is not None and self.on_change is not None:
+            self.on_change(*change)
+    
+    def open_remaining(self) -> float:
+        """Seconds until the next trial command is allowed (0 when closed or the pause is over)"""
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
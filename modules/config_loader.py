@@ -0,0 +1,131 @@
+"""
+Config Loader Module
+config.json with named profiles and environment/CLI overrides, plus change detection
+"""
+
+import json
+import os
+from typing import Dict, Mapping, Optional, Tuple
+
+
+class ConfigLoader:
+    """Builds the effective configuration and notices when its file changes"""
+    
+    # Environment variable -> config key (plain string values)
+    ENV_KEYS = {
+        'AUTOREJOIN_GAME_ID': 'game_id',
+        'AUTOREJOIN_VIP_LINK': 'vip_server_link',
+        'AUTOREJOIN_LOG_LEVEL': 'log_level'
+    }
+    
+    # Environment variable -> config key (comma separated lists)
+    ENV_LISTS = {
+        'AUTOREJOIN_SERVERS': 'servers'
+    }
+    
+    def __init__(self, path: str = "config.json", profile: Optional[str] = None,
+                 overrides: Optional[dict] = None, environ: Optional[Mapping[str, str]] = None):
+        """
+        Args:
+            path: config.json location
+            profile: Entry of the config's 'profiles' to apply
+                (default: AUTOREJOIN_PROFILE, then the config's 'default_profile')
+            overrides: Settings applied last (command line, answers to the game prompt)
+            environ: Environment to read AUTOREJOIN_* variables from (default: os.environ)
+        """
+        self.path = path
+        self.environ = os.environ if environ is None else environ
+        self.profile = profile or self.environ.get('AUTOREJOIN_PROFILE') or None
+        self.overrides = dict(overrides or {})
+        
+        # (mtime, size) of the file as last loaded
+        self._signature: Optional[Tuple[int, int]] = None
+    
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Current (mtime, size) of the config file, None if it is missing"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def changed(self) -> bool:
+        """
+        Check if the file was edited since the last load (one stat call)
+        
+        Returns:
+            True if load() would read something new
+        """
+        return self._stat() != self._signature
+    
+    def load(self) -> dict:
+        """
+        Read the file and layer profile, environment and overrides over it
+        
+        Returns:
+            Effective configuration ('active_profile' names the profile used)
+            
+        Raises:
+            OSError: File missing or unreadable
+            ValueError: Invalid JSON or unknown profile
+        """
+        # Taken before reading: an edit landing mid-read shows up as another change
+        self._signature = self._stat()
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        profiles = config.pop('profiles', None) or {}
+        name = self.profile or config.get('default_profile') or ''
+        
+        if name:
+            if name not in profiles:
+                known = ', '.join(sorted(profiles)) or 'none defined'
+                raise ValueError(f"Unknown profile '{name}' (profiles: {known})")
+            _merge(config, profiles[name])
+        config['active_profile'] = name
+        
+        _merge(config, self.env_overrides())
+        _merge(config, self.overrides)
+        
+        return config
+    
+    def env_overrides(self) -> dict:
+        """
+        Read the AUTOREJOIN_* settings from the environment
+        
+        Returns:
+            Config keys set by non-empty variables
+        """
+        overrides = {}
+        
+        for variable, key in self.ENV_KEYS.items():
+            value = self.environ.get(variable, '').strip()
+            if value:
+                overrides[key] = value
+        
+        for variable, key in self.ENV_LISTS.items():
+            value = self.environ.get(variable, '').strip()
+            if value:
+                overrides[key] = [item.strip() for item in value.split(',') if item.strip()]
+        
+        return overrides
+
+
+def _merge(config: dict, layer: Dict[str, object]):
+    """
+    Apply one settings layer
+    
+    A layer naming only a game ID switches away from the VIP link below it
+    (and the other way round), like answering the startup prompt does.
+    
+    Args:
+        config: Configuration updated in place
+        layer: Settings that win over config
+    """
+    config.update(layer)
+    
+    if layer.get('game_id') and 'vip_server_link' not in layer:
+        config['vip_server_link'] = ""
+    elif layer.get('vip_server_link') and 'game_id' not in layer:
+        config['game_id'] = ""
@@ -0,0 +1,121 @@
+"""
+Control Module
+Local Unix socket that answers status queries and takes commands for a running monitor
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    """One connection: a JSON request line in, a JSON reply line out"""
+    
+    def handle(self):
+        line = self.rfile.readline(ControlServer.MAX_REQUEST)
+        
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            result = self.server.control.dispatch(str(request.get('command', '')), request.get('args') or {})
+            reply = {'ok': True, 'result': result}
+        except Exception as e:
+            reply = {'ok': False, 'error': str(e)}
+        
+        self.wfile.write(json.dumps(reply, default=str).encode('utf-8') + b"\n")
+
+
+class ControlServer:
+    """Serves control commands on a Unix-domain socket from a background thread"""
+    
+    # Longest request line read
+    MAX_REQUEST = 65536
+    
+    def __init__(self, path: str, handlers: Dict[str, Callable[[dict], Any]]):
+        """
+        Args:
+            path: Socket file
+            handlers: Command name -> function(args) returning a JSON-serializable result
+                (called on the server thread)
+        """
+        self.path = path
+        self.handlers = handlers
+        
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def dispatch(self, command: str, args: dict) -> Any:
+        """
+        Run one command
+        
+        Args:
+            command: Command name
+            args: Command arguments
+            
+        Returns:
+            Handler result
+        """
+        handler = self.handlers.get(command)
+        if handler is None:
+            raise ValueError(f"Unknown command '{command}' (use {', '.join(sorted(self.handlers))})")
+        return handler(args)
+    
+    def _remove_stale_socket(self):
+        """Delete a socket file left by a crashed run, refusing if a monitor still answers on it"""
+        if not os.path.exists(self.path):
+            return
+        
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        
+        raise OSError(f"Another monitor is already listening on {self.path}")
+    
+    def start(self):
+        """Bind the socket (owner-only access) and start serving"""
+        if self._thread is not None:
+            return
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._remove_stale_socket()
+        
+        # Owner-only from the moment it exists: no window for other users to connect
+        umask = os.umask(0o077)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(self.path, _ControlHandler)
+        finally:
+            os.umask(umask)
+        server.daemon_threads = True
+        server.control = self
+        os.chmod(self.path, 0o600)
+        
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, name="control-socket", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop serving and remove the socket file"""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        
+        server.shutdown()
+        server.server_close()
+        self._thread.join(timeout=2)
+        self._thread = None
+        
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
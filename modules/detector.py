@@ -3,10 +3,15 @@ Detector Module
 Detects various states of Roblox app
 """
 
-import time
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Union
 from .adb_helper import ADBHelper
 from .logger import ColoredLogger
+from .snapshot import DeviceSnapshot
+from .keyword_matcher import KeywordMatch, KeywordMatcher
+from .screen_cache import ScreenCache
+from .pixel_classifier import PixelClassifier
+from .wait import wait_until
+from . import tracing
 
 
 class RobloxDetector:
@@ -32,87 +37,213 @@ class RobloxDetector:
         "Menu"
     ]
     
-    def __init__(self, adb: ADBHelper, logger: ColoredLogger, package_name: str):
+    def __init__(self, adb: ADBHelper, logger: ColoredLogger, package_name: str,
+                 matcher: Optional[KeywordMatcher] = None, ui_requires_foreground: bool = False,
+                 screen_cache: Optional[ScreenCache] = None,
+                 pixel_classifier: Optional[PixelClassifier] = None):
         self.adb = adb
         self.logger = logger
         self.package_name = package_name
+        self.matcher = matcher or KeywordMatcher(self.default_keywords())
+        
+        # With several packages on one device, screen text belongs to whichever
+        # is in front; other instances report 'background' instead of guessing
+        self.ui_requires_foreground = ui_requires_foreground
+        
+        # Reuse the last keyword matches while the screen fingerprint is unchanged
+        self.screen_cache = screen_cache
+        
+        # Raw-frame matching for UI drawn on the GL surface (optional, needs NumPy)
+        self.pixel_classifier = pixel_classifier
+    
+    @classmethod
+    def default_keywords(cls) -> Dict[str, List[str]]:
+        """
+        Built-in keywords by category (categories match state names)
+        
+        Returns:
+            Category -> keywords
+        """
+        return {
+            'disconnected': cls.DISCONNECT_KEYWORDS,
+            'in_game': cls.INGAME_KEYWORDS
+        }
     
-    def is_roblox_running(self) -> bool:
+    def snapshot(self, ui: bool = True) -> DeviceSnapshot:
+        """
+        Start a fresh device snapshot for one tick
+        
+        Args:
+            ui: Whether UI texts will likely be needed (lets the probe script
+                fetch them in the same call)
+            
+        Returns:
+            Empty snapshot; facts load on first use
+        """
+        # With a screen cache the dump is taken lazily, only when the frame changed
+        return DeviceSnapshot(self.adb, [self.package_name], ui and self.screen_cache is None)
+    
+    @tracing.traced('detector')
+    def match_keywords(self, snapshot: DeviceSnapshot) -> Dict[str, KeywordMatch]:
+        """
+        Match all keyword categories against the screen texts (once per snapshot)
+        
+        Args:
+            snapshot: Tick snapshot
+            
+        Returns:
+            Category -> first match
+        """
+        return snapshot.memoize(('keywords', id(self.matcher)), lambda: self._scan_screen(snapshot))
+    
+    def _scan_screen(self, snapshot: DeviceSnapshot) -> Dict[str, KeywordMatch]:
+        """Scan screen texts, skipping the UI dump if the frame is unchanged"""
+        if self.screen_cache is None:
+            return self.matcher.scan(snapshot.screen_texts)
+        
+        # Fingerprint before the dump so a change during the dump forces a new one next time
+        fingerprint = snapshot.screen_fingerprint
+        matches = self.screen_cache.get(fingerprint)
+        
+        if matches is None:
+            matches = self.matcher.scan(snapshot.screen_texts)
+            self.screen_cache.put(fingerprint, matches)
+        
+        return matches
+    
+    @tracing.traced('detector')
+    def classify_pixels(self, snapshot: DeviceSnapshot) -> Optional[str]:
+        """
+        Classify the raw frame with the pixel classifier (once per snapshot)
+        
+        Args:
+            snapshot: Tick snapshot
+            
+        Returns:
+            State string, or None if no classifier or no signature matched
+        """
+        if self.pixel_classifier is None:
+            return None
+        
+        return snapshot.memoize(
+            ('pixels', id(self.pixel_classifier)),
+            lambda: self.pixel_classifier.classify(snapshot.screen_frame)
+        )
+    
+    @tracing.traced('detector')
+    def is_roblox_running(self, snapshot: Optional[DeviceSnapshot] = None) -> bool:
         """
         Check if Roblox is running
         
+        Args:
+            snapshot: Tick snapshot to reuse (optional)
+            
         Returns:
             True if Roblox process exists
         """
-        return self.adb.is_package_running(self.package_name)
+        snapshot = snapshot or self.snapshot()
+        return snapshot.is_package_running(self.package_name)
     
-    def is_roblox_foreground(self) -> bool:
+    @tracing.traced('detector')
+    def is_roblox_foreground(self, snapshot: Optional[DeviceSnapshot] = None) -> bool:
         """
         Check if Roblox is in foreground
         
+        Args:
+            snapshot: Tick snapshot to reuse (optional)
+            
         Returns:
             True if Roblox is the current activity
         """
-        current_activity = self.adb.get_current_activity()
+        snapshot = snapshot or self.snapshot()
+        return self.is_own_activity(snapshot.current_activity)
+    
+    def is_own_activity(self, current_activity: Optional[str]) -> bool:
+        """
+        Check if an activity belongs to our package
         
+        Args:
+            current_activity: package/activity string
+            
+        Returns:
+            True if it is ours
+        """
         if current_activity:
-            return self.package_name in current_activity
+            # Exact package match so com.roblox.client doesn't match its clones
+            return current_activity.split('/')[0] == self.package_name
         
         return False
     
-    def is_disconnected(self) -> bool:
+    @tracing.traced('detector')
+    def is_disconnected(self, snapshot: Optional[DeviceSnapshot] = None) -> bool:
         """
         Check if showing disconnect message
         
+        Args:
+            snapshot: Tick snapshot to reuse (optional)
+            
         Returns:
             True if disconnect detected
         """
-        if not self.is_roblox_running():
+        snapshot = snapshot or self.snapshot()
+        
+        if not self.is_roblox_running(snapshot):
             self.logger.debug("Roblox not running - considered disconnected")
             return True
         
-        # Get screen text
-        screen_texts = self.adb.get_screen_text()
-        
         # Check for disconnect keywords
-        for text in screen_texts:
-            for keyword in self.DISCONNECT_KEYWORDS:
-                if keyword.lower() in text.lower():
-                    self.logger.warning(f"Disconnect detected: '{text}'")
-                    return True
+        match = self.match_keywords(snapshot).get('disconnected')
+        
+        if match:
+            self.logger.warning(f"Disconnect detected: '{match.text}' (keyword: {match.keyword})")
+            return True
         
         return False
     
-    def is_in_game(self) -> bool:
+    @tracing.traced('detector')
+    def is_in_game(self, snapshot: Optional[DeviceSnapshot] = None) -> bool:
         """
         Check if currently in game
         
+        Args:
+            snapshot: Tick snapshot to reuse (optional)
+            
         Returns:
             True if in game
         """
-        if not self.is_roblox_running():
-            return False
+        snapshot = snapshot or self.snapshot()
         
-        # Get screen text
-        screen_texts = self.adb.get_screen_text()
+        if not self.is_roblox_running(snapshot):
+            return False
         
         # Simple heuristic: if we see game UI elements
-        for text in screen_texts:
-            for keyword in self.INGAME_KEYWORDS:
-                if keyword.lower() in text.lower():
-                    return True
-        
-        return False
+        return 'in_game' in self.match_keywords(snapshot)
     
-    def is_on_home_screen(self) -> bool:
+    @tracing.traced('detector')
+    def is_on_home_screen(self, snapshot: Optional[DeviceSnapshot] = None) -> bool:
         """
         Check if on Android home screen
         
+        Args:
+            snapshot: Tick snapshot to reuse (optional)
+            
         Returns:
             True if on home screen
         """
-        current_activity = self.adb.get_current_activity()
+        snapshot = snapshot or self.snapshot()
+        return self.is_home_activity(snapshot.current_activity)
+    
+    @staticmethod
+    def is_home_activity(current_activity: Optional[str]) -> bool:
+        """
+        Check if an activity looks like the Android launcher
         
+        Args:
+            current_activity: package/activity string
+            
+        Returns:
+            True if it is a home screen
+        """
         if current_activity:
             # Common launcher activities
             home_indicators = [
@@ -127,52 +258,105 @@ class RobloxDetector:
         
         return False
     
-    def detect_state(self) -> str:
+    @tracing.traced('detector')
+    def detect_state(self, snapshot: Optional[DeviceSnapshot] = None) -> str:
         """
         Detect current state
         
+        Every predicate shares one snapshot, so each probe (pidof, dumpsys,
+        uiautomator dump) runs at most once per call.
+        
+        Args:
+            snapshot: Tick snapshot to reuse (optional)
+            
         Returns:
-            State string: 'not_running', 'disconnected', 'in_game', 'loading', 'unknown'
+            State string: 'not_running', 'disconnected', 'in_game', 'loading',
+            'background' (only with ui_requires_foreground), 'unknown'
         """
+        snapshot = snapshot or self.snapshot()
+        
         # Check if running
-        if not self.is_roblox_running():
+        if not self.is_roblox_running(snapshot):
             return 'not_running'
         
+        # Screen belongs to another app or clone
+        if self.ui_requires_foreground and not self.is_roblox_foreground(snapshot):
+            return 'background'
+        
+        # Raw pixels first: cheap, and they see the GL-drawn dialogs and HUD
+        pixel_state = self.classify_pixels(snapshot)
+        if pixel_state is not None:
+            return pixel_state
+        
         # Check if disconnected
-        if self.is_disconnected():
+        if self.is_disconnected(snapshot):
             return 'disconnected'
         
         # Check if in game
-        if self.is_in_game():
+        if self.is_in_game(snapshot):
             return 'in_game'
         
         # Check if on home screen
-        if self.is_on_home_screen():
+        if self.is_on_home_screen(snapshot):
             return 'not_running'
         
         # Probably loading or in menu
         return 'loading'
     
-    def wait_for_state(self, target_state: str, timeout: int = 30, check_interval: int = 2) -> bool:
+    def wait_for(self, condition: Callable[[DeviceSnapshot], bool], timeout: float = 30,
+                 check_interval: float = 2, initial_interval: float = 0.5,
+                 ui: bool = True) -> Optional[DeviceSnapshot]:
         """
-        Wait for a specific state
+        Wait until a condition holds on a fresh snapshot
+        
+        Polls immediately, then backs off from initial_interval up to
+        check_interval between polls.
         
         Args:
-            target_state: State to wait for
+            condition: Predicate evaluated on each poll's snapshot
             timeout: Maximum wait time in seconds
-            check_interval: Check interval in seconds
+            check_interval: Longest delay between polls in seconds
+            initial_interval: First delay between polls in seconds
+            ui: Whether the condition reads UI texts
             
         Returns:
-            True if state reached
+            Snapshot that satisfied the condition, or None on timeout
         """
-        start_time = time.time()
+        matched = []
         
-        while time.time() - start_time < timeout:
-            current_state = self.detect_state()
-            
-            if current_state == target_state:
+        def poll() -> bool:
+            snapshot = self.snapshot(ui)
+            if condition(snapshot):
+                matched.append(snapshot)
                 return True
+            return False
+        
+        if wait_until(poll, timeout, initial_interval, check_interval):
+            return matched[0]
+        
+        return None
+    
+    def wait_for_state(self, target_state: Union[str, Iterable[str]], timeout: float = 30,
+                       check_interval: float = 2, initial_interval: float = 0.5) -> bool:
+        """
+        Wait for a specific state
+        
+        Args:
+            target_state: State (or states) to wait for
+            timeout: Maximum wait time in seconds
+            check_interval: Longest delay between checks in seconds
+            initial_interval: First delay between checks in seconds
             
-            time.sleep(check_interval)
+        Returns:
+            True if state reached
+        """
+        targets = {target_state} if isinstance(target_state, str) else set(target_state)
         
-        return False
+        snapshot = self.wait_for(
+            lambda snap: self.detect_state(snap) in targets,
+            timeout,
+            check_interval,
+            initial_interval
+        )
+        
+        return snapshot is not None
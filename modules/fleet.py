@@ -0,0 +1,265 @@
+"""
+Fleet Module
+Drives many phones over adb serials from one host, one isolated monitor per device
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import re
+import signal
+import threading
+from typing import Dict, List, Optional, Tuple
+from .config_loader import ConfigLoader, _merge
+from .logger import ColoredLogger
+from .monitor import RobloxMonitor
+
+
+# Config keys naming a file or socket; every device gets its own (logs/control.sock -> logs/control-<device>.sock)
+DEVICE_FILES = ('control_socket', 'metrics_path', 'strategy_stats_path')
+
+
+def device_entries(config: dict) -> List[Tuple[str, dict]]:
+    """
+    Read the 'devices' list
+    
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        (name, entry) per device; an entry is {'serial': ..., settings overriding config.json}
+        
+    Raises:
+        ValueError: Entry without a serial, or two devices with the same name
+    """
+    devices = []
+    
+    for item in config.get('devices') or []:
+        entry = {'serial': item} if isinstance(item, str) else dict(item)
+        if not entry.get('serial'):
+            raise ValueError(f"Device entry without 'serial': {item}")
+        
+        # Serials like 10.0.0.5:5555 become file-safe names
+        name = entry.pop('name', None) or re.sub(r'[^\w.-]', '_', entry['serial'])
+        devices.append((name, entry))
+    
+    names = [name for name, _ in devices]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Device names must be unique: {names}")
+    
+    return devices
+
+
+def device_config(config: dict, name: str) -> dict:
+    """
+    Configuration of one fleet device
+    
+    Args:
+        config: Fleet configuration (with 'devices')
+        name: Device name from device_entries()
+        
+    Returns:
+        config.json settings with the device's own settings and files layered on top
+        
+    Raises:
+        ValueError: No such device in 'devices'
+    """
+    entries = dict(device_entries(config))
+    if name not in entries:
+        raise ValueError(f"Device '{name}' is no longer in 'devices'")
+    
+    result = {key: value for key, value in config.items() if key != 'devices'}
+    entry = dict(entries[name])
+    result['device_serial'] = entry.pop('serial')
+    _merge(result, entry)
+    
+    for key in DEVICE_FILES:
+        if result.get(key):
+            root, ext = os.path.splitext(result[key])
+            result[key] = f"{root}-{name}{ext}"
+    result['screenshot_dir'] = os.path.join(result.get('screenshot_dir', 'logs/screenshots'), name)
+    
+    return result
+
+
+class DeviceConfigLoader(ConfigLoader):
+    """ConfigLoader that yields one fleet device's configuration (edits apply to that device live)"""
+    
+    def __init__(self, loader: ConfigLoader, device: str):
+        """
+        Args:
+            loader: Fleet's loader (file, profile, overrides and environment are shared)
+            device: Device name
+        """
+        super().__init__(loader.path, loader.profile, loader.overrides, loader.environ)
+        self.device = device
+    
+    def load(self) -> dict:
+        """
+        Read the file and build the device's configuration
+        
+        Returns:
+            Effective configuration of the device
+            
+        Raises:
+            OSError: File missing or unreadable
+            ValueError: Invalid JSON, unknown profile or device removed
+        """
+        return device_config(super().load(), self.device)
+
+
+class Fleet:
+    """Runs one RobloxMonitor per adb device, each on its own thread (or asyncio task)"""
+    
+    # Devices connected (adb connect, shell session, probe push) at the same time on startup
+    CONNECT_WORKERS = 8
+    
+    def __init__(self, config: dict, logger: ColoredLogger, config_loader: Optional[ConfigLoader] = None):
+        """
+        Args:
+            config: Configuration dictionary with 'devices'
+            logger: Fleet-wide logger (each device logs to its own directory below it)
+            config_loader: Where config came from (for live reload per device)
+            
+        Raises:
+            ValueError: Invalid 'devices' list
+        """
+        self.config = config
+        self.logger = logger
+        self.config_loader = config_loader
+        self.devices = [name for name, _ in device_entries(config)]
+        
+        self.monitors: Dict[str, RobloxMonitor] = {}
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._stop_async: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _build_monitor(self, name: str) -> Optional[RobloxMonitor]:
+        """
+        Connect one device and create its monitor
+        
+        Args:
+            name: Device name
+            
+        Returns:
+            Monitor, or None if the device could not be set up
+        """
+        config = device_config(self.config, name)
+        logger = ColoredLogger(
+            f"AutoRejoin-{name}",
+            os.path.join(self.logger.log_dir, name),
+            level=config.get('log_level', 'INFO'),
+            max_bytes=config.get('log_max_bytes', 5 * 1024 * 1024),
+            tag=name
+        )
+        loader = DeviceConfigLoader(self.config_loader, name) if self.config_loader is not None else None
+        
+        try:
+            monitor = RobloxMonitor(config, logger, loader)
+        except Exception as e:
+            self.logger.error(f"[{name}] Device skipped: {e}")
+            logger.close()
+            return None
+        
+        monitor.handle_signals = False
+        return monitor
+    
+    def build(self) -> int:
+        """
+        Set up every device, several at a time
+        
+        Returns:
+            Number of devices ready to monitor
+        """
+        workers = max(1, min(self.CONNECT_WORKERS, len(self.devices)))
+        
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            monitors = list(pool.map(self._build_monitor, self.devices))
+        
+        self.monitors = {name: monitor for name, monitor in zip(self.devices, monitors) if monitor is not None}
+        self.logger.info(f"📱 Fleet: {len(self.monitors)}/{len(self.devices)} devices ready")
+        return len(self.monitors)
+    
+    def _start_delay(self, index: int, monitor: RobloxMonitor) -> float:
+        """
+        Seconds to hold a device's first check
+        
+        Devices start spread over one check interval, so the adb server
+        and host see a steady trickle of probes instead of a burst each
+        tick and per-device probe latency stays flat as the fleet grows.
+        """
+        return index * monitor.scheduler.interval / max(len(self.monitors), 1)
+    
+    def _run_device(self, index: int, monitor: RobloxMonitor):
+        """Worker thread: one device's monitoring loop"""
+        if self._stopping.wait(self._start_delay(index, monitor)):
+            monitor.adb.close()
+            return
+        
+        monitor.start_monitoring()
+    
+    def run(self):
+        """Monitor every device on its own thread until stop() is called or all loops end"""
+        for index, (name, monitor) in enumerate(self.monitors.items()):
+            thread = threading.Thread(target=self._run_device, args=(index, monitor),
+                                      name=f"device-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        
+        # Short joins keep the main thread responsive to signals
+        while any(thread.is_alive() for thread in self._threads):
+            for thread in self._threads:
+                thread.join(timeout=1)
+        
+        self.print_summary()
+    
+    async def _run_device_async(self, index: int, monitor: RobloxMonitor):
+        """One device's monitoring loop as a task on the shared event loop"""
+        try:
+            await asyncio.wait_for(self._stop_async.wait(), self._start_delay(index, monitor))
+            monitor.adb.close()
+            return
+        except asyncio.TimeoutError:
+            pass
+        
+        await monitor.start_monitoring_async()
+    
+    async def run_async(self):
+        """Monitor every device as a task of one event loop until stop() is called"""
+        self._stop_async = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        await asyncio.gather(*(
+            self._run_device_async(index, monitor) for index, monitor in enumerate(self.monitors.values())
+        ))
+        
+        self.print_summary()
+    
+    def stop(self):
+        """Ask every device loop to stop (safe from signal handlers and other threads)"""
+        self._stopping.set()
+        
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop_async.set)
+        
+        for monitor in self.monitors.values():
+            monitor.request_stop()
+    
+    def print_summary(self):
+        """Log rejoins and median check latency per device"""
+        self.logger.banner("📱 FLEET SUMMARY 📱")
+        
+        for name, monitor in self.monitors.items():
+            stats = monitor.logger.stats
+            latency = monitor.metrics.quantile('detect_seconds', 0.5, instance=monitor.instances[0].package_name)
+            latency_text = f"{latency * 1000:.0f}ms" if latency is not None else "n/a"
+            
+            self.logger.info(f"{name}: {stats['rejoin_success']}/{stats['rejoin_attempts']} rejoins ok, "
+                             f"check p50 {latency_text}")
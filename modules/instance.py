@@ -0,0 +1,69 @@
+"""
+Instance Module
+One monitored Roblox package with its own game target and state
+"""
+
+import asyncio
+import time
+from typing import Optional
+from .detector import RobloxDetector
+from .launcher import RobloxLauncher
+from .rejoin import RejoinMachine
+
+
+class RobloxInstance:
+    """A Roblox package (original or clone) tracked by the monitor"""
+    
+    def __init__(self, name: str, package_name: str, game_id: str, vip_server_link: str,
+                 detector: RobloxDetector, launcher: RobloxLauncher):
+        self.name = name
+        self.package_name = package_name
+        self.game_id = game_id
+        self.vip_server_link = vip_server_link
+        self.detector = detector
+        self.launcher = launcher
+        
+        # State tracking
+        self.last_state: Optional[str] = None
+        self.consecutive_failures = 0
+        
+        # Push-based detection (logcat watcher), monotonic times
+        self.last_rejoin_at = 0.0
+        self.teleport_until = 0.0
+        
+        # Rejoin in progress (stepped by the sync monitor loop) and post-failure cooldown
+        self.rejoin: Optional[RejoinMachine] = None
+        self.initial_join = False
+        self.cooldown_until = 0.0
+        
+        # New game target (config reload, control socket), applied once no rejoin is running
+        self.pending_spec: Optional[dict] = None
+        
+        # Checks held from the control socket (a running rejoin still finishes)
+        self.paused = False
+        
+        # Async mode (filled in by RobloxMonitor.start_monitoring_async)
+        self.async_detector = None
+        self.async_launcher = None
+        self.rejoin_task: Optional[asyncio.Task] = None
+    
+    @property
+    def target(self) -> str:
+        """Human readable game target"""
+        target = "VIP server" if self.vip_server_link else f"Game ID {self.game_id}"
+        
+        backups = len(self.launcher.server_pool.targets) - 1
+        if backups > 0:
+            target += f" (+{backups} backup server{'s' if backups > 1 else ''})"
+        
+        return target
+    
+    def rejoin_active(self) -> bool:
+        """Whether a rejoin (sync machine or async task) is running"""
+        if self.rejoin is not None:
+            return True
+        return self.rejoin_task is not None and not self.rejoin_task.done()
+    
+    def in_cooldown(self) -> bool:
+        """Whether checks are held after too many failed rejoins"""
+        return time.monotonic() < self.cooldown_until
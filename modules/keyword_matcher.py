@@ -0,0 +1,131 @@
+"""
+Keyword Matcher Module
+Compiles keyword lists into one case-folded regex and reports what matched
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+
+class KeywordMatch(NamedTuple):
+    """A keyword hit on one screen text"""
+    category: str
+    keyword: str
+    text: str
+    text_index: int
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """Multi-category keyword matcher backed by a single alternation regex"""
+    
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        """
+        Args:
+            categories: Category name -> keywords (e.g. {'disconnected': [...]})
+        """
+        self.categories: Dict[str, List[str]] = {}
+        self._keywords: Dict[str, str] = {}
+        self._group_category: Dict[str, str] = {}
+        
+        groups = []
+        for index, (category, keywords) in enumerate(categories.items()):
+            unique = list(dict.fromkeys(k for k in keywords if k))
+            self.categories[category] = unique
+            if not unique:
+                continue
+            
+            folded = []
+            for keyword in unique:
+                key = keyword.casefold()
+                self._keywords.setdefault(key, keyword)
+                folded.append(key)
+            
+            # Longest first so "Connection Lost" wins over "Connection"
+            folded.sort(key=len, reverse=True)
+            group = f"c{index}"
+            self._group_category[group] = category
+            groups.append(f"(?P<{group}>{'|'.join(re.escape(k) for k in folded)})")
+        
+        self._pattern = re.compile('|'.join(groups)) if groups else None
+    
+    def scan(self, texts: List[str]) -> Dict[str, KeywordMatch]:
+        """
+        Find the first match of every category in one pass over the texts
+        
+        Args:
+            texts: Screen texts
+            
+        Returns:
+            Category -> first match (categories without a match are absent)
+        """
+        found: Dict[str, KeywordMatch] = {}
+        
+        if self._pattern is None:
+            return found
+        
+        for text_index, text in enumerate(texts):
+            for match in self._pattern.finditer(text.casefold()):
+                category = self._group_category[match.lastgroup]
+                if category not in found:
+                    found[category] = KeywordMatch(
+                        category,
+                        self._keywords[match.group()],
+                        text,
+                        text_index,
+                        match.start(),
+                        match.end()
+                    )
+            
+            if len(found) == len(self._group_category):
+                break
+        
+        return found
+    
+    def search(self, texts: List[str], category: str) -> Optional[KeywordMatch]:
+        """
+        Find the first match of one category
+        
+        Args:
+            texts: Screen texts
+            category: Category name
+            
+        Returns:
+            Match or None
+        """
+        return self.scan(texts).get(category)
+    
+    @classmethod
+    def from_config(cls, config: dict, defaults: Dict[str, List[str]]) -> 'KeywordMatcher':
+        """
+        Build a matcher from built-in keywords plus packs enabled in config
+        
+        Packs live under config['keyword_packs'] as name -> {category: [keywords]}.
+        Enabled packs are those named in config['keyword_locale'] (string or
+        list) and the pack named "place:<game_id>" for the configured game.
+        Pack keywords are added to the built-in ones.
+        
+        Args:
+            config: Configuration dictionary
+            defaults: Built-in category -> keywords
+            
+        Returns:
+            Compiled matcher
+        """
+        packs = config.get('keyword_packs', {})
+        
+        locales = config.get('keyword_locale', [])
+        if isinstance(locales, str):
+            locales = [locales]
+        
+        enabled = list(locales)
+        if config.get('game_id'):
+            enabled.append(f"place:{config['game_id']}")
+        
+        categories = {category: list(keywords) for category, keywords in defaults.items()}
+        for name in enabled:
+            for category, keywords in packs.get(name, {}).items():
+                categories.setdefault(category, []).extend(keywords)
+        
+        return cls(categories)
@@ -5,24 +5,103 @@ Handles launching Roblox and joining games
 
 import time
 import re
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 from .adb_helper import ADBHelper
 from .logger import ColoredLogger
 from .detector import RobloxDetector
+from .snapshot import DeviceSnapshot
+from .metrics import Metrics
+from .server_pool import ServerPool, ServerTarget
+from .rejoin import COLD, RejoinMachine, StrategyStats, rank_strategies
+from . import tracing
 
 
 class RobloxLauncher:
     """Launches Roblox and joins games"""
     
+    # Per-phase deadlines in seconds (override with config 'phase_timeouts')
+    PHASE_TIMEOUTS = {
+        'kill': 5,
+        'open_link': 15,
+        'load': 30,
+        'verify': 10
+    }
+    
+    # Button texts that need a tap before the game starts
+    PLAY_BUTTON_TEXTS = ['play', 'join', 'continue']
+    
+    # Disconnect dialog buttons that reconnect in place
+    RECONNECT_BUTTON_TEXTS = ['reconnect', 'retry', 'try again']
+    
     def __init__(self, adb: ADBHelper, logger: ColoredLogger, detector: RobloxDetector, 
-                 package_name: str, game_id: str, vip_server_link: str = ""):
+                 package_name: str, game_id: str, vip_server_link: str = "",
+                 phase_timeouts: Optional[Dict[str, float]] = None, pin_package: bool = False,
+                 metrics: Optional[Metrics] = None, max_retries: int = 3, retry_delay: float = 5,
+                 max_retry_delay: float = 300, strategies: Optional[List[str]] = None,
+                 servers: Optional[List[str]] = None):
         self.adb = adb
         self.logger = logger
         self.detector = detector
         self.package_name = package_name
         self.game_id = game_id
         self.vip_server_link = vip_server_link
+        self.phase_timeouts = {**self.PHASE_TIMEOUTS, **(phase_timeouts or {})}
+        
+        # Always target our package, needed when clones share the roblox:// scheme
+        self.pin_package = pin_package
+        
+        # Phase durations go to metrics; last_join_state is what verify saw
+        self.metrics = metrics
+        self.last_join_state: Optional[str] = None
+        
+        # Attempts after the first, and the backoff between them (doubles, jittered)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        
+        # Allowed rejoin strategies, tried fastest-first by their track record on this device
+        self.strategies = list(strategies or [COLD])
+        self.strategy_stats: Dict[str, StrategyStats] = {}
+        
+        # Join targets (main game/VIP link + backup servers), deep links resolved once here
+        self.server_pool = ServerPool.from_sources(
+            [vip_server_link or game_id] + list(servers or []),
+            self._parse_vip_server_link
+        )
+        self.joining: Optional[ServerTarget] = None
+        
+        # Called with the new target when a failover switches servers (set by the monitor)
+        self.on_switch: Optional[Callable[[ServerTarget], None]] = None
+    
+    def record_phase(self, phase: str, duration: float):
+        """
+        Report how long a rejoin phase took
+        
+        Args:
+            phase: kill, open_link, load or verify
+            duration: Seconds
+        """
+        if self.metrics is not None:
+            self.metrics.observe('rejoin_phase_seconds', duration, instance=self.package_name, phase=phase)
+    
+    def record_strategy(self, strategy: str, success: bool, duration: float):
+        """
+        Add one rejoin try to the strategy's track record
+        
+        Args:
+            strategy: dismiss, warm or cold
+            success: Whether it got back in game
+            duration: Seconds the try took
+        """
+        stats = self.strategy_stats.get(strategy)
+        if stats is None:
+            stats = self.strategy_stats[strategy] = StrategyStats(strategy)
+        stats.record(success, duration)
+        
+        if self.metrics is not None:
+            self.metrics.observe('rejoin_strategy_seconds', duration, instance=self.package_name,
+                                 strategy=strategy, result='success' if success else 'failed')
     
     def kill_roblox(self) -> bool:
         """
@@ -32,7 +111,11 @@ class RobloxLauncher:
             True if successful
         """
         self.logger.debug("Killing Roblox process...")
-        success = self.adb.force_stop_package(self.package_name)
+        success = self.adb.force_stop_package(self.package_name, self.phase_timeouts['kill'])
+        
+        # The relaunched app must be classified from a fresh dump
+        if self.detector.screen_cache is not None:
+            self.detector.screen_cache.invalidate()
         
         if success:
             self.logger.debug("Roblox killed successfully")
@@ -131,126 +214,201 @@ class RobloxLauncher:
             return link
 
     
-    def join_game_via_deeplink(self) -> bool:
+    def _resolve_link(self) -> Tuple[str, Optional[str]]:
         """
-        Join game using deep link (most reliable method)
-        Supports both regular game ID and VIP server links
+        Work out which link to open and which package should handle it
         
         Returns:
-            True if successful
+            (link, package filter or None)
         """
-        # Check if VIP server link is provided
-        if self.vip_server_link:
+        previous = self.server_pool.current
+        target = self.joining = self.server_pool.select()
+        
+        if target is not previous:
+            self.logger.warning(f"Switching server: {previous.label} → {target.label}")
+            if self.on_switch is not None:
+                self.on_switch(target)
+        
+        if target.is_vip:
             self.logger.info(f"Joining VIP server via link...")
-            # Parse and convert VIP link to direct format
-            link_to_open = self._parse_vip_server_link(self.vip_server_link)
         else:
-            self.logger.info(f"Joining game {self.game_id} via deep link...")
-            link_to_open = f"roblox://placeId={self.game_id}"
+            self.logger.info(f"Joining game {target.source} via deep link...")
+        
+        # Resolved once when the pool was built
+        link_to_open = target.link
         
-        # Open link (works for both deep links and web links)
         # Only use package filter for non-roblox:// URLs
         # roblox:// deep links are already app-specific
-        if link_to_open.startswith('roblox://'):
-            success = self.adb.open_url(link_to_open)
-        else:
-            success = self.adb.open_url(link_to_open, package_name=self.package_name)
+        if link_to_open.startswith('roblox://') and not self.pin_package:
+            return link_to_open, None
         
-        if success:
-            self.logger.success(f"Link opened: {link_to_open}")
-            
-            # Wait for game to load
-            self.logger.status("Waiting for game to load...")
-            time.sleep(10)  # Give time for game to load
+        return link_to_open, self.package_name
+    
+    def _find_play_button(self, snapshot: DeviceSnapshot) -> Optional[str]:
+        """
+        Find a Play/Join/Continue button text on screen
+        
+        Args:
+            snapshot: Tick snapshot
             
-            # Check if we need to click Play button
-            self._handle_play_button()
+        Returns:
+            Button text or None
+        """
+        for text in snapshot.screen_texts:
+            if text.lower() in self.PLAY_BUTTON_TEXTS:
+                return text
+        
+        return None
+    
+    def _is_load_settled(self, snapshot: DeviceSnapshot) -> bool:
+        """
+        Check if loading finished one way or another
+        
+        Args:
+            snapshot: Tick snapshot
             
+        Returns:
+            True if in game, disconnected, or waiting on a Play button
+        """
+        if self.detector.detect_state(snapshot) in ['in_game', 'disconnected']:
             return True
-        else:
-            self.logger.error("Failed to open deep link")
-            return False
+        
+        return self._find_play_button(snapshot) is not None
     
-    def _handle_play_button(self):
-        """Handle clicking Play button if present"""
-        # Get screen text
-        screen_texts = self.adb.get_screen_text()
+    def _handle_play_button(self, snapshot: Optional[DeviceSnapshot] = None) -> bool:
+        """
+        Handle clicking Play button if present
+        
+        Args:
+            snapshot: Tick snapshot to reuse (optional)
+            
+        Returns:
+            True if a button was tapped
+        """
+        snapshot = snapshot or self.detector.snapshot()
         
         # Look for Play button
-        for text in screen_texts:
-            if text.lower() in ['play', 'join', 'continue']:
-                self.logger.debug(f"Found button: {text}")
-                
-                # Get screen size for tapping
-                screen_size = self.adb.get_screen_size()
-                
-                if screen_size:
-                    width, height = screen_size
-                    
-                    # Tap center of screen (where Play button usually is)
-                    center_x = width // 2
-                    center_y = int(height * 0.6)  # Slightly below center
-                    
-                    self.logger.debug(f"Tapping Play button at ({center_x}, {center_y})")
-                    self.adb.tap(center_x, center_y)
-                    time.sleep(2)
+        text = self._find_play_button(snapshot)
+        
+        if not text:
+            return False
+        
+        self.logger.debug(f"Found button: {text}")
+        
+        # Tap the button itself when the UI dump gives its bounds
+        nodes = snapshot.find_nodes(lambda node: node.text.lower() in self.PLAY_BUTTON_TEXTS, limit=1)
+        target = nodes[0].center if nodes else None
+        
+        if target is None:
+            # Get screen size for tapping
+            screen_size = snapshot.screen_size
+            
+            if screen_size:
+                width, height = screen_size
                 
-                break
+                # Tap center of screen (where Play button usually is)
+                target = (width // 2, int(height * 0.6))  # Slightly below center
+        
+        if not target:
+            return False
+        
+        self.logger.debug(f"Tapping Play button at {target}")
+        return self.adb.tap(*target)
     
-    def launch_and_join(self, retry_count: int = 0, max_retries: int = 3) -> bool:
+    def record_join(self, success: bool, duration: float):
         """
-        Complete launch and join sequence
+        Add the result of a join through the last opened link to its server's history
         
         Args:
-            retry_count: Current retry attempt
-            max_retries: Maximum retry attempts
-            
+            success: Whether it got in game
+            duration: Seconds from opening the link to the result
+        """
+        target, self.joining = self.joining, None
+        if target is None:
+            return
+        
+        self.server_pool.record(target, success, duration)
+        
+        if self.metrics is not None and len(self.server_pool.targets) > 1:
+            self.metrics.observe('server_join_seconds', duration, instance=self.package_name,
+                                 server=target.label, result='success' if success else 'failed')
+    
+    def tap_reconnect(self) -> bool:
+        """
+        Tap the Reconnect button of a disconnect dialog
+        
         Returns:
-            True if successful
+            True if a button was found and tapped
         """
-        self.logger.info(f"Starting launch sequence (Attempt {retry_count + 1}/{max_retries + 1})...")
+        nodes = self.detector.snapshot().find_nodes(
+            lambda node: node.text.strip().lower() in self.RECONNECT_BUTTON_TEXTS and node.bounds is not None,
+            limit=1
+        )
         
-        try:
-            # Step 1: Kill existing Roblox
-            self.kill_roblox()
-            time.sleep(2)
-            
-            # Step 2: Join via deep link (this will launch Roblox automatically)
-            if not self.join_game_via_deeplink():
-                raise Exception("Failed to join via deep link")
-            
-            # Step 3: Wait and verify
-            self.logger.status("Verifying game join...")
-            time.sleep(5)
-            
-            # Check if we're in game or loading
-            state = self.detector.detect_state()
+        if not nodes:
+            return False
+        
+        self.logger.debug(f"Tapping {nodes[0].text} at {nodes[0].center}")
+        return self.adb.tap(*nodes[0].center)
+    
+    def retarget(self, game_id: str, vip_server_link: str, servers: Optional[List[str]] = None):
+        """
+        Switch to new join targets (live config reload)
+        
+        Targets kept from before keep their join history.
+        
+        Args:
+            game_id: Place ID
+            vip_server_link: VIP server link (wins over game_id)
+            servers: Backup VIP links / place IDs
+        """
+        pool = ServerPool.from_sources(
+            [vip_server_link or game_id] + list(servers or []),
+            self._parse_vip_server_link
+        )
+        known = {target.source: target for target in self.server_pool.targets}
+        pool.targets = [known.get(target.source, target) for target in pool.targets]
+        pool.current = pool.targets[0]
+        
+        self.game_id = game_id
+        self.vip_server_link = vip_server_link
+        self.server_pool = pool
+    
+    def strategy_order(self) -> List[str]:
+        """Allowed strategies, lowest expected time to success first"""
+        return rank_strategies(self.strategy_stats, self.strategies)
+    
+    def rejoin_machine(self, max_retries: Optional[int] = None) -> RejoinMachine:
+        """
+        Create a rejoin state machine for this launcher
+        
+        Args:
+            max_retries: Attempts after the first (default: self.max_retries)
             
-            if state in ['in_game', 'loading']:
-                self.logger.success("Successfully joined game!")
-                return True
-            else:
-                self.logger.warning(f"Unexpected state after join: {state}")
-                
-                # Retry if not at max
-                if retry_count < max_retries:
-                    self.logger.info(f"Retrying in 5 seconds...")
-                    time.sleep(5)
-                    return self.launch_and_join(retry_count + 1, max_retries)
-                else:
-                    return False
+        Returns:
+            Machine in its first state; drive it with step() or run()
+        """
+        return RejoinMachine(
+            self,
+            self.max_retries if max_retries is None else max_retries,
+            self.retry_delay,
+            self.max_retry_delay,
+            self.strategy_order()
+        )
+    
+    def launch_and_join(self, max_retries: Optional[int] = None) -> bool:
+        """
+        Complete launch and join sequence, blocking until it finishes
         
-        except Exception as e:
-            self.logger.error(f"Launch error: {e}")
+        Args:
+            max_retries: Maximum retry attempts (default: self.max_retries)
             
-            # Retry if not at max
-            if retry_count < max_retries:
-                self.logger.info(f"Retrying in 5 seconds...")
-                time.sleep(5)
-                return self.launch_and_join(retry_count + 1, max_retries)
-            else:
-                return False
+        Returns:
+            True if successful
+        """
+        return self.rejoin_machine(max_retries).run()
     
+    @tracing.traced('launcher')
     def rejoin_game(self) -> bool:
         """
         Rejoin game (wrapper for launch_and_join)
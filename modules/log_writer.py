@@ -0,0 +1,184 @@
+"""
+Log Writer Module
+Background thread that drains queued log records into the console and log files
+"""
+
+import gzip
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, TextIO, Tuple
+
+
+# (created, kind, message, args) as queued by ColoredLogger
+LogItem = Tuple[float, str, str, tuple]
+
+# Kinds written to the file and the level name they get there
+FILE_LEVELS = {
+    'DEBUG': 'DEBUG',
+    'INFO': 'INFO',
+    'WARNING': 'WARNING',
+    'ERROR': 'ERROR',
+    'CRITICAL': 'CRITICAL',
+    'SUCCESS': 'INFO',
+    'BANNER': 'INFO'
+}
+
+# Message prefixes that keep custom kinds recognizable in the file
+FILE_PREFIXES = {
+    'SUCCESS': 'SUCCESS: ',
+    'BANNER': 'BANNER: '
+}
+
+
+class LogWriter:
+    """Formats and writes log records off the calling thread, in batches"""
+    
+    # Most records formatted per write
+    BATCH_SIZE = 256
+    
+    def __init__(self, log_dir: str, name: str, console_format: Callable[[str, float, str], str],
+                 max_bytes: int = 5 * 1024 * 1024, stream: Optional[TextIO] = None):
+        """
+        Args:
+            log_dir: Directory for YYYYMMDD.log files
+            name: Logger name written on every file line
+            console_format: (kind, created, message) -> console text
+            max_bytes: Size at which the day's file is rotated (0 = never)
+            stream: Console stream (default: sys.stdout)
+        """
+        self.log_dir = log_dir
+        self.name = name
+        self.console_format = console_format
+        self.max_bytes = max_bytes
+        self.stream = stream
+        
+        self._queue: "queue.SimpleQueue[Optional[LogItem]]" = queue.SimpleQueue()
+        self._file: Optional[TextIO] = None
+        self._day: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+    
+    def put(self, item: LogItem):
+        """Queue a record (never blocks)"""
+        self._queue.put(item)
+    
+    def close(self, timeout: float = 5):
+        """Write everything still queued, then stop the thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        """Writer loop: block for one record, then take whatever else is queued"""
+        running = True
+        
+        while running:
+            batch: List[LogItem] = []
+            item = self._queue.get()
+            
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            if item is None:
+                running = False
+            
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    # Never let a log problem kill the writer
+                    print(f"Log write error: {e}", file=sys.stderr)
+        
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _format(self, message: str, args: tuple) -> str:
+        """Apply deferred %-style arguments"""
+        if not args:
+            return message
+        
+        try:
+            return message % args
+        except (TypeError, ValueError):
+            return f"{message} {args}"
+    
+    def _write(self, batch: List[LogItem]):
+        """Write one batch to the console and the log file"""
+        console = []
+        
+        for created, kind, message, args in batch:
+            text = self._format(message, args)
+            console.append(self.console_format(kind, created, text))
+            
+            if kind in FILE_LEVELS:
+                log_file = self._log_file(created)
+                stamp = datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M:%S')
+                log_file.write(f"{stamp} - {self.name} - {FILE_LEVELS[kind]} - "
+                               f"{FILE_PREFIXES.get(kind, '')}{text}\n")
+        
+        stream = self.stream or sys.stdout
+        stream.write('\n'.join(console) + '\n')
+        stream.flush()
+        
+        if self._file is not None:
+            self._file.flush()
+            
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate_size()
+    
+    def _path(self, day: str) -> str:
+        """Active log file of a day"""
+        return os.path.join(self.log_dir, f"{day}.log")
+    
+    def _log_file(self, created: float) -> TextIO:
+        """Open file for the record's day, rolling over at midnight"""
+        day = time.strftime('%Y%m%d', time.localtime(created))
+        
+        if day != self._day:
+            if self._file is not None:
+                self._file.close()
+                self._compress(self._path(self._day), self._path(self._day) + ".gz")
+            
+            self._day = day
+            self._file = open(self._path(day), 'a', encoding='utf-8')
+        
+        return self._file
+    
+    def _rotate_size(self):
+        """Move a full day file aside as YYYYMMDD.N.log.gz and start a new one"""
+        self._file.close()
+        
+        index = 1
+        while os.path.exists(os.path.join(self.log_dir, f"{self._day}.{index}.log.gz")):
+            index += 1
+        
+        self._compress(self._path(self._day), os.path.join(self.log_dir, f"{self._day}.{index}.log.gz"))
+        self._file = open(self._path(self._day), 'a', encoding='utf-8')
+    
+    @staticmethod
+    def _compress(source: str, target: str):
+        """gzip a finished log file and remove the original"""
+        try:
+            with open(source, 'rb') as src, gzip.open(target, 'ab') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(source)
+        except OSError as e:
+            print(f"Log compress error: {e}", file=sys.stderr)
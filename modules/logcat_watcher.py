@@ -0,0 +1,230 @@
+"""
+Logcat Watcher Module
+Background logcat reader that pushes disconnect/kick/teleport/crash events
+"""
+
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+from .logger import ColoredLogger, log_warning
+
+
+class LogcatEvent(NamedTuple):
+    """One matched logcat line"""
+    
+    kind: str
+    package: Optional[str]
+    pid: Optional[int]
+    line: str
+    timestamp: float
+
+
+class LogcatWatcher:
+    """Keeps one filtered logcat stream open and matches lines as they arrive"""
+    
+    # Event kind -> line patterns; a named group 'package' names the app directly,
+    # otherwise the line's PID is resolved to a package
+    DEFAULT_SIGNATURES = {
+        'crash': [
+            r"Process (?P<package>[\w.]+)(:\w+)? \(pid \d+\) has died",
+            r"Fatal signal \d+ \(SIG\w+\)",
+            r"FATAL EXCEPTION"
+        ],
+        'kicked': [
+            r"[Kk]icked (from|by)",
+            r"Kick message"
+        ],
+        'disconnected': [
+            r"Sending disconnect with reason",
+            r"[Ll]ost connection to (the )?(game )?server",
+            r"Disconnection Notification"
+        ],
+        'teleport': [
+            r"[Tt]eleport(ing)? to",
+            r"TeleportService"
+        ]
+    }
+    
+    # "I/Tag( 1234): message" (logcat -v brief)
+    BRIEF_PATTERN = re.compile(r'^[VDIWEFA]/[^(]*\(\s*(\d+)\):\s?(.*)$')
+    
+    # "(?P<name>" opening a named group
+    NAMED_GROUP = re.compile(r'\(\?P<\w+>')
+    
+    # Longest line kept; the rest is skipped so memory stays flat
+    MAX_LINE = 4096
+    
+    def __init__(self, on_event: Callable[[LogcatEvent], None],
+                 resolve_package: Optional[Callable[[int], Optional[str]]] = None,
+                 signatures: Optional[Dict[str, List[str]]] = None, serial: Optional[str] = None,
+                 logger: Optional[ColoredLogger] = None):
+        """
+        Args:
+            on_event: Called from the reader thread for every matched line
+            resolve_package: PID -> package name (optional)
+            signatures: Extra patterns per event kind, merged into the defaults
+            serial: adb serial of a remote device (default: this device's logcat)
+            logger: Device's logger for stream problems (default: print)
+        """
+        self.on_event = on_event
+        self.serial = serial
+        self.logger = logger
+        self.resolve_package = resolve_package
+        
+        merged = {kind: list(patterns) for kind, patterns in self.DEFAULT_SIGNATURES.items()}
+        for kind, patterns in (signatures or {}).items():
+            merged.setdefault(kind, []).extend(patterns)
+        
+        self.signatures = [(kind, re.compile(pattern)) for kind, patterns in merged.items()
+                           for pattern in patterns]
+        
+        # All patterns in one expression: logcat filters on-device (Android 7+).
+        # Its regex engine has no named groups, those stay on the Python side only
+        self.device_filter = '|'.join(
+            f"({self.NAMED_GROUP.sub('(', pattern.pattern)})" for _, pattern in self.signatures
+        )
+        self.use_device_filter = True
+        
+        self._process: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def command(self) -> List[str]:
+        """logcat command line (new lines only, brief format)"""
+        command = ["logcat", "-v", "brief", "-T", "1"]
+        
+        if self.serial is not None:
+            command = ["adb", "-s", self.serial] + command
+        
+        if self.use_device_filter:
+            command += ["-e", self.device_filter]
+        
+        return command
+    
+    def match(self, line: str) -> Optional[LogcatEvent]:
+        """
+        Match one logcat line against the signatures
+        
+        Args:
+            line: Line without trailing newline
+            
+        Returns:
+            Event or None
+        """
+        parsed = self.BRIEF_PATTERN.match(line)
+        pid = int(parsed.group(1)) if parsed else None
+        message = parsed.group(2) if parsed else line
+        
+        for kind, pattern in self.signatures:
+            found = pattern.search(message)
+            if not found:
+                continue
+            
+            package = found.groupdict().get('package')
+            if package is None and pid is not None and self.resolve_package is not None:
+                package = self.resolve_package(pid)
+            
+            return LogcatEvent(kind, package, pid, line, time.monotonic())
+        
+        return None
+    
+    def start(self):
+        """Start the reader thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="logcat-watcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the reader thread and kill logcat"""
+        self._stop.set()
+        self._kill()
+        
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    def _kill(self):
+        """Kill the logcat process group"""
+        process = self._process
+        
+        if process is not None and process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+    
+    def _run(self):
+        """Reader loop: keep logcat running, restarting it with backoff"""
+        delay = 1.0
+        
+        while not self._stop.is_set():
+            started = time.monotonic()
+            read_any = self._read_stream()
+            
+            if self._stop.is_set():
+                break
+            
+            # Exiting at once without output: this logcat likely has no -e option
+            if self.use_device_filter and not read_any and time.monotonic() - started < 2:
+                log_warning(self.logger, "logcat -e unavailable, filtering logcat lines locally")
+                self.use_device_filter = False
+                continue
+            
+            self._stop.wait(delay)
+            delay = 1.0 if time.monotonic() - started > 60 else min(delay * 2, 30)
+    
+    def _read_stream(self) -> bool:
+        """
+        Run logcat once and dispatch events until it exits or we stop
+        
+        Returns:
+            True if any line was read
+        """
+        try:
+            self._process = subprocess.Popen(
+                self.command(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            log_warning(self.logger, f"logcat error: {e}")
+            return False
+        
+        read_any = False
+        
+        try:
+            stream = self._process.stdout
+            
+            while not self._stop.is_set():
+                raw = stream.readline(self.MAX_LINE)
+                if not raw:
+                    break
+                
+                read_any = True
+                
+                # Drop the rest of an overlong line
+                while not raw.endswith(b'\n'):
+                    rest = stream.readline(self.MAX_LINE)
+                    if not rest:
+                        break
+                    raw = raw[:self.MAX_LINE - 1] + rest[-1:]
+                
+                event = self.match(raw.decode('utf-8', errors='replace').rstrip('\r\n'))
+                if event is not None:
+                    self.on_event(event)
+        finally:
+            self._kill()
+            self._process.stdout.close()
+            self._process.wait()
+            self._process = None
+        
+        return read_any
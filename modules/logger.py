@@ -4,42 +4,68 @@ Handles logging with colors and file output
 """
 
 import os
+import atexit
 import logging
+import time
 from datetime import datetime
+from typing import List, Optional
 from colorama import Fore, Back, Style, init
+from .log_writer import LogWriter
 
 # Initialize colorama
 init(autoreset=True)
 
 
+def log_warning(logger: Optional['ColoredLogger'], message: str):
+    """
+    Warning from a device helper
+    
+    Args:
+        logger: The device's logger, so fleet lines carry its name (None: plain print)
+        message: Text to report
+    """
+    if logger is not None:
+        logger.warning("%s", message)
+    else:
+        print(message)
+
+
 class ColoredLogger:
     """Custom logger with colored output"""
     
-    def __init__(self, name: str = "AutoRejoin", log_dir: str = "logs"):
+    # Console look per record kind: (color, label); label None = no timestamp/label
+    CONSOLE_STYLES = {
+        'DEBUG': (Fore.CYAN, "[DEBUG] "),
+        'INFO': (Fore.GREEN, "[INFO] "),
+        'WARNING': (Fore.YELLOW, "[WARNING] "),
+        'ERROR': (Fore.RED, "[ERROR] "),
+        'CRITICAL': (Fore.WHITE + Back.RED, "[CRITICAL] "),
+        'SUCCESS': (Fore.GREEN + Style.BRIGHT, "[SUCCESS] ✓ "),
+        'STATUS': (Fore.BLUE, None)
+    }
+    
+    def __init__(self, name: str = "AutoRejoin", log_dir: str = "logs", level: str = "DEBUG",
+                 max_bytes: int = 5 * 1024 * 1024, tag: str = ""):
+        """
+        Args:
+            name: Logger name (written on every file line)
+            log_dir: Directory for daily log files
+            level: Lowest level kept (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            max_bytes: Size at which a day's log file is rotated and gzipped
+            tag: Shown on every console line (tells devices of a fleet apart)
+        """
         self.name = name
         self.log_dir = log_dir
+        self.tag = f"[{tag}] " if tag else ""
+        self.set_level(level)
         
         # Create log directory
         os.makedirs(log_dir, exist_ok=True)
         
-        # Setup file logger
-        log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y%m%d')}.log")
-        
-        self.file_logger = logging.getLogger(name)
-        self.file_logger.setLevel(logging.DEBUG)
-        
-        # File handler
-        fh = logging.FileHandler(log_file, encoding='utf-8')
-        fh.setLevel(logging.DEBUG)
-        
-        # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        fh.setFormatter(formatter)
-        
-        self.file_logger.addHandler(fh)
+        # Formatting and all I/O happen on the writer thread; calls only enqueue
+        self.writer = LogWriter(log_dir, name, self._format_console, max_bytes)
+        self.writer.start()
+        atexit.register(self.close)
         
         # Stats
         self.stats = {
@@ -49,66 +75,90 @@ class ColoredLogger:
             'start_time': datetime.now()
         }
     
-    def _log_to_file(self, level: str, message: str):
-        """Log to file"""
-        if level == "DEBUG":
-            self.file_logger.debug(message)
-        elif level == "INFO":
-            self.file_logger.info(message)
-        elif level == "WARNING":
-            self.file_logger.warning(message)
-        elif level == "ERROR":
-            self.file_logger.error(message)
-        elif level == "CRITICAL":
-            self.file_logger.critical(message)
-    
-    def debug(self, message: str):
-        """Debug message"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"{Fore.CYAN}[{timestamp}] [DEBUG] {message}{Style.RESET_ALL}")
-        self._log_to_file("DEBUG", message)
-    
-    def info(self, message: str):
+    def set_level(self, level: str):
+        """
+        Change the lowest level kept
+        
+        Args:
+            level: DEBUG, INFO, WARNING, ERROR or CRITICAL
+        """
+        value = logging.getLevelName(str(level).upper())
+        
+        if not isinstance(value, int):
+            raise ValueError(f"Unknown log level: {level}")
+        
+        self.level = value
+    
+    def is_enabled_for(self, level: int) -> bool:
+        """
+        Check if a level passes the filter (guard expensive log arguments with it)
+        
+        Args:
+            level: logging.DEBUG, logging.INFO, ...
+            
+        Returns:
+            True if messages of that level are kept
+        """
+        return level >= self.level
+    
+    def _log(self, level: int, kind: str, message: str, args: tuple):
+        """Queue a record if its level passes (nothing is formatted here)"""
+        if level >= self.level:
+            self.writer.put((time.time(), kind, message, args))
+    
+    def _format_console(self, kind: str, created: float, message: str) -> str:
+        """Console text of one record (runs on the writer thread)"""
+        if kind == 'RAW':
+            return message
+        
+        if kind == 'BANNER':
+            border = "=" * 60
+            return f"\n{Fore.CYAN}{Style.BRIGHT}{border}\n{(self.tag + message).center(60)}\n{border}{Style.RESET_ALL}\n"
+        
+        color, label = self.CONSOLE_STYLES[kind]
+        
+        if label is None:
+            return f"{color}► {self.tag}{message}{Style.RESET_ALL}"
+        
+        timestamp = time.strftime('%H:%M:%S', time.localtime(created))
+        return f"{color}[{timestamp}] {label}{self.tag}{message}{Style.RESET_ALL}"
+    
+    def close(self):
+        """Flush queued records and stop the writer thread"""
+        self.writer.close()
+    
+    def debug(self, message: str, *args):
+        """Debug message (%-style args are only formatted if DEBUG is enabled)"""
+        self._log(logging.DEBUG, 'DEBUG', message, args)
+    
+    def info(self, message: str, *args):
         """Info message"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"{Fore.GREEN}[{timestamp}] [INFO] {message}{Style.RESET_ALL}")
-        self._log_to_file("INFO", message)
+        self._log(logging.INFO, 'INFO', message, args)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """Warning message"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"{Fore.YELLOW}[{timestamp}] [WARNING] {message}{Style.RESET_ALL}")
-        self._log_to_file("WARNING", message)
+        self._log(logging.WARNING, 'WARNING', message, args)
     
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """Error message"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"{Fore.RED}[{timestamp}] [ERROR] {message}{Style.RESET_ALL}")
-        self._log_to_file("ERROR", message)
+        self._log(logging.ERROR, 'ERROR', message, args)
     
-    def critical(self, message: str):
+    def critical(self, message: str, *args):
         """Critical message"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"{Fore.WHITE}{Back.RED}[{timestamp}] [CRITICAL] {message}{Style.RESET_ALL}")
-        self._log_to_file("CRITICAL", message)
+        self._log(logging.CRITICAL, 'CRITICAL', message, args)
     
-    def success(self, message: str):
+    def success(self, message: str, *args):
         """Success message (custom)"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"{Fore.GREEN}{Style.BRIGHT}[{timestamp}] [SUCCESS] ✓ {message}{Style.RESET_ALL}")
-        self._log_to_file("INFO", f"SUCCESS: {message}")
+        self._log(logging.INFO, 'SUCCESS', message, args)
     
     def banner(self, message: str):
         """Print banner"""
-        border = "=" * 60
-        print(f"\n{Fore.CYAN}{Style.BRIGHT}{border}")
-        print(f"{message.center(60)}")
-        print(f"{border}{Style.RESET_ALL}\n")
-        self._log_to_file("INFO", f"BANNER: {message}")
+        # Banners mark start/stop and show at every level
+        self._log(logging.CRITICAL, 'BANNER', message, ())
     
-    def status(self, message: str):
+    def status(self, message: str, *args):
         """Status update (no timestamp)"""
-        print(f"{Fore.BLUE}► {message}{Style.RESET_ALL}")
+        self._log(logging.INFO, 'STATUS', message, args)
     
     def increment_rejoin_attempt(self):
         """Increment rejoin attempt counter"""
@@ -122,22 +172,38 @@ class ColoredLogger:
         """Increment rejoin failed counter"""
         self.stats['rejoin_failed'] += 1
     
-    def print_stats(self):
-        """Print statistics"""
+    def _stats_rows(self) -> List[tuple]:
+        """Statistics as (label, value, value color) rows"""
         uptime = datetime.now() - self.stats['start_time']
         hours = int(uptime.total_seconds() // 3600)
         minutes = int((uptime.total_seconds() % 3600) // 60)
         
-        print(f"\n{Fore.CYAN}{'─' * 60}")
-        print(f"{Fore.YELLOW}{Style.BRIGHT}📊 STATISTICS")
-        print(f"{Fore.CYAN}{'─' * 60}")
-        print(f"{Fore.WHITE}Uptime:          {Fore.GREEN}{hours}h {minutes}m")
-        print(f"{Fore.WHITE}Rejoin Attempts: {Fore.YELLOW}{self.stats['rejoin_attempts']}")
-        print(f"{Fore.WHITE}Success:         {Fore.GREEN}{self.stats['rejoin_success']}")
-        print(f"{Fore.WHITE}Failed:          {Fore.RED}{self.stats['rejoin_failed']}")
+        rows = [
+            ("Uptime:", f"{hours}h {minutes}m", Fore.GREEN),
+            ("Rejoin Attempts:", self.stats['rejoin_attempts'], Fore.YELLOW),
+            ("Success:", self.stats['rejoin_success'], Fore.GREEN),
+            ("Failed:", self.stats['rejoin_failed'], Fore.RED)
+        ]
         
         if self.stats['rejoin_attempts'] > 0:
             success_rate = (self.stats['rejoin_success'] / self.stats['rejoin_attempts']) * 100
-            print(f"{Fore.WHITE}Success Rate:    {Fore.CYAN}{success_rate:.1f}%")
+            rows.append(("Success Rate:", f"{success_rate:.1f}%", Fore.CYAN))
+        
+        return rows
+    
+    def stats_text(self) -> str:
+        """Statistics as plain text (for replies that don't go to the console)"""
+        return "\n".join(f"{label:<17}{value}" for label, value, _ in self._stats_rows())
+    
+    def print_stats(self):
+        """Print statistics"""
+        lines = [
+            f"\n{Fore.CYAN}{'─' * 60}",
+            f"{Fore.YELLOW}{Style.BRIGHT}📊 {self.tag}STATISTICS",
+            f"{Fore.CYAN}{'─' * 60}"
+        ]
+        lines.extend(f"{Fore.WHITE}{label:<17}{color}{value}" for label, value, color in self._stats_rows())
+        lines.append(f"{Fore.CYAN}{'─' * 60}{Style.RESET_ALL}\n")
         
-        print(f"{Fore.CYAN}{'─' * 60}{Style.RESET_ALL}\n")
+        # Through the queue so it stays in order with log lines
+        self.writer.put((time.time(), 'RAW', "\n".join(lines), ()))
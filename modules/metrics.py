@@ -0,0 +1,289 @@
+"""
+Metrics Module
+Fixed-memory histograms and counters exported as Prometheus textfile and JSON
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds; covers shell commands through slow rejoin phases
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Seconds; disconnect-to-in-game downtime
+DOWNTIME_BUCKETS = (5, 10, 20, 30, 45, 60, 90, 120, 180, 300, 600, 1200, 1800, 3600)
+
+# States that start a downtime period (ended by the next 'in_game')
+DOWN_STATES = ('disconnected', 'not_running')
+
+# Prefix of every exported metric name
+NAMESPACE = "autorejoin"
+
+# (metric name, sorted label pairs)
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _escape(value: str) -> str:
+    """Label value as the text exposition format requires (\\, " and newline escaped)"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Bucketed distribution; memory is fixed by the bucket count"""
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        """Record one value"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by interpolating inside its bucket
+        
+        Args:
+            q: Quantile between 0 and 1
+            
+        Returns:
+            Estimated value or None without observations
+        """
+        if self.count == 0:
+            return None
+        
+        rank = q * self.count
+        seen = 0
+        
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        
+        return self.max
+    
+    def to_dict(self) -> dict:
+        """Summary for the JSON export"""
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([str(bound) for bound in self.bounds] + ['+Inf'], self.counts))
+        }
+
+
+class Metrics:
+    """Registry of histograms and counters, plus per-instance state timing"""
+    
+    # Histogram name -> buckets (others use LATENCY_BUCKETS)
+    BUCKETS = {
+        'downtime_seconds': DOWNTIME_BUCKETS
+    }
+    
+    # Help texts for the Prometheus export
+    HELP = {
+        'command_seconds': "Shell command latency by command",
+        'command_timeouts_total': "Shell commands killed at their timeout, by command",
+        'commands_refused_total': "Shell commands not run (circuit_open, duplicate), by command",
+        'detect_seconds': "detect_state() latency",
+        'rejoin_phase_seconds': "Rejoin phase duration (kill, dismiss, open_link, load, verify)",
+        'rejoin_strategy_seconds': "Rejoin try duration by strategy (dismiss, warm, cold) and result",
+        'server_join_seconds': "Join duration by pool server and result",
+        'downtime_seconds': "Time from disconnect/crash to back in game",
+        'state_seconds_total': "Time spent in each detected state",
+        'rejoins_total': "Rejoin attempts by result"
+    }
+    
+    def __init__(self):
+        self.started = time.time()
+        self._histograms: Dict[SeriesKey, Histogram] = {}
+        self._counters: Dict[SeriesKey, float] = {}
+        
+        # Reentrant: state tracking holds it while adding to counters and histograms
+        self._lock = threading.RLock()
+        
+        # instance -> (state, monotonic time it was entered)
+        self._states: Dict[str, Tuple[str, float]] = {}
+        
+        # instance -> monotonic time the current downtime started
+        self._down_since: Dict[str, float] = {}
+    
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> SeriesKey:
+        """Series key with labels in a stable order"""
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+    
+    def observe(self, name: str, value: float, **labels):
+        """
+        Record a value in a histogram
+        
+        Args:
+            name: Histogram name
+            value: Observed value
+            **labels: Series labels
+        """
+        key = self._key(name, labels)
+        
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.BUCKETS.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+    
+    def inc(self, name: str, amount: float = 1, **labels):
+        """
+        Add to a counter
+        
+        Args:
+            name: Counter name
+            amount: Increment
+            **labels: Series labels
+        """
+        key = self._key(name, labels)
+        
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+    
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observe the duration of a with-block in a histogram"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start, **labels)
+    
+    def record_state(self, instance: str, state: str):
+        """
+        Track time per state and disconnect-to-in-game downtime
+        
+        Args:
+            instance: Instance label
+            state: State just detected
+        """
+        with self._lock:
+            now = time.monotonic()
+            previous = self._states.get(instance)
+            
+            if previous is not None:
+                self.inc('state_seconds_total', now - previous[1], instance=instance, state=previous[0])
+            
+            self._states[instance] = (state, now)
+            
+            if state == 'in_game':
+                down_since = self._down_since.pop(instance, None)
+                if down_since is not None:
+                    self.observe('downtime_seconds', now - down_since, instance=instance)
+            elif state in DOWN_STATES:
+                self._down_since.setdefault(instance, now)
+    
+    def _flush_states(self):
+        """Credit time in the current states up to now (before an export)"""
+        with self._lock:
+            for instance, (state, _) in list(self._states.items()):
+                self.record_state(instance, state)
+    
+    def quantile(self, name: str, q: float, **labels) -> Optional[float]:
+        """Quantile of one histogram series (None if empty)"""
+        histogram = self._histograms.get(self._key(name, labels))
+        return histogram.quantile(q) if histogram is not None else None
+    
+    def to_dict(self) -> dict:
+        """All series for the JSON export"""
+        self._flush_states()
+        
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'uptime_seconds': round(time.time() - self.started, 3),
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                    for (name, labels), histogram in sorted(self._histograms.items())
+                ],
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': round(value, 6)}
+                    for (name, labels), value in sorted(self._counters.items())
+                ]
+            }
+    
+    @staticmethod
+    def _labels(labels: Sequence[Tuple[str, str]], extra: str = "") -> str:
+        """Prometheus label set"""
+        parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+    
+    def to_prometheus(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        self._flush_states()
+        lines: List[str] = []
+        described = set()
+        
+        def describe(name: str, kind: str):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {NAMESPACE}_{name} {self.HELP.get(name, name)}")
+                lines.append(f"# TYPE {NAMESPACE}_{name} {kind}")
+        
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                describe(name, "histogram")
+                cumulative = 0
+                
+                for bound, bucket_count in zip(list(histogram.bounds) + ['+Inf'], histogram.counts):
+                    cumulative += bucket_count
+                    bucket_labels = self._labels(labels, f'le="{bound}"')
+                    lines.append(f"{NAMESPACE}_{name}_bucket{bucket_labels} {cumulative}")
+                
+                lines.append(f"{NAMESPACE}_{name}_sum{self._labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{NAMESPACE}_{name}_count{self._labels(labels)} {histogram.count}")
+            
+            for (name, labels), value in sorted(self._counters.items()):
+                describe(name, "counter")
+                lines.append(f"{NAMESPACE}_{name}{self._labels(labels)} {value:.6f}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def export(self, path_prefix: str) -> bool:
+        """
+        Write <prefix>.prom (node_exporter textfile) and <prefix>.json atomically
+        
+        Args:
+            path_prefix: Output path without extension
+            
+        Returns:
+            True if both files were written
+        """
+        try:
+            directory = os.path.dirname(path_prefix)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            for extension, content in (('.prom', self.to_prometheus()),
+                                       ('.json', json.dumps(self.to_dict(), indent=2))):
+                temp_path = f"{path_prefix}{extension}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(temp_path, path_prefix + extension)
+        except OSError as e:
+            print(f"Metrics export failed: {e}")
+            return False
+        
+        return True
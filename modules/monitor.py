@@ -3,150 +3,1152 @@ Monitor Module
 Main monitoring loop for AutoRejoin
 """
 
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import signal
+import threading
 import time
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 from .adb_helper import ADBHelper
+from .command_guard import CommandGuard, record_refusals
 from .logger import ColoredLogger
+from .config_loader import ConfigLoader
+from .control import ControlServer
 from .detector import RobloxDetector
+from .keyword_matcher import KeywordMatcher
 from .launcher import RobloxLauncher
+from .rejoin import STRATEGIES, StrategyStats
+from .server_pool import ServerTarget
+from .instance import RobloxInstance
+from .scheduler import CheckScheduler
+from .metrics import Metrics
+from .wait import backoff_delay
+from . import tracing
+from .screen_cache import ScreenCache
+from .screenshot import ScreenshotManager
+from . import pixel_classifier
+from .pixel_classifier import PixelClassifier
+from .snapshot import DeviceSnapshot
+from .logcat_watcher import LogcatEvent, LogcatWatcher
+from .process_tracker import ProcessTracker
+from .async_adb import AsyncADBHelper, AsyncDeviceSnapshot
+from .async_roblox import AsyncRobloxDetector, AsyncRobloxLauncher
 
 
 class RobloxMonitor:
     """Monitors Roblox and handles auto-rejoin"""
     
-    def __init__(self, config: dict, logger: ColoredLogger):
+    # Settings fixed at startup; a config reload keeps their old value
+    RESTART_KEYS = (
+        'roblox_package', 'shell_backend', 'async_mode', 'probe_script', 'proc_scan',
+        'screen_fingerprint', 'ui_dump_max_age', 'pixel_classifier', 'pixel_signatures',
+        'logcat_watch', 'logcat_signatures', 'log_max_bytes', 'profile', 'config_reload',
+        'control_socket', 'screenshot_on_error', 'screenshot_buffer', 'screenshot_dir',
+        'device_serial'
+    )
+    
+    # Seconds between config file change checks
+    CONFIG_CHECK_INTERVAL = 5
+    
+    # Seconds a control command waits for the loop to run it
+    COMMAND_TIMEOUT = 10
+    
+    def __init__(self, config: dict, logger: ColoredLogger, config_loader: Optional[ConfigLoader] = None):
+        """
+        Args:
+            config: Configuration dictionary
+            logger: Logger
+            config_loader: Where config came from; with 'config_reload' its
+                file is watched and edits are applied while running
+        """
         self.config = config
         self.logger = logger
         
-        # Initialize components
-        self.adb = ADBHelper()
-        self.detector = RobloxDetector(
-            self.adb, 
-            self.logger, 
-            config['roblox_package']
+        # Live reload: config file mtime checked from the loop
+        self.config_loader = config_loader if config.get('config_reload', False) else None
+        self._config_checked_at = time.monotonic()
+        
+        # Initialize components; the guard backs off every command while the device hangs
+        guard = CommandGuard(
+            config.get('command_timeouts'),
+            config.get('breaker_threshold', 3),
+            max_open_seconds=config.get('breaker_max_open', 120)
+        )
+        guard.on_change = self._on_breaker_change
+        
+        # device_serial: drive a phone over adb instead of the one we run on (set per device by Fleet)
+        self.adb = ADBHelper(config.get('shell_backend', 'subprocess'), guard, config.get('device_serial') or None,
+                             logger)
+        
+        # Latency/downtime histograms; written to disk only if metrics_path is set
+        self.metrics = Metrics()
+        self.adb.metrics = self.metrics
+        self.metrics_path = config.get('metrics_path', '')
+        self.metrics_interval = config.get('metrics_interval', 60)
+        self._metrics_exported_at = time.monotonic()
+        
+        # Chrome trace written at shutdown when --profile enabled tracing
+        self.trace_path = config.get('trace_path', 'logs/trace.json')
+        
+        # One probe-script call per tick instead of pidof + dumpsys + uiautomator + wm
+        if config.get('probe_script', False):
+            self.adb.install_probe()
+        
+        # Liveness checks straight from /proc (rooted devices)
+        if config.get('proc_scan', False):
+            self.adb.enable_process_tracker()
+        
+        # Skip the UI dump while raw screencap fingerprints show an unchanged screen
+        self.screen_fingerprint = config.get('screen_fingerprint', False)
+        
+        # Last raw frames in memory, written as PNG when a disconnect is seen or a rejoin fails
+        self.screenshots: Optional[ScreenshotManager] = None
+        if config.get('screenshot_on_error', False):
+            self.screenshots = ScreenshotManager(
+                self.adb,
+                logger,
+                config.get('screenshot_dir', 'logs/screenshots'),
+                buffer_frames=config.get('screenshot_buffer', 3),
+                max_disk_bytes=int(config.get('screenshot_quota_mb', 50) * 1024 * 1024)
+            )
+            self.adb.on_frame = self.screenshots.add_frame
+        
+        # Raw-frame state detection, shared by every instance (needs NumPy)
+        self.pixel_classifier = self._build_pixel_classifier(config)
+        
+        # Rejoin strategies allowed, and where their per-device track record is kept
+        self.rejoin_strategies = self._rejoin_strategies(config)
+        self.strategy_stats_path = config.get('strategy_stats_path', '')
+        
+        # One instance per configured package (legacy single-package config = one instance)
+        specs = self._instance_specs(config)
+        self.multi_instance = len(specs) > 1
+        self.instances = [self._build_instance(spec) for spec in specs]
+        self._load_strategy_stats()
+        
+        # First instance doubles as the single-package API
+        self.detector = self.instances[0].detector
+        self.launcher = self.instances[0].launcher
+        
+        # Adaptive polling: faster while loading, slower in a long stable session
+        self.scheduler = CheckScheduler(
+            config['check_interval'],
+            config.get('min_check_interval'),
+            config.get('max_check_interval'),
+            config.get('adaptive_polling', False)
+        )
+        self.is_running = False
+        self._stopped = False
+        
+        # Push-based detection: logcat events wake the loop instead of waiting for the tick
+        self.logcat_watcher: Optional[LogcatWatcher] = None
+        self._events = collections.deque()
+        self._wake = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake_async: Optional[asyncio.Event] = None
+        
+        # Off when several monitors share one process (Fleet owns SIGINT/SIGTERM then)
+        self.handle_signals = True
+        
+        if config.get('logcat_watch', False):
+            # PIDs can only be looked up in our own /proc, remote lines go by package name
+            resolve_pid = None
+            if self.adb.device_id is None:
+                self._pid_names = self.adb.process_tracker or ProcessTracker()
+                resolve_pid = self._resolve_pid
+            
+            self.logcat_watcher = LogcatWatcher(
+                self._on_logcat_event,
+                resolve_pid,
+                config.get('logcat_signatures'),
+                self.adb.device_id,
+                self.logger
+            )
+        
+        # Control socket: status from cached state, commands queued to the loop thread
+        self.control: Optional[ControlServer] = None
+        self._commands = collections.deque()
+        self.started_at = time.monotonic()
+        
+        if config.get('control_socket'):
+            self.control = ControlServer(config['control_socket'], self._control_handlers())
+    
+    def _instance_specs(self, config: dict) -> List[dict]:
+        """
+        Get instance definitions from config
+        
+        Args:
+            config: Configuration dictionary
+            
+        Returns:
+            List of {name, package, game_id, vip_server_link, servers}
+        """
+        if not config.get('instances'):
+            return [{
+                'name': config['roblox_package'],
+                'package': config['roblox_package'],
+                'game_id': config.get('game_id', ''),
+                'vip_server_link': config.get('vip_server_link', ''),
+                'servers': config.get('servers', [])
+            }]
+        
+        specs = []
+        for entry in config['instances']:
+            package = entry.get('package', config['roblox_package'])
+            specs.append({
+                'name': entry.get('name', package),
+                'package': package,
+                'game_id': entry.get('game_id', ''),
+                'vip_server_link': entry.get('vip_server_link', ''),
+                'servers': entry.get('servers', [])
+            })
+        
+        names = [spec['name'] for spec in specs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Instance names must be unique: {names}")
+        
+        return specs
+    
+    def _rejoin_strategies(self, config: dict) -> List[str]:
+        """
+        Read the allowed rejoin strategies from config
+        
+        Args:
+            config: Configuration dictionary
+            
+        Returns:
+            Known strategies from 'rejoin_strategies' (default: cold start only)
+        """
+        strategies = []
+        
+        for strategy in config.get('rejoin_strategies') or ['cold']:
+            if strategy in STRATEGIES:
+                strategies.append(strategy)
+            else:
+                self.logger.warning(f"Unknown rejoin strategy '{strategy}' (use {', '.join(STRATEGIES)})")
+        
+        return strategies or ['cold']
+    
+    def _load_strategy_stats(self):
+        """Restore each instance's strategy track record from strategy_stats_path"""
+        if not self.strategy_stats_path or not os.path.exists(self.strategy_stats_path):
+            return
+        
+        try:
+            with open(self.strategy_stats_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read strategy stats: {e}")
+            return
+        
+        for instance in self.instances:
+            for strategy, data in saved.get(instance.package_name, {}).items():
+                if strategy in STRATEGIES:
+                    instance.launcher.strategy_stats[strategy] = StrategyStats.from_dict(strategy, data)
+    
+    def _save_strategy_stats(self):
+        """Write every instance's strategy track record (atomic replace)"""
+        if not self.strategy_stats_path:
+            return
+        
+        data = {
+            instance.package_name: {
+                strategy: stats.to_dict() for strategy, stats in instance.launcher.strategy_stats.items()
+            }
+            for instance in self.instances
+        }
+        
+        try:
+            directory = os.path.dirname(self.strategy_stats_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            temp_path = self.strategy_stats_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.strategy_stats_path)
+        except OSError as e:
+            self.logger.warning(f"Could not save strategy stats: {e}")
+    
+    def _build_pixel_classifier(self, config: dict) -> Optional[PixelClassifier]:
+        """
+        Create the pixel classifier if enabled in config
+        
+        Args:
+            config: Configuration dictionary
+            
+        Returns:
+            Classifier, or None if disabled, without signatures or NumPy is missing
+        """
+        if not config.get('pixel_classifier', False):
+            return None
+        
+        if not pixel_classifier.is_available():
+            self.logger.warning("pixel_classifier needs NumPy (pip install numpy), using UI text only")
+            return None
+        
+        if not config.get('pixel_signatures'):
+            self.logger.warning("pixel_classifier has no pixel_signatures configured, using UI text only")
+            return None
+        
+        return PixelClassifier(config['pixel_signatures'])
+    
+    def _build_instance(self, spec: dict) -> RobloxInstance:
+        """
+        Create detector and launcher for one instance
+        
+        Args:
+            spec: Instance definition
+            
+        Returns:
+            Instance
+        """
+        detector = RobloxDetector(
+            self.adb,
+            self.logger,
+            spec['package'],
+            self._keyword_matcher(spec['game_id']),
+            ui_requires_foreground=self.multi_instance,
+            screen_cache=ScreenCache(self.config.get('ui_dump_max_age', 60)) if self.screen_fingerprint else None,
+            pixel_classifier=self.pixel_classifier
         )
-        self.launcher = RobloxLauncher(
+        launcher = RobloxLauncher(
             self.adb,
             self.logger,
-            self.detector,
-            config['roblox_package'],
-            config['game_id'],
-            config.get('vip_server_link', '')
+            detector,
+            spec['package'],
+            spec['game_id'],
+            spec['vip_server_link'],
+            self.config.get('phase_timeouts'),
+            pin_package=self.multi_instance,
+            metrics=self.metrics,
+            retry_delay=self.config.get('retry_delay', 5),
+            max_retry_delay=self.config.get('max_retry_delay', 300),
+            strategies=self.rejoin_strategies,
+            servers=spec['servers']
         )
         
-        # State tracking
-        self.last_state = None
-        self.consecutive_failures = 0
-        self.is_running = False
+        instance = RobloxInstance(
+            spec['name'],
+            spec['package'],
+            spec['game_id'],
+            spec['vip_server_link'],
+            detector,
+            launcher
+        )
+        launcher.on_switch = lambda target: self._follow_server(instance, target)
+        return instance
+    
+    def _keyword_matcher(self, game_id: str) -> KeywordMatcher:
+        """Keyword matcher for an instance (place-specific packs follow its own game)"""
+        matcher_config = {**self.config, 'game_id': game_id}
+        return KeywordMatcher.from_config(matcher_config, RobloxDetector.default_keywords())
     
-    def check_and_rejoin(self) -> bool:
+    def _follow_server(self, instance: RobloxInstance, target: ServerTarget):
+        """
+        Use the place keyword pack of the server an instance joins (failover can change place)
+        
+        Args:
+            instance: Instance
+            target: Server it joins now (share links without a place keep the configured game)
+        """
+        game_id = target.place_id or instance.game_id
+        instance.detector.matcher = self._keyword_matcher(game_id)
+    
+    def _interval_text(self) -> str:
+        """Check interval for the startup banner"""
+        scheduler = self.scheduler
+        if not scheduler.adaptive:
+            return f"{scheduler.interval}s"
+        return f"{scheduler.interval}s (adaptive {scheduler.min_interval}-{scheduler.max_interval}s)"
+    
+    def _prefix(self, instance: RobloxInstance) -> str:
+        """Log prefix naming the instance (empty with a single instance)"""
+        return f"[{instance.name}] " if self.multi_instance else ""
+    
+    def snapshot(self) -> DeviceSnapshot:
+        """
+        Start a device snapshot shared by every instance for one tick
+        
+        Returns:
+            Snapshot that lists processes once for all packages
+        """
+        packages = [instance.package_name for instance in self.instances]
+        
+        # Fingerprinting decides per instance whether a UI dump is needed
+        return DeviceSnapshot(self.adb, packages, ui=not self.screen_fingerprint)
+    
+    @tracing.traced('monitor')
+    def check_and_rejoin(self, instance: Optional[RobloxInstance] = None,
+                         snapshot: Optional[DeviceSnapshot] = None) -> bool:
         """
         Check state and rejoin if needed
         
+        Args:
+            instance: Instance to check (default: first instance)
+            snapshot: Shared tick snapshot (optional)
+            
         Returns:
-            True if action taken
+            True if action taken (later checks in the tick need a fresh snapshot)
         """
+        instance = instance or self.instances[0]
+        
+        # Device not answering: hold everything until the breaker allows a trial command
+        if self.adb.guard.open_remaining() > 0:
+            return False
+        
+        # A running rejoin owns the instance: advance it by one step
+        if instance.rejoin is not None:
+            self._step_rejoin(instance)
+            return True
+        
+        # Cooling down after too many failed rejoins, or paused from the control socket
+        if instance.in_cooldown() or instance.paused:
+            return False
+        
         # Detect current state
-        state = self.detector.detect_state()
+        with record_refusals() as refused:
+            with self.metrics.timer('detect_seconds', instance=instance.package_name):
+                state = instance.detector.detect_state(snapshot)
+        
+        if refused:
+            self.logger.debug("%sCheck discarded, commands refused: %s", self._prefix(instance),
+                              ', '.join(sorted(set(refused))))
+            # The shared snapshot holds the missing facts; don't hand them to the next instance
+            return True
+        
+        reason = self._handle_state(instance, state)
+        
+        if reason:
+            self._start_rejoin(instance, reason)
+            instance.rejoin = instance.launcher.rejoin_machine()
+            self._step_rejoin(instance)
+            return True
+        
+        return False
+    
+    def _next_delay(self, instance: RobloxInstance) -> Optional[float]:
+        """
+        Seconds until an instance needs the loop again
+        
+        Args:
+            instance: Checked instance
+            
+        Returns:
+            Breaker pause, rejoin step or cooldown delay, or None for the normal check interval
+        """
+        held = self.adb.guard.open_remaining()
+        if held > 0:
+            return held
+        
+        if instance.rejoin is not None:
+            return instance.rejoin.delay()
+        
+        if instance.in_cooldown():
+            return instance.cooldown_until - time.monotonic()
+        
+        return None
+    
+    def _handle_state(self, instance: RobloxInstance, state: str) -> Optional[str]:
+        """
+        Log a detected state and decide whether to rejoin
+        
+        Args:
+            instance: Checked instance
+            state: Detected state
+            
+        Returns:
+            Rejoin reason, or None if no action is needed
+        """
+        prefix = self._prefix(instance)
+        self.metrics.record_state(instance.package_name, state)
+        self.scheduler.observe(instance.name, state)
         
         # Log state change
-        if state != self.last_state:
-            self.logger.info(f"State changed: {self.last_state} → {state}")
-            self.last_state = state
+        if state != instance.last_state:
+            self.logger.info(f"{prefix}State changed: {instance.last_state} → {state}")
+            instance.last_state = state
         
         # Handle states
         if state == 'not_running':
-            self.logger.warning("⚠️  Roblox not running!")
-            return self._handle_rejoin("Roblox crashed or closed")
+            self.logger.warning(f"{prefix}⚠️  Roblox not running!")
+            return "Roblox crashed or closed"
         
         elif state == 'disconnected':
-            self.logger.warning("⚠️  Disconnected from game!")
-            return self._handle_rejoin("Disconnected")
+            self.logger.warning(f"{prefix}⚠️  Disconnected from game!")
+            self._screenshot_on_error(instance, "disconnected")
+            return "Disconnected"
         
         elif state == 'in_game':
             # All good, reset failure counter
-            if self.consecutive_failures > 0:
-                self.logger.success("Back in game, resetting failure counter")
-                self.consecutive_failures = 0
-            return False
+            if instance.consecutive_failures > 0:
+                self.logger.success(f"{prefix}Back in game, resetting failure counter")
+                instance.consecutive_failures = 0
+            return None
         
         elif state == 'loading':
-            self.logger.debug("Game is loading...")
-            return False
+            self.logger.debug("%sGame is loading...", prefix)
+            return None
+        
+        elif state == 'background':
+            self.logger.debug("%sRunning in background", prefix)
+            return None
         
         else:
-            self.logger.debug(f"Unknown state: {state}")
-            return False
+            self.logger.debug("%sUnknown state: %s", prefix, state)
+            return None
     
-    def _handle_rejoin(self, reason: str) -> bool:
+    def _step_rejoin(self, instance: RobloxInstance):
         """
-        Handle rejoin logic
+        Run one step of an instance's rejoin and record the result once it ends
         
         Args:
-            reason: Reason for rejoin
+            instance: Instance being rejoined
+        """
+        machine = instance.rejoin
+        machine.step()
+        
+        if not machine.done:
+            return
+        
+        instance.rejoin = None
+        
+        if instance.initial_join:
+            # Not a rejoin: kept out of the stats, a failed join is caught by the next check
+            instance.initial_join = False
+            instance.last_rejoin_at = time.monotonic()
+        else:
+            self._finish_rejoin(instance, machine.succeeded)
+    
+    def _start_rejoin(self, instance: RobloxInstance, reason: str):
+        """Count and log a rejoin attempt"""
+        self.logger.increment_rejoin_attempt()
+        self.logger.warning(f"{self._prefix(instance)}🔄 Attempting to rejoin... (Reason: {reason})")
+    
+    def _finish_rejoin(self, instance: RobloxInstance, success: bool) -> bool:
+        """
+        Record a rejoin result
+        
+        Args:
+            instance: Rejoined instance
+            success: Whether the rejoin worked
             
         Returns:
-            True if rejoin attempted
+            True if too many consecutive failures started a cooldown (cooldown_until)
         """
-        self.logger.increment_rejoin_attempt()
-        self.logger.warning(f"🔄 Attempting to rejoin... (Reason: {reason})")
+        prefix = self._prefix(instance)
+        
+        # logcat lines up to now came from the rejoin itself
+        instance.last_rejoin_at = time.monotonic()
+        self._save_strategy_stats()
         
-        # Attempt rejoin
-        success = self.launcher.rejoin_game()
+        self.metrics.inc('rejoins_total', instance=instance.package_name,
+                         result='success' if success else 'failed')
         
         if success:
+            # Verified state ends the downtime now rather than at the next check
+            if instance.launcher.last_join_state:
+                self.metrics.record_state(instance.package_name, instance.launcher.last_join_state)
+            
             self.logger.increment_rejoin_success()
-            self.logger.success("✓ Successfully rejoined!")
-            self.consecutive_failures = 0
+            self.logger.success(f"{prefix}✓ Successfully rejoined!")
+            instance.consecutive_failures = 0
+            return False
+        
+        self.logger.increment_rejoin_failed()
+        self.logger.error(f"{prefix}✗ Failed to rejoin")
+        self._screenshot_on_error(instance, "rejoin_failed")
+        instance.consecutive_failures += 1
+        
+        # Check if too many failures: hold checks, backing off like the retries do
+        if instance.consecutive_failures >= self.config['max_retries']:
+            self.logger.critical(f"{prefix}⚠️  Too many consecutive failures ({instance.consecutive_failures})")
+            
+            launcher = instance.launcher
+            cooldown = backoff_delay(instance.consecutive_failures, launcher.retry_delay, launcher.max_retry_delay)
+            self.logger.warning(f"{prefix}Waiting {cooldown:.0f} seconds before next attempt...")
+            
+            instance.cooldown_until = time.monotonic() + cooldown
+            instance.consecutive_failures = 0
             return True
+        
+        return False
+    
+    def _check_config_reload(self):
+        """Apply deferred game targets, and reload the config file if it was edited"""
+        self._apply_pending_targets()
+        
+        if self.config_loader is None:
+            return
+        
+        now = time.monotonic()
+        if now - self._config_checked_at < self.CONFIG_CHECK_INTERVAL:
+            return
+        self._config_checked_at = now
+        
+        if not self.config_loader.changed():
+            return
+        
+        try:
+            config = self.config_loader.load()
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Config reload skipped: {e}")
+            return
+        
+        applied = self.apply_config(config)
+        if applied:
+            self.logger.info(f"🔧 Config reloaded: {', '.join(applied)}")
+    
+    def apply_config(self, config: dict) -> List[str]:
+        """
+        Apply an edited configuration to the running monitor
+        
+        Check intervals, retry/backoff settings, phase timeouts, strategies,
+        log level, keyword packs and game targets change in place. The ADB
+        connection is kept, and a running rejoin finishes on its old target
+        before the instance switches. RESTART_KEYS keep their old value.
+        
+        Args:
+            config: New configuration
+            
+        Returns:
+            Keys whose new value took effect
+        """
+        changed = sorted(key for key in set(config) | set(self.config) if config.get(key) != self.config.get(key))
+        restart = [key for key in changed if key in self.RESTART_KEYS]
+        
+        for key in restart:
+            if key in self.config:
+                config[key] = self.config[key]
+            else:
+                config.pop(key, None)
+        
+        # Instances are matched by name; adding, removing or renaming one needs a restart
+        try:
+            specs = self._instance_specs(config)
+        except ValueError as e:
+            self.logger.warning(f"Config reload skipped: {e}")
+            return []
+        
+        if [(spec['name'], spec['package']) for spec in specs] != [(i.name, i.package_name) for i in self.instances]:
+            restart.append('instances')
+            config['instances'] = self.config.get('instances', [])
+            specs = self._instance_specs(config)
+        
+        if restart:
+            self.logger.warning(f"Restart needed to change: {', '.join(restart)}")
+        
+        if config.get('log_level') != self.config.get('log_level'):
+            try:
+                self.logger.set_level(config.get('log_level', 'INFO'))
+            except ValueError as e:
+                self.logger.warning(f"{e}, keeping {self.config.get('log_level')}")
+                config['log_level'] = self.config.get('log_level')
+        
+        old_specs = self._instance_specs(self.config)
+        self.config = config
+        
+        self.scheduler.configure(
+            config.get('check_interval', self.scheduler.interval),
+            config.get('min_check_interval'),
+            config.get('max_check_interval'),
+            config.get('adaptive_polling', False)
+        )
+        self.metrics_path = config.get('metrics_path', '')
+        self.metrics_interval = config.get('metrics_interval', 60)
+        self.trace_path = config.get('trace_path', 'logs/trace.json')
+        self.strategy_stats_path = config.get('strategy_stats_path', '')
+        self.rejoin_strategies = self._rejoin_strategies(config)
+        if self.screenshots is not None:
+            self.screenshots.max_disk_bytes = int(config.get('screenshot_quota_mb', 50) * 1024 * 1024)
+        
+        guard = self.adb.guard
+        guard.timeouts = {**guard.TIMEOUTS, **(config.get('command_timeouts') or {})}
+        guard.failure_threshold = config.get('breaker_threshold', 3)
+        guard.max_open_seconds = config.get('breaker_max_open', 120)
+        keywords_changed = 'keyword_locale' in changed or 'keyword_packs' in changed
+        
+        # Read by the next phase or attempt, a running rejoin picks them up as it goes
+        for instance, spec, old_spec in zip(self.instances, specs, old_specs):
+            launcher = instance.launcher
+            launcher.phase_timeouts = {**launcher.PHASE_TIMEOUTS, **(config.get('phase_timeouts') or {})}
+            launcher.retry_delay = config.get('retry_delay', 5)
+            launcher.max_retry_delay = config.get('max_retry_delay', 300)
+            launcher.strategies = list(self.rejoin_strategies)
+            
+            if keywords_changed:
+                self._follow_server(instance, instance.launcher.server_pool.current)
+            
+            if spec != old_spec:
+                instance.pending_spec = spec
+        
+        self._apply_pending_targets()
+        
+        return [key for key in changed if key not in restart]
+    
+    def _apply_pending_targets(self):
+        """Switch instances with a reloaded game target once they have no rejoin running"""
+        for instance in self.instances:
+            if instance.pending_spec is not None and not instance.rejoin_active():
+                spec, instance.pending_spec = instance.pending_spec, None
+                self._retarget(instance, spec)
+    
+    def _retarget(self, instance: RobloxInstance, spec: dict):
+        """
+        Point an instance at a new game target, rejoining if its main game changed
+        
+        Args:
+            instance: Idle instance
+            spec: Instance definition from the reloaded config
+        """
+        prefix = self._prefix(instance)
+        moved = (spec['game_id'], spec['vip_server_link']) != (instance.game_id, instance.vip_server_link)
+        
+        try:
+            instance.launcher.retarget(spec['game_id'], spec['vip_server_link'], spec['servers'])
+        except ValueError as e:
+            self.logger.warning(f"{prefix}Game target not changed: {e}")
+            return
+        
+        instance.game_id = spec['game_id']
+        instance.vip_server_link = spec['vip_server_link']
+        instance.detector.matcher = self._keyword_matcher(spec['game_id'])
+        self.logger.info(f"{prefix}🎯 Game target: {instance.target}")
+        
+        if not moved:
+            return
+        
+        self._rejoin_now(instance, "Game target changed")
+    
+    def _rejoin_now(self, instance: RobloxInstance, reason: str):
+        """
+        Start a rejoin outside the normal checks (loop thread only)
+        
+        The instance gets a fresh start, even during a failure cooldown.
+        
+        Args:
+            instance: Instance with no rejoin running
+            reason: Reason for rejoin
+        """
+        instance.cooldown_until = 0.0
+        instance.consecutive_failures = 0
+        
+        if self._wake_async is not None:
+            instance.rejoin_task = asyncio.create_task(self._rejoin_async(instance, reason))
+        else:
+            self._start_rejoin(instance, reason)
+            instance.rejoin = instance.launcher.rejoin_machine()
+            self.scheduler.schedule(instance.name, 0)
+    
+    def _wait_time(self) -> float:
+        """Seconds the loop may sleep (next check, or the next config file check)"""
+        delay = self.scheduler.time_until_next()
+        if self.config_loader is not None:
+            delay = min(delay, self.CONFIG_CHECK_INTERVAL)
+        return delay
+    
+    def _on_breaker_change(self, state: str, seconds: float):
+        """Log the device circuit breaker opening or closing (any thread)"""
+        if state == CommandGuard.OPEN:
+            self.logger.warning(f"📵 Device not responding, holding all commands for {seconds:.0f}s")
         else:
-            self.logger.increment_rejoin_failed()
-            self.logger.error("✗ Failed to rejoin")
-            self.consecutive_failures += 1
+            self.logger.success("Device responding again, resuming checks")
+    
+    def _screenshot_on_error(self, instance: RobloxInstance, error_type: str):
+        """Queue the buffered frames plus a fresh capture to be written (returns at once)"""
+        if self.screenshots is not None:
+            name = f"{error_type}_{instance.name}" if self.multi_instance else error_type
+            self.screenshots.screenshot_on_error(name)
+    
+    def _resolve_pid(self, pid: int) -> Optional[str]:
+        """Package of a logcat line's PID (called from the watcher thread)"""
+        name = self._pid_names.process_name(pid)
+        
+        # App sub-processes are named package:suffix
+        return name.split(':')[0] if name else None
+    
+    def _wake_loop(self):
+        """Wake the monitoring loop early (safe from other threads)"""
+        self._wake.set()
+        
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake_async.set)
+    
+    def _on_logcat_event(self, event: LogcatEvent):
+        """Queue a logcat event and wake the loop (called from the watcher thread)"""
+        self._events.append(event)
+        self._wake_loop()
+    
+    def _control_handlers(self) -> Dict[str, Callable[[dict], Any]]:
+        """Control socket commands (status answers from cached state, the rest run on the loop)"""
+        return {
+            'status': lambda args: self.status(),
+            'pause': lambda args: self._on_loop(lambda: self.pause(args.get('instance'))),
+            'resume': lambda args: self._on_loop(lambda: self.resume(args.get('instance'))),
+            'force-rejoin': lambda args: self._on_loop(lambda: self.force_rejoin(args.get('instance'))),
+            'switch-target': lambda args: self._on_loop(lambda: self.switch_target(args)),
+            'dump-stats': lambda args: self._on_loop(self.dump_stats)
+        }
+    
+    def _on_loop(self, command: Callable[[], Any]) -> Any:
+        """
+        Run a command on the monitoring loop and wait for its result (control socket thread)
+        
+        Args:
+            command: Function touching monitor state
             
-            # Check if too many failures
-            if self.consecutive_failures >= self.config['max_retries']:
-                self.logger.critical(f"⚠️  Too many consecutive failures ({self.consecutive_failures})")
-                self.logger.warning("Waiting 60 seconds before next attempt...")
-                time.sleep(60)
-                self.consecutive_failures = 0  # Reset after long wait
+        Returns:
+            Its result (its exception is raised here)
+        """
+        if not self.is_running:
+            raise RuntimeError("Monitor is not running")
+        
+        future = concurrent.futures.Future()
+        self._commands.append((command, future))
+        self._wake_loop()
+        
+        try:
+            return future.result(self.COMMAND_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            raise TimeoutError("Monitor loop is busy, try again") from None
+        except concurrent.futures.CancelledError:
+            raise RuntimeError("Monitor stopped") from None
+    
+    def _run_commands(self):
+        """Run control commands queued since the last pass of the loop"""
+        while self._commands:
+            command, future = self._commands.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
             
-            return False
+            try:
+                future.set_result(command())
+            except Exception as e:
+                future.set_exception(e)
+    
+    def _select_instances(self, name: Optional[str]) -> List[RobloxInstance]:
+        """
+        Get the instances a control command applies to
+        
+        Args:
+            name: Instance name (None = all)
+            
+        Returns:
+            Matching instances
+        """
+        if not name:
+            return list(self.instances)
+        
+        for instance in self.instances:
+            if instance.name == name:
+                return [instance]
+        
+        names = ', '.join(instance.name for instance in self.instances)
+        raise ValueError(f"Unknown instance '{name}' (instances: {names})")
+    
+    def status(self) -> dict:
+        """
+        Current state of every instance, from what the loop last saw (no device calls)
+        
+        Returns:
+            JSON-serializable status
+        """
+        instances = []
+        
+        for instance in self.instances:
+            machine = instance.rejoin
+            if machine is not None:
+                rejoin = {'state': machine.state, 'strategy': machine.strategy, 'attempt': machine.attempt}
+            else:
+                rejoin = {'state': 'running'} if instance.rejoin_active() else None
+            
+            state_age = self.scheduler.state_age(instance.name)
+            next_check = self.scheduler.time_until(instance.name)
+            
+            instances.append({
+                'name': instance.name,
+                'package': instance.package_name,
+                'target': instance.target,
+                'server': instance.launcher.server_pool.current.label,
+                'state': instance.last_state,
+                'state_seconds': round(state_age, 1) if state_age is not None else None,
+                'next_check_seconds': round(next_check, 1) if next_check is not None else None,
+                'consecutive_failures': instance.consecutive_failures,
+                'cooldown_seconds': round(max(0.0, instance.cooldown_until - time.monotonic()), 1),
+                'paused': instance.paused,
+                'rejoin': rejoin
+            })
+        
+        stats = {key: value for key, value in self.logger.stats.items() if key != 'start_time'}
+        
+        guard = self.adb.guard
+        
+        return {
+            'running': self.is_running,
+            'uptime_seconds': round(time.monotonic() - self.started_at, 1),
+            'device': {
+                'serial': self.adb.device_id,
+                'breaker': guard.state,
+                'held_seconds': round(guard.open_remaining(), 1),
+                'in_flight': dict(guard.in_flight)
+            },
+            'profile': self.config.get('active_profile', ''),
+            'check_interval': self._interval_text(),
+            'stats': stats,
+            'instances': instances
+        }
+    
+    def pause(self, name: Optional[str] = None) -> List[str]:
+        """
+        Hold checks and new rejoins (a running rejoin still finishes)
+        
+        Args:
+            name: Instance name (None = all)
+            
+        Returns:
+            Paused instance names
+        """
+        instances = self._select_instances(name)
+        
+        for instance in instances:
+            if not instance.paused:
+                instance.paused = True
+                self.logger.warning(f"{self._prefix(instance)}⏸️  Paused")
+        
+        return [instance.name for instance in instances]
+    
+    def resume(self, name: Optional[str] = None) -> List[str]:
+        """
+        Resume checks held by pause()
+        
+        Args:
+            name: Instance name (None = all)
+            
+        Returns:
+            Resumed instance names
+        """
+        instances = self._select_instances(name)
+        
+        for instance in instances:
+            if instance.paused:
+                instance.paused = False
+                self.scheduler.schedule(instance.name, 0)
+                self.logger.info(f"{self._prefix(instance)}▶️  Resumed")
+        
+        return [instance.name for instance in instances]
+    
+    def force_rejoin(self, name: Optional[str] = None) -> dict:
+        """
+        Rejoin now, without waiting for a disconnect
+        
+        Args:
+            name: Instance name (None = all)
+            
+        Returns:
+            {'started': names, 'busy': names already rejoining}
+        """
+        started, busy = [], []
+        
+        for instance in self._select_instances(name):
+            if instance.rejoin_active():
+                busy.append(instance.name)
+                continue
+            
+            self._rejoin_now(instance, "Requested from control socket")
+            started.append(instance.name)
+        
+        return {'started': started, 'busy': busy}
+    
+    def switch_target(self, args: dict) -> dict:
+        """
+        Point an instance at another game (after its running rejoin, if any)
+        
+        Args:
+            args: instance (needed with several), game_id and/or vip_server_link,
+                servers (default: keep the configured backups)
+            
+        Returns:
+            {'instance', 'target', 'pending': True if waiting for a rejoin to finish}
+        """
+        game_id = str(args.get('game_id') or '').strip()
+        vip_server_link = str(args.get('vip_server_link') or '').strip()
+        if not game_id and not vip_server_link:
+            raise ValueError("switch-target needs game_id or vip_server_link")
+        
+        name = args.get('instance')
+        if not name and self.multi_instance:
+            raise ValueError("switch-target needs an instance name when several are monitored")
+        instance = self._select_instances(name)[0]
+        
+        current = next(spec for spec in self._instance_specs(self.config) if spec['name'] == instance.name)
+        servers = args.get('servers')
+        
+        instance.pending_spec = {
+            **current,
+            'game_id': game_id,
+            'vip_server_link': vip_server_link,
+            'servers': current['servers'] if servers is None else list(servers)
+        }
+        self._apply_pending_targets()
+        
+        return {'instance': instance.name, 'target': instance.target, 'pending': instance.pending_spec is not None}
+    
+    def dump_stats(self) -> dict:
+        """
+        Counters, metrics, strategy track records and server pool health
+        
+        Returns:
+            JSON-serializable statistics ('text': the console stats block, uncolored)
+        """
+        stats = {key: value for key, value in self.logger.stats.items() if key != 'start_time'}
+        
+        return {
+            'stats': stats,
+            'text': self.logger.stats_text(),
+            'metrics': self.metrics.to_dict(),
+            'strategies': {
+                instance.name: {
+                    strategy: record.to_dict() for strategy, record in instance.launcher.strategy_stats.items()
+                }
+                for instance in self.instances
+            },
+            'servers': {
+                instance.name: [
+                    {
+                        'label': target.label,
+                        'current': target is instance.launcher.server_pool.current,
+                        'attempts': target.attempts,
+                        'failures': target.failures,
+                        'latency': target.latency
+                    }
+                    for target in instance.launcher.server_pool.targets
+                ]
+                for instance in self.instances
+            }
+        }
+    
+    def _start_control(self):
+        """Start the control socket if configured"""
+        if self.control is None:
+            return
+        
+        try:
+            self.control.start()
+        except OSError as e:
+            self.logger.warning(f"Control socket disabled: {e}")
+            self.control = None
+            return
+        
+        self.logger.info(f"Control socket: {self.control.path}")
+    
+    def _drain_logcat_events(self):
+        """Turn queued logcat events into immediate (or teleport-delayed) checks"""
+        while self._events:
+            event = self._events.popleft()
+            
+            if event.package:
+                targets = [i for i in self.instances if i.package_name == event.package]
+            else:
+                # Unattributed lines can only be ours with a single instance
+                targets = [] if self.multi_instance else self.instances[:1]
+            
+            for instance in targets:
+                prefix = self._prefix(instance)
+                
+                # Caused by our own rejoin (kill, relaunch), running or finished
+                if instance.rejoin_active() or event.timestamp < instance.last_rejoin_at:
+                    continue
+                
+                if event.kind == 'teleport':
+                    # The old server disconnects during a teleport; give the new one time to load
+                    instance.teleport_until = event.timestamp + instance.launcher.phase_timeouts['load']
+                    self.logger.info(f"{prefix}Teleport detected, holding checks while it loads")
+                    self.scheduler.schedule(instance.name, instance.launcher.phase_timeouts['load'])
+                    continue
+                
+                self.logger.debug("%slogcat %s: %s", prefix, event.kind, event.line)
+                
+                if instance.detector.screen_cache is not None:
+                    instance.detector.screen_cache.invalidate()
+                
+                delay = 0.0
+                if event.kind != 'crash':
+                    delay = max(0.0, instance.teleport_until - time.monotonic())
+                
+                self.scheduler.schedule(instance.name, delay)
     
     def start_monitoring(self):
         """Start the monitoring loop"""
         self.is_running = True
         
         self.logger.banner("🎮 ROBLOX AUTO-REJOIN STARTED 🎮")
-        self.logger.info(f"Game ID: {self.config['game_id']}")
-        self.logger.info(f"Check Interval: {self.config['check_interval']}s")
+        if self.adb.device_id is not None:
+            self.logger.info(f"Device: {self.adb.device_id}")
+        for instance in self.instances:
+            self.logger.info(f"{self._prefix(instance)}{instance.target}")
+        self.logger.info(f"Check Interval: {self._interval_text()}")
         self.logger.info(f"Max Retries: {self.config['max_retries']}")
+        self._start_control()
         self.logger.info("")
         
         # Initial check - launch if not running
-        initial_state = self.detector.detect_state()
-        self.logger.info(f"Initial state: {initial_state}")
+        for instance in self.instances:
+            initial_state = instance.detector.detect_state()
+            self.logger.info(f"{self._prefix(instance)}Initial state: {initial_state}")
+            
+            # Stepped by the loop like any rejoin, so a stop doesn't wait for every retry
+            if initial_state != 'in_game':
+                self.logger.info(f"{self._prefix(instance)}Starting initial game join...")
+                instance.rejoin = instance.launcher.rejoin_machine()
+                instance.initial_join = True
+        
+        # Spread checks over the interval so instances don't probe the device together
+        self.scheduler.add_staggered([instance.name for instance in self.instances])
+        for instance in self.instances:
+            if instance.rejoin is not None:
+                self.scheduler.add(instance.name)
+        by_name = {instance.name: instance for instance in self.instances}
         
-        if initial_state != 'in_game':
-            self.logger.info("Starting initial game join...")
-            self.launcher.rejoin_game()
+        if self.logcat_watcher is not None:
+            self.logcat_watcher.start()
         
         # Main monitoring loop
         try:
             iteration = 0
             
             while self.is_running:
-                iteration += 1
+                self._run_commands()
+                self._check_config_reload()
+                self._drain_logcat_events()
+                due = self.scheduler.due()
                 
-                # Check and rejoin if needed
-                self.check_and_rejoin()
+                if due:
+                    iteration += 1
+                    
+                    with tracing.span('tick', 'monitor', instances=len(due)):
+                        # One snapshot serves every instance checked in this tick
+                        snapshot = self.snapshot()
+                        
+                        for name in due:
+                            # Check, or advance a rejoin by one step
+                            if self.check_and_rejoin(by_name[name], snapshot):
+                                # A rejoin changed the device (or a check was refused), later checks need fresh facts
+                                snapshot = self.snapshot()
+                            
+                            self.scheduler.schedule(name, self._next_delay(by_name[name]))
+                    
+                    # Print stats every 20 iterations
+                    if iteration % 20 == 0:
+                        self.logger.print_stats()
+                    
+                    self._export_metrics()
                 
-                # Print stats every 20 iterations
-                if iteration % 20 == 0:
-                    self.logger.print_stats()
-                
-                # Wait before next check
-                time.sleep(self.config['check_interval'])
+                # Wait before next check, waking early on logcat events
+                self._wake.wait(self._wait_time())
+                self._wake.clear()
         
         except KeyboardInterrupt:
             self.logger.warning("\n⚠️  Monitoring stopped by user")
@@ -155,9 +1157,224 @@ class RobloxMonitor:
         except Exception as e:
             self.logger.critical(f"Fatal error: {e}")
             self.stop_monitoring()
+        
+        else:
+            # Stopped from another thread with request_stop()
+            self.logger.warning("\n⚠️  Monitoring stopped")
+            self.stop_monitoring()
+    
+    async def start_monitoring_async(self):
+        """
+        Start the monitoring loop on asyncio
+        
+        Rejoins run as background tasks, so other instances keep being
+        checked, stats keep printing and shutdown signals are handled
+        while a rejoin waits on the device.
+        """
+        self.is_running = True
+        self._wake_async = asyncio.Event()
+        
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        for sig in (signal.SIGINT, signal.SIGTERM) if self.handle_signals else ():
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        self.logger.banner("🎮 ROBLOX AUTO-REJOIN STARTED 🎮")
+        if self.adb.device_id is not None:
+            self.logger.info(f"Device: {self.adb.device_id}")
+        for instance in self.instances:
+            self.logger.info(f"{self._prefix(instance)}{instance.target}")
+        self.logger.info(f"Check Interval: {self._interval_text()}")
+        self.logger.info(f"Max Retries: {self.config['max_retries']}")
+        self._start_control()
+        self.logger.info("")
+        
+        self.async_adb = AsyncADBHelper(self.adb.probe_path, self.adb.process_tracker, self.metrics,
+                                        self.adb.guard, self.adb.device_id, self.logger)
+        self.async_adb.on_frame = self.adb.on_frame
+        for instance in self.instances:
+            instance.async_detector = AsyncRobloxDetector(self.async_adb, instance.detector)
+            instance.async_launcher = AsyncRobloxLauncher(self.async_adb, instance.async_detector,
+                                                          instance.launcher)
+        
+        packages = [instance.package_name for instance in self.instances]
+        by_name = {instance.name: instance for instance in self.instances}
+        
+        try:
+            # Initial check - launch if not running
+            snapshot = AsyncDeviceSnapshot(self.async_adb, packages, ui=not self.screen_fingerprint)
+            states = await asyncio.gather(*(
+                instance.async_detector.detect_state(snapshot) for instance in self.instances
+            ))
+            
+            for instance, initial_state in zip(self.instances, states):
+                self.logger.info(f"{self._prefix(instance)}Initial state: {initial_state}")
+                instance.last_state = initial_state
+                
+                if initial_state != 'in_game':
+                    self.logger.info(f"{self._prefix(instance)}Starting initial game join...")
+                    instance.rejoin_task = asyncio.create_task(instance.async_launcher.rejoin_game())
+            
+            self.scheduler.add_staggered(list(by_name))
+            iteration = 0
+            
+            if self.logcat_watcher is not None:
+                self.logcat_watcher.start()
+            
+            while self.is_running:
+                self._run_commands()
+                self._check_config_reload()
+                self._drain_logcat_events()
+                due = self.scheduler.due()
+                
+                if due:
+                    iteration += 1
+                    snapshot = AsyncDeviceSnapshot(self.async_adb, packages, ui=not self.screen_fingerprint)
+                    
+                    # Instances checked this tick share the snapshot, probes run once
+                    with tracing.span('tick', 'monitor', instances=len(due)):
+                        await asyncio.gather(*(
+                            self._check_and_rejoin_async(by_name[name], snapshot) for name in due
+                        ))
+                    
+                    for name in due:
+                        self.scheduler.schedule(name, self._next_delay(by_name[name]))
+                    
+                    # Print stats every 20 iterations
+                    if iteration % 20 == 0:
+                        self.logger.print_stats()
+                    
+                    self._export_metrics()
+                
+                # Wait before next check, waking early on stop or logcat events
+                try:
+                    await asyncio.wait_for(self._wake_async.wait(), self._wait_time())
+                except asyncio.TimeoutError:
+                    pass
+                self._wake_async.clear()
+        
+        except Exception as e:
+            self.logger.critical(f"Fatal error: {e}")
+        
+        finally:
+            tasks = [i.rejoin_task for i in self.instances if i.rejoin_task and not i.rejoin_task.done()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
+            self.logger.warning("\n⚠️  Monitoring stopped")
+            self.stop_monitoring()
+    
+    @tracing.traced('monitor')
+    async def _check_and_rejoin_async(self, instance: RobloxInstance, snapshot: AsyncDeviceSnapshot):
+        """
+        Check one instance and start a background rejoin if needed
+        
+        Args:
+            instance: Instance to check
+            snapshot: Shared tick snapshot
+        """
+        # A rejoin owns the instance until it finishes
+        if instance.rejoin_task and not instance.rejoin_task.done():
+            self.logger.debug("%sRejoin in progress...", self._prefix(instance))
+            return
+        
+        if instance.in_cooldown() or instance.paused or self.adb.guard.open_remaining() > 0:
+            return
+        
+        with record_refusals() as refused:
+            with self.metrics.timer('detect_seconds', instance=instance.package_name):
+                state = await instance.async_detector.detect_state(snapshot)
+        
+        if refused:
+            self.logger.debug("%sCheck discarded, commands refused: %s", self._prefix(instance),
+                              ', '.join(sorted(set(refused))))
+            return
+        
+        reason = self._handle_state(instance, state)
+        
+        if reason:
+            instance.rejoin_task = asyncio.create_task(self._rejoin_async(instance, reason))
+    
+    @tracing.traced('monitor')
+    async def _rejoin_async(self, instance: RobloxInstance, reason: str):
+        """
+        Rejoin one instance without blocking the monitor loop
+        
+        Args:
+            instance: Instance to rejoin
+            reason: Reason for rejoin
+        """
+        self._start_rejoin(instance, reason)
+        success = await instance.async_launcher.rejoin_game()
+        self._finish_rejoin(instance, success)
+    
+    def _export_metrics(self, force: bool = False):
+        """
+        Write metrics files if metrics_path is set and the interval passed
+        
+        Args:
+            force: Export regardless of the interval (shutdown)
+        """
+        if not self.metrics_path:
+            return
+        
+        if force or time.monotonic() - self._metrics_exported_at >= self.metrics_interval:
+            self.metrics.export(self.metrics_path)
+            self._metrics_exported_at = time.monotonic()
+    
+    def request_stop(self):
+        """Ask the monitoring loop to stop; it cleans up itself (safe from signal handlers and other threads)"""
+        self.is_running = False
+        self._wake_loop()
     
     def stop_monitoring(self):
-        """Stop monitoring"""
+        """Stop monitoring (cleanup runs once, whichever thread gets here first)"""
         self.is_running = False
+        
+        if self._stopped:
+            return
+        self._stopped = True
+        
+        for instance in self.instances:
+            if instance.rejoin is not None:
+                instance.rejoin.cancel()
+        
+        if self.logcat_watcher is not None:
+            self.logcat_watcher.stop()
+        self._loop = None
+        
+        if self.control is not None:
+            self.control.stop()
+        
+        # Commands that will never run now
+        while self._commands:
+            _, future = self._commands.popleft()
+            future.cancel()
+        
+        if self.screenshots is not None:
+            self.screenshots.close()
+        
+        self.adb.close()
+        self._export_metrics(force=True)
+        self._save_trace()
         self.logger.banner("🛑 MONITORING STOPPED 🛑")
         self.logger.print_stats()
+    
+    def _save_trace(self):
+        """Write the --profile trace and log the per-command latency summary"""
+        tracer = tracing.get_tracer()
+        if tracer is None or not tracer.events:
+            return
+        
+        try:
+            summary = tracer.save(self.trace_path)
+        except OSError as e:
+            self.logger.error(f"Trace export failed: {e}")
+            return
+        
+        self.logger.info("Trace saved to %s (open in https://ui.perfetto.dev)", self.trace_path)
+        self.logger.info("Command latency (ms):\n%s", summary)
@@ -0,0 +1,168 @@
+"""
+Pixel Classifier Module
+Detects states from raw screencap pixels (sees GL-drawn UI the UI dump misses)
+"""
+
+import os
+from typing import List, Optional, Sequence, Tuple
+from .screen_cache import parse_frame_header
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Longest side of the downscaled frame that signatures are matched on
+WORK_SIZE = 240
+
+# States a signature may report (same strings as RobloxDetector.detect_state)
+STATES = ('disconnected', 'in_game', 'loading')
+
+# None built in: a dark gray mid-screen panel (the stock error prompt) also
+# shows in menus and loading screens, so signatures must be tuned per game
+DEFAULT_SIGNATURES: List[dict] = []
+
+
+def is_available() -> bool:
+    """Check if NumPy is installed"""
+    return np is not None
+
+
+class PixelClassifier:
+    """Matches color signatures and templates against a downscaled raw frame"""
+    
+    def __init__(self, signatures: Optional[List[dict]] = None, template_dir: str = "."):
+        """
+        Args:
+            signatures: [{'state', 'regions': [...]}], checked in order; a
+                signature matches when all its regions match. A region has a
+                'box' ([left, top, right, bottom] as screen fractions) and either
+                'color' (+ 'tolerance', 'min_fraction') or 'template' (a .npy
+                RGB array, + 'max_diff')
+            template_dir: Base directory for relative template paths
+        """
+        if np is None:
+            raise RuntimeError("Pixel classifier needs NumPy (pip install numpy)")
+        
+        self.signatures = []
+        
+        for signature in signatures if signatures is not None else DEFAULT_SIGNATURES:
+            if signature.get('state') not in STATES:
+                raise ValueError(f"Unknown pixel signature state: {signature.get('state')}")
+            
+            regions = [self._load_region(region, template_dir) for region in signature['regions']]
+            self.signatures.append((signature['state'], regions))
+    
+    @staticmethod
+    def _load_region(region: dict, template_dir: str) -> dict:
+        """Validate a region and load its template"""
+        loaded = dict(region)
+        
+        if len(region.get('box', [])) != 4:
+            raise ValueError(f"Pixel region needs a 4-value box: {region}")
+        
+        if 'template' in region:
+            path = os.path.join(template_dir, region['template'])
+            loaded['template'] = np.load(path).astype(np.int16)
+        elif 'color' not in region:
+            raise ValueError(f"Pixel region needs a color or a template: {region}")
+        
+        return loaded
+    
+    @staticmethod
+    def decode_frame(data: Optional[bytes]) -> Optional["np.ndarray"]:
+        """
+        Turn raw screencap output into a downscaled RGB array
+        
+        Args:
+            data: Raw screencap output
+            
+        Returns:
+            (height, width, 3) int16 array or None if the frame is unreadable
+        """
+        frame = parse_frame_header(data)
+        if frame is None:
+            return None
+        
+        width, height, header = frame
+        pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * 4, offset=header)
+        
+        # Plain striding: exact colors survive, and it costs no arithmetic
+        step = max(1, max(width, height) // WORK_SIZE)
+        return pixels.reshape(height, width, 4)[::step, ::step, :3].astype(np.int16)
+    
+    @staticmethod
+    def _crop(image: "np.ndarray", box: Sequence[float]) -> "np.ndarray":
+        """Cut a fractional box out of an image"""
+        height, width = image.shape[:2]
+        left, top, right, bottom = box
+        
+        return image[int(top * height):max(int(bottom * height), int(top * height) + 1),
+                     int(left * width):max(int(right * width), int(left * width) + 1)]
+    
+    def _region_matches(self, image: "np.ndarray", region: dict) -> bool:
+        """Check one region of a signature"""
+        crop = self._crop(image, region['box'])
+        
+        if 'template' in region:
+            template = region['template']
+            
+            # Nearest-neighbour resample of the crop onto the template grid
+            rows = np.arange(template.shape[0]) * crop.shape[0] // template.shape[0]
+            columns = np.arange(template.shape[1]) * crop.shape[1] // template.shape[1]
+            sample = crop[rows][:, columns]
+            
+            return float(np.abs(sample - template).mean()) <= region.get('max_diff', 20)
+        
+        distance = np.abs(crop - np.array(region['color'], dtype=np.int16)).max(axis=2)
+        fraction = float((distance <= region.get('tolerance', 12)).mean())
+        
+        return fraction >= region.get('min_fraction', 0.5)
+    
+    def classify(self, data: Optional[bytes]) -> Optional[str]:
+        """
+        Classify a raw frame
+        
+        Args:
+            data: Raw screencap output
+            
+        Returns:
+            State of the first matching signature, or None if nothing matched
+            (the caller falls back to UI-text detection)
+        """
+        image = self.decode_frame(data)
+        if image is None:
+            return None
+        
+        for state, regions in self.signatures:
+            if all(self._region_matches(image, region) for region in regions):
+                return state
+        
+        return None
+    
+    @classmethod
+    def save_template(cls, data: bytes, box: Sequence[float], path: str,
+                      size: Tuple[int, int] = (32, 32)) -> bool:
+        """
+        Save a region of a raw frame as a template for a 'template' region
+        
+        Args:
+            data: Raw screencap output showing the screen to recognize
+            box: [left, top, right, bottom] as screen fractions
+            path: Output .npy file
+            size: Template (width, height) in pixels
+            
+        Returns:
+            True if saved
+        """
+        image = cls.decode_frame(data)
+        if image is None:
+            return False
+        
+        crop = cls._crop(image, box)
+        rows = np.arange(size[1]) * crop.shape[0] // size[1]
+        columns = np.arange(size[0]) * crop.shape[1] // size[0]
+        
+        np.save(path, crop[rows][:, columns].astype(np.uint8))
+        return True
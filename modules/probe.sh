@@ -0,0 +1,43 @@
+#!/system/bin/sh
+
+# Roblox AutoRejoin - Device probe
+# Prints every fact the detector needs as one JSON line:
+#   {"pids":{"<package>":"<pid>",...},"focus":"...","size":"...","texts":[...]}
+# Usage: sh autorejoin_probe.sh [-u] <package> [<package> ...]
+#   -u  also dump UI texts (only when one of the packages is running)
+
+json_escape() {
+    sed -e 's/\\/\\\\/g' -e 's/"/\\"/g'
+}
+
+ui=0
+if [ "$1" = "-u" ]; then
+    ui=1
+    shift
+fi
+
+pids=""
+any_running=0
+for pkg in "$@"; do
+    pid=$(pidof "$pkg" 2>/dev/null)
+    [ -n "$pid" ] && any_running=1
+    [ -n "$pids" ] && pids="$pids,"
+    pids="$pids\"$pkg\":\"$pid\""
+done
+
+focus=$(dumpsys window windows 2>/dev/null | grep -m 1 'mCurrentFocus' | json_escape)
+size=$(wm size 2>/dev/null | head -n 1 | json_escape)
+
+if [ "$ui" = 1 ] && [ "$any_running" = 1 ]; then
+    texts=$(uiautomator dump /dev/tty 2>/dev/null \
+        | grep -o 'text="[^"]*"' \
+        | sed -e 's/^text="//' -e 's/"$//' -e '/^$/d' -e 's/\\/\\\\/g' -e 's/.*/"&"/' \
+        | tr '\n' ',' \
+        | sed 's/,$//')
+    texts="[$texts]"
+else
+    texts="null"
+fi
+
+# printf, not echo: some shells' echo would eat the escaped backslashes
+printf '%s\n' "{\"pids\":{$pids},\"focus\":\"$focus\",\"size\":\"$size\",\"texts\":$texts}"
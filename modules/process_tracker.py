@@ -0,0 +1,145 @@
+"""
+Process Tracker Module
+Finds app processes by scanning /proc and caches their PIDs
+"""
+
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class ProcessTracker:
+    """pidof replacement that reads /proc directly (needs root to see app processes)"""
+    
+    def __init__(self, proc_root: str = "/proc"):
+        self.proc_root = proc_root
+        
+        # package -> (pid, start time in clock ticks)
+        self._cache: Dict[str, Tuple[int, int]] = {}
+    
+    def is_available(self) -> bool:
+        """
+        Check if other processes are visible in /proc
+        
+        With hidepid or without root, init's cmdline is unreadable and a scan
+        could not tell "not running" from "hidden".
+        
+        Returns:
+            True if /proc can be used for detection
+        """
+        try:
+            with open(os.path.join(self.proc_root, "1", "cmdline"), 'rb') as f:
+                return bool(f.read())
+        except OSError:
+            return False
+    
+    def _start_time(self, pid: int) -> Optional[int]:
+        """Process start time from /proc/<pid>/stat (guards against PID reuse)"""
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "stat"), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        
+        # comm may contain spaces, so fields are counted after its closing ')'
+        fields = data[data.rfind(b')') + 2:].split()
+        try:
+            return int(fields[19])
+        except (IndexError, ValueError):
+            return None
+    
+    def process_name(self, pid: int) -> Optional[str]:
+        """argv[0] of a process (what pidof matches for app processes)"""
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "cmdline"), 'rb') as f:
+                cmdline = f.read()
+        except OSError:
+            return None
+        
+        return cmdline.split(b'\0', 1)[0].decode('utf-8', errors='replace')
+    
+    def _cached_pid(self, package_name: str) -> Optional[int]:
+        """Cached PID if that process is still the one we saw"""
+        cached = self._cache.get(package_name)
+        
+        if cached is None:
+            return None
+        
+        pid, start_time = cached
+        if self._start_time(pid) == start_time:
+            return pid
+        
+        del self._cache[package_name]
+        return None
+    
+    def scan(self, package_names: List[str]) -> Dict[str, int]:
+        """
+        Walk /proc once looking for several packages
+        
+        Args:
+            package_names: Android package names
+            
+        Returns:
+            package -> pid for the ones found
+        """
+        wanted = set(package_names)
+        found: Dict[str, int] = {}
+        
+        try:
+            entries = os.listdir(self.proc_root)
+        except OSError:
+            return found
+        
+        for entry in entries:
+            if not entry.isdigit():
+                continue
+            
+            pid = int(entry)
+            name = self.process_name(pid)
+            
+            if name in wanted and name not in found:
+                start_time = self._start_time(pid)
+                if start_time is None:
+                    continue
+                
+                found[name] = pid
+                self._cache[name] = (pid, start_time)
+                
+                if len(found) == len(wanted):
+                    break
+        
+        return found
+    
+    def find_pid(self, package_name: str) -> Optional[int]:
+        """
+        Get the PID of a package, from cache when still valid
+        
+        Args:
+            package_name: Android package name
+            
+        Returns:
+            PID or None if not running
+        """
+        pid = self._cached_pid(package_name)
+        
+        if pid is not None:
+            return pid
+        
+        return self.scan([package_name]).get(package_name)
+    
+    def running_packages(self, package_names: List[str]) -> Set[str]:
+        """
+        Check several packages with at most one /proc walk
+        
+        Args:
+            package_names: Android package names
+            
+        Returns:
+            Subset of package_names that are running
+        """
+        running = {name for name in package_names if self._cached_pid(name) is not None}
+        missing = [name for name in package_names if name not in running]
+        
+        if missing:
+            running.update(self.scan(missing))
+        
+        return running
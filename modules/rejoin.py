@@ -0,0 +1,441 @@
+"""
+Rejoin Module
+Rejoin flow as an explicit, steppable state machine with jittered backoff
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+from .command_guard import record_refusals
+from .wait import backoff_delay
+from . import tracing
+
+
+# Rejoin strategies, cheapest first
+DISMISS = 'dismiss'  # tap Reconnect on the disconnect dialog
+WARM = 'warm'        # re-fire the deep link into the running app
+COLD = 'cold'        # force-stop, then launch through the deep link
+
+STRATEGIES = (DISMISS, WARM, COLD)
+
+
+class StrategyStats:
+    """Success rate and duration of one rejoin strategy"""
+    
+    # Assumed seconds per try before anything was measured
+    DEFAULT_SECONDS = {
+        DISMISS: 5,
+        WARM: 8,
+        COLD: 40
+    }
+    
+    # Weight of the newest try in the duration average
+    SMOOTHING = 0.3
+    
+    def __init__(self, strategy: str, attempts: int = 0, successes: int = 0,
+                 seconds: Optional[float] = None):
+        self.strategy = strategy
+        self.attempts = attempts
+        self.successes = successes
+        self.seconds = seconds if seconds is not None else self.DEFAULT_SECONDS.get(strategy, 30)
+    
+    def record(self, success: bool, seconds: float):
+        """
+        Add the result of one try
+        
+        Args:
+            success: Whether it got back in game
+            seconds: How long the try took
+        """
+        self.attempts += 1
+        self.successes += int(success)
+        self.seconds += (seconds - self.seconds) * self.SMOOTHING
+    
+    @property
+    def success_rate(self) -> float:
+        """Smoothed success rate (0.5 before the first try)"""
+        return (self.successes + 1) / (self.attempts + 2)
+    
+    @property
+    def cost(self) -> float:
+        """
+        Seconds per try divided by success rate
+        
+        Trying strategies in increasing cost order minimizes the expected
+        time until one of them works.
+        """
+        return self.seconds / self.success_rate
+    
+    def to_dict(self) -> dict:
+        """Counters for the stats file"""
+        return {'attempts': self.attempts, 'successes': self.successes, 'seconds': round(self.seconds, 3)}
+    
+    @classmethod
+    def from_dict(cls, strategy: str, data: dict) -> 'StrategyStats':
+        """Counters from the stats file"""
+        return cls(strategy, int(data.get('attempts', 0)), int(data.get('successes', 0)), data.get('seconds'))
+
+
+def rank_strategies(stats: Dict[str, StrategyStats], allowed: Sequence[str]) -> List[str]:
+    """
+    Order strategies by expected time to success
+    
+    Args:
+        stats: Strategy -> stats (missing ones use the defaults)
+        allowed: Strategies to rank
+        
+    Returns:
+        Strategies, cheapest expected cost first
+    """
+    return sorted(allowed, key=lambda strategy: stats.get(strategy, StrategyStats(strategy)).cost)
+
+
+class RejoinMachine:
+    """
+    [kill →] open_link → load → verify, retried with backoff
+    
+    Each step() does one short piece of work and returns how long to wait
+    before the next one, so the caller decides how to wait: the monitor
+    reschedules the instance and keeps checking others, run() just sleeps.
+    
+    An attempt goes through the strategies in order: a failed or
+    inapplicable warm/dismiss try falls through to the next strategy at
+    once, only a failed last strategy costs a backoff.
+    """
+    
+    KILL = 'kill'
+    DISMISS = 'dismiss'
+    OPEN_LINK = 'open_link'
+    LOAD = 'load'
+    VERIFY = 'verify'
+    BACKOFF = 'backoff'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    
+    # States that end the machine
+    FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+    
+    # First state of each strategy
+    FIRST_STATES = {
+        DISMISS: DISMISS,
+        WARM: OPEN_LINK,
+        COLD: KILL
+    }
+    
+    # Phase -> (first poll delay, longest poll delay) in seconds
+    POLL_INTERVALS = {
+        OPEN_LINK: (0.25, 1),
+        LOAD: (1, 3),
+        VERIFY: (0.5, 2)
+    }
+    
+    def __init__(self, launcher, max_retries: int = 3, retry_delay: float = 5,
+                 max_retry_delay: float = 300, strategies: Optional[Sequence[str]] = None):
+        """
+        Args:
+            launcher: RobloxLauncher (or AsyncRobloxLauncher for the async subclass)
+            max_retries: Attempts after the first one
+            retry_delay: Backoff after the first failed attempt in seconds
+            max_retry_delay: Longest backoff in seconds
+            strategies: Strategies in the order to try them (default: cold only)
+        """
+        self.launcher = launcher
+        self.logger = launcher.logger
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        
+        # Strategies of the current attempt and the one being tried
+        self.plan = list(strategies or [COLD])
+        self._plan_index = 0
+        self.strategy = self.plan[0]
+        self.strategy_started = time.monotonic()
+        
+        self.state = self.FIRST_STATES[self.strategy]
+        self.attempt = 1
+        self.result_state: Optional[str] = None
+        
+        # Monotonic times: when the next step is due, when the phase times out / started
+        self.wake_at = time.monotonic()
+        self.deadline: Optional[float] = None
+        self.phase_started = time.monotonic()
+        
+        self._poll_delay = 0.0
+        self._link_opened = False
+        self._link_opened_at = 0.0
+        self._cancelled = threading.Event()
+        self._announce_attempt()
+        self._announce_strategy()
+    
+    @property
+    def done(self) -> bool:
+        """Whether the machine reached a final state"""
+        return self.state in self.FINAL_STATES
+    
+    @property
+    def succeeded(self) -> bool:
+        """Whether the game was joined"""
+        return self.state == self.SUCCEEDED
+    
+    def delay(self) -> float:
+        """Seconds until the next step is due (0 when finished)"""
+        if self.done:
+            return 0.0
+        return max(0.0, self.wake_at - time.monotonic())
+    
+    def cancel(self):
+        """Stop at the next step (wakes a sleeping run())"""
+        self._cancelled.set()
+    
+    def _announce_attempt(self):
+        """Log the start of an attempt"""
+        self.logger.info(f"Starting launch sequence (Attempt {self.attempt}/{self.max_retries + 1})...")
+    
+    def _announce_strategy(self):
+        """Log the strategy being tried (silent for cold-only machines)"""
+        if self.strategy != COLD or len(self.plan) > 1:
+            self.logger.info(f"Rejoin strategy: {self.strategy}")
+    
+    def _record_phase(self):
+        """Report the duration of the phase being left"""
+        if self.state in (self.KILL, self.DISMISS, self.OPEN_LINK, self.LOAD, self.VERIFY):
+            self.launcher.record_phase(self.state, time.monotonic() - self.phase_started)
+    
+    def _enter(self, state: str, delay: float = 0.0):
+        """
+        Move to another state
+        
+        Args:
+            state: Next state
+            delay: Seconds before its first step
+        """
+        self._record_phase()
+        
+        now = time.monotonic()
+        self.state = state
+        self.phase_started = now
+        self.wake_at = now + delay
+        
+        timeout = self.launcher.phase_timeouts.get(state)
+        self.deadline = now + timeout if timeout is not None else None
+        self._poll_delay = self.POLL_INTERVALS.get(state, (0, 0))[0]
+    
+    def _poll_again(self):
+        """Stay in the current state and poll again after a growing delay"""
+        first, longest = self.POLL_INTERVALS.get(self.state, (1, 1))
+        self.wake_at = time.monotonic() + self._poll_delay
+        self._poll_delay = min(max(self._poll_delay, first) * 1.5, longest)
+    
+    def _expired(self) -> bool:
+        """Whether the current phase ran out of time"""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+    
+    def _succeed(self, state: str):
+        """Finish successfully"""
+        self.result_state = state
+        self.launcher.last_join_state = state
+        
+        if self._link_opened:
+            self.launcher.record_join(True, time.monotonic() - self._link_opened_at)
+        self.launcher.record_strategy(self.strategy, True, time.monotonic() - self.strategy_started)
+        self._enter(self.SUCCEEDED)
+        self.logger.success("Successfully joined game!")
+    
+    def _begin_strategy(self, strategy: str):
+        """Start a strategy right away"""
+        self.strategy = strategy
+        self.strategy_started = time.monotonic()
+        self._link_opened = False
+        self._enter(self.FIRST_STATES[strategy])
+        self._announce_strategy()
+    
+    def _skip_strategy(self, reason: str):
+        """
+        Give up on a strategy that does not apply (not counted in its stats)
+        
+        Args:
+            reason: Why it does not apply
+        """
+        self.logger.debug("Skipping %s rejoin: %s", self.strategy, reason)
+        
+        if not self._fall_through():
+            self._retry_or_fail()
+    
+    def _fall_through(self) -> bool:
+        """Move on to the next strategy of this attempt, if there is one"""
+        if self._plan_index + 1 >= len(self.plan):
+            return False
+        
+        self._plan_index += 1
+        self._begin_strategy(self.plan[self._plan_index])
+        return True
+    
+    def _mark_link_opened(self):
+        """Remember that this try joins through a link (timed per server)"""
+        self._link_opened = True
+        self._link_opened_at = time.monotonic()
+    
+    def _fail_attempt(self):
+        """End the current try: next strategy, or back off and retry, or give up"""
+        self.launcher.record_strategy(self.strategy, False, time.monotonic() - self.strategy_started)
+        
+        if self._link_opened:
+            self.launcher.record_join(False, time.monotonic() - self._link_opened_at)
+        
+        if not self._fall_through():
+            self._retry_or_fail()
+    
+    def _retry_or_fail(self):
+        """All strategies of this attempt failed: back off and retry, or give up"""
+        if self.attempt > self.max_retries:
+            self._enter(self.FAILED)
+            return
+        
+        delay = backoff_delay(self.attempt, self.retry_delay, self.max_retry_delay)
+        self.logger.info(f"Retrying in {delay:.1f} seconds...")
+        self._enter(self.BACKOFF, delay)
+    
+    def _next_attempt(self):
+        """Leave the backoff for a new attempt"""
+        self.attempt += 1
+        self._announce_attempt()
+        
+        # The quick strategies just failed; retries go straight to a cold start
+        if COLD in self.plan:
+            self.plan = [COLD]
+        self._plan_index = 0
+        self._begin_strategy(self.plan[0])
+    
+    def _check_cancelled(self) -> bool:
+        """Move to CANCELLED if cancel() was called"""
+        if self._cancelled.is_set() and not self.done:
+            self._record_phase()
+            self.state = self.CANCELLED
+            self.logger.warning("Rejoin cancelled")
+        return self.done
+    
+    def step(self) -> float:
+        """
+        Run the current state once
+        
+        Returns:
+            Seconds until the next step (0 when finished)
+        """
+        if self._check_cancelled():
+            return 0.0
+        
+        with tracing.span(self.state, 'launcher', instance=self.launcher.package_name, attempt=self.attempt):
+            try:
+                getattr(self, f"_step_{self.state}")()
+            except Exception as e:
+                self.logger.error(f"Launch error: {e}")
+                self._fail_attempt()
+        
+        return self.delay()
+    
+    def run(self) -> bool:
+        """
+        Step until finished, sleeping in between (cancel() interrupts)
+        
+        Returns:
+            True if the game was joined
+        """
+        while not self.done:
+            delay = self.step()
+            if delay and self._cancelled.wait(delay):
+                self._check_cancelled()
+        
+        return self.succeeded
+    
+    def _step_kill(self):
+        """Force stop Roblox (waits until the process is gone)"""
+        self.launcher.kill_roblox()
+        self._enter(self.OPEN_LINK)
+    
+    def _step_dismiss(self):
+        """Tap Reconnect on the disconnect dialog"""
+        if not self.launcher.tap_reconnect():
+            self._skip_strategy("no reconnect button on screen")
+            return
+        
+        self.logger.status("Waiting for game to load...")
+        self._enter(self.LOAD, self.POLL_INTERVALS[self.LOAD][0])
+    
+    def _step_open_link(self):
+        """Open the game link, then poll until Roblox is in the foreground"""
+        detector = self.launcher.detector
+        
+        if not self._link_opened:
+            # Warm rejoin only makes sense into a live process
+            if self.strategy == WARM and not detector.is_roblox_running():
+                self._skip_strategy("Roblox is not running")
+                return
+            
+            link_to_open, package_filter = self.launcher._resolve_link()
+            
+            if not self.launcher.adb.open_url(link_to_open, package_name=package_filter):
+                self.logger.error("Failed to open deep link")
+                self._fail_attempt()
+                return
+            
+            self.logger.success(f"Link opened: {link_to_open}")
+            self._mark_link_opened()
+        
+        if not detector.is_roblox_foreground(detector.snapshot(ui=False)):
+            if not self._expired():
+                self._poll_again()
+                return
+            self.logger.warning("Roblox did not reach the foreground in time")
+        
+        self.logger.status("Waiting for game to load...")
+        self._enter(self.LOAD)
+    
+    def _step_load(self):
+        """Poll until in game, disconnected or a Play button shows; tap Play"""
+        snapshot = self.launcher.detector.snapshot()
+        
+        # A refused probe is no answer, not a settled screen
+        with record_refusals() as refused:
+            settled = self.launcher._is_load_settled(snapshot)
+        
+        if (refused or not settled) and not self._expired():
+            self._poll_again()
+            return
+        
+        # A tapped Play button needs a moment before verifying
+        tapped = self.launcher._handle_play_button(snapshot)
+        self.logger.status("Verifying game join...")
+        self._enter(self.VERIFY, 2 if tapped else 0)
+    
+    def _step_verify(self):
+        """Poll for in_game; at the deadline accept loading too"""
+        with record_refusals() as refused:
+            state = self.launcher.detector.detect_state()
+        self._finish_verify(state, bool(refused))
+    
+    def _finish_verify(self, state: str, refused: bool = False):
+        """
+        Act on a verify poll result
+        
+        Args:
+            state: Detected state
+            refused: Some probe was refused by the command guard, so the state is a guess
+        """
+        if refused:
+            if not self._expired():
+                self._poll_again()
+            else:
+                self.logger.warning("Device did not answer while verifying the join")
+                self._fail_attempt()
+        elif state == 'in_game' or (self._expired() and state == 'loading'):
+            self._succeed(state)
+        elif not self._expired():
+            self._poll_again()
+        else:
+            self.logger.warning(f"Unexpected state after join: {state}")
+            self._fail_attempt()
+    
+    def _step_backoff(self):
+        """Backoff elapsed: start the next attempt"""
+        self._next_attempt()
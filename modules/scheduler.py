@@ -0,0 +1,225 @@
+"""
+Scheduler Module
+Interleaves periodic checks of several instances on one device
+"""
+
+import collections
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class CheckScheduler:
+    """Tracks when each instance is next due for a check"""
+    
+    # States that count as a disconnect in the rate history
+    DOWN_STATES = ('disconnected', 'not_running')
+    
+    # States where something is about to change: check at min_interval
+    FAST_STATES = ('loading', 'disconnected', 'not_running')
+    
+    # Seconds in game for the interval to grow by one check_interval
+    STABLE_RAMP = 600
+    
+    # Accepted chance that a disconnect happens within one interval
+    DISCONNECT_RISK = 0.05
+    
+    def __init__(self, interval: float, min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None, adaptive: bool = False,
+                 history_window: float = 3600):
+        """
+        Args:
+            interval: Base seconds between checks
+            min_interval: Shortest adaptive interval (default: interval / 4)
+            max_interval: Longest adaptive interval (default: interval * 4)
+            adaptive: Derive intervals from state and disconnect history
+            history_window: Seconds of disconnect history used for the rate
+        """
+        self.configure(interval, min_interval, max_interval, adaptive)
+        self.history_window = history_window
+        self._next_check: Dict[str, float] = {}
+        
+        # key -> (last state, monotonic time it was entered)
+        self._states: Dict[str, Tuple[str, float]] = {}
+        
+        # key -> monotonic times of recent disconnects
+        self._disconnects: Dict[str, Deque[float]] = {}
+    
+    def configure(self, interval: float, min_interval: Optional[float] = None,
+                  max_interval: Optional[float] = None, adaptive: bool = False):
+        """
+        Set the intervals (also used for a live config reload; due times are kept)
+        
+        Args:
+            interval: Base seconds between checks
+            min_interval: Shortest adaptive interval (default: interval / 4)
+            max_interval: Longest adaptive interval (default: interval * 4)
+            adaptive: Derive intervals from state and disconnect history
+        """
+        self.interval = interval
+        self.min_interval = min_interval if min_interval is not None else interval / 4
+        self.max_interval = max_interval if max_interval is not None else interval * 4
+        self.adaptive = adaptive
+    
+    def add(self, key: str, delay: float = 0):
+        """
+        Register an instance
+        
+        Args:
+            key: Instance name
+            delay: Seconds until its first check
+        """
+        self._next_check[key] = time.monotonic() + delay
+    
+    def add_staggered(self, keys: List[str]):
+        """
+        Register instances spread evenly over one check interval
+        
+        Args:
+            keys: Instance names
+        """
+        step = self.interval / max(len(keys), 1)
+        for index, key in enumerate(keys):
+            self.add(key, index * step)
+    
+    def remove(self, key: str):
+        """
+        Stop scheduling an instance
+        
+        Args:
+            key: Instance name
+        """
+        self._next_check.pop(key, None)
+        self._states.pop(key, None)
+        self._disconnects.pop(key, None)
+    
+    def observe(self, key: str, state: str):
+        """
+        Record the state a check found (input for adaptive intervals)
+        
+        Args:
+            key: Instance name
+            state: Detected state
+        """
+        now = time.monotonic()
+        previous = self._states.get(key)
+        
+        if previous is not None and previous[0] == state:
+            return
+        
+        self._states[key] = (state, now)
+        
+        if state in self.DOWN_STATES and (previous is None or previous[0] not in self.DOWN_STATES):
+            self._disconnects.setdefault(key, collections.deque()).append(now)
+    
+    def disconnect_rate(self, key: str) -> float:
+        """
+        Get recent disconnects per second of an instance
+        
+        Args:
+            key: Instance name
+            
+        Returns:
+            Disconnects in the history window divided by its length
+        """
+        history = self._disconnects.get(key)
+        if not history:
+            return 0.0
+        
+        cutoff = time.monotonic() - self.history_window
+        while history and history[0] < cutoff:
+            history.popleft()
+        
+        return len(history) / self.history_window
+    
+    def interval_for(self, key: str) -> float:
+        """
+        Get the next check interval of an instance
+        
+        Fast while loading or down, growing with time spent in game, and
+        capped so a check is due before the next expected disconnect.
+        
+        Args:
+            key: Instance name
+            
+        Returns:
+            Seconds (interval when not adaptive or nothing is known yet)
+        """
+        current = self._states.get(key)
+        if not self.adaptive or current is None:
+            return self.interval
+        
+        state, since = current
+        
+        if state in self.FAST_STATES:
+            return self.min_interval
+        
+        if state == 'in_game':
+            stable = time.monotonic() - since
+            interval = self.interval * (1 + stable / self.STABLE_RAMP)
+        else:
+            # background, home, unknown: not settled yet
+            interval = self.interval / 2
+        
+        rate = self.disconnect_rate(key)
+        if rate > 0:
+            interval = min(interval, self.DISCONNECT_RISK / rate)
+        
+        return min(self.max_interval, max(self.min_interval, interval))
+    
+    def schedule(self, key: str, delay: Optional[float] = None):
+        """
+        Set the next check of an instance
+        
+        Args:
+            key: Instance name
+            delay: Seconds from now (default: interval_for(key))
+        """
+        self._next_check[key] = time.monotonic() + (self.interval_for(key) if delay is None else delay)
+    
+    def due(self) -> List[str]:
+        """
+        Get instances whose check time has come, most overdue first
+        
+        Returns:
+            Instance names
+        """
+        now = time.monotonic()
+        ready = [key for key, at in self._next_check.items() if at <= now]
+        return sorted(ready, key=self._next_check.get)
+    
+    def time_until(self, key: str) -> Optional[float]:
+        """
+        Get seconds until an instance's next check
+        
+        Args:
+            key: Instance name
+            
+        Returns:
+            Seconds (0 if due), None if the instance is not scheduled
+        """
+        at = self._next_check.get(key)
+        return None if at is None else max(0.0, at - time.monotonic())
+    
+    def state_age(self, key: str) -> Optional[float]:
+        """
+        Get seconds since an instance entered its last observed state
+        
+        Args:
+            key: Instance name
+            
+        Returns:
+            Seconds, None before the first observation
+        """
+        current = self._states.get(key)
+        return None if current is None else time.monotonic() - current[1]
+    
+    def time_until_next(self) -> float:
+        """
+        Get seconds until the next check is due
+        
+        Returns:
+            Seconds (0 if something is already due)
+        """
+        if not self._next_check:
+            return self.interval
+        return max(0.0, min(self._next_check.values()) - time.monotonic())
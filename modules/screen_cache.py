@@ -0,0 +1,131 @@
+"""
+Screen Cache Module
+Cheap frame fingerprints so unchanged screens skip the UI dump
+"""
+
+import hashlib
+import struct
+import time
+from typing import Any, Optional, Tuple
+
+
+# Sampled grid size per axis (GRID x GRID pixels feed the hash)
+GRID = 32
+
+# Low bits dropped from each channel so encoder/dither noise doesn't change the hash
+QUANTIZE_SHIFT = 4
+
+
+def parse_frame_header(data: Optional[bytes]) -> Optional[Tuple[int, int, int]]:
+    """
+    Read the header of a raw `screencap` frame
+    
+    Raw screencap output is a header (width, height, format and, on Android 9+,
+    a color space) followed by RGBA pixels.
+    
+    Args:
+        data: Raw screencap output
+        
+    Returns:
+        (width, height, pixel data offset) or None if the frame is incomplete
+    """
+    if not data or len(data) < 12:
+        return None
+    
+    width, height, _ = struct.unpack_from('<III', data)
+    pixels = width * height * 4
+    
+    if width == 0 or height == 0 or len(data) < 12 + pixels:
+        return None
+    
+    # The header is 12 or 16 bytes depending on Android version
+    header = len(data) - pixels if len(data) - pixels in (12, 16) else 12
+    return width, height, header
+
+
+def fingerprint_frame(data: Optional[bytes]) -> Optional[str]:
+    """
+    Hash a downsampled copy of a raw `screencap` frame
+    
+    Only a GRID x GRID sample of the pixels is hashed, so the cost does not
+    grow with the resolution.
+    
+    Args:
+        data: Raw screencap output
+        
+    Returns:
+        Hex digest, or None if the frame could not be read
+    """
+    frame = parse_frame_header(data)
+    if frame is None:
+        return None
+    
+    width, height, header = frame
+    digest = hashlib.blake2b(struct.pack('<II', width, height), digest_size=8)
+    sample = bytearray()
+    
+    for row in range(GRID):
+        y = (row * height) // GRID
+        row_start = header + y * width * 4
+        
+        for column in range(GRID):
+            offset = row_start + ((column * width) // GRID) * 4
+            # RGB only; alpha is constant on a screen
+            for channel in data[offset:offset + 3]:
+                sample.append(channel >> QUANTIZE_SHIFT)
+    
+    digest.update(bytes(sample))
+    return digest.hexdigest()
+
+
+class ScreenCache:
+    """Remembers what the last UI dump concluded for one screen fingerprint"""
+    
+    def __init__(self, max_age: float = 60):
+        """
+        Args:
+            max_age: Seconds a result is reused before a fresh dump is forced,
+                even if the screen looks unchanged
+        """
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._fingerprint: Optional[str] = None
+        self._value: Any = None
+        self._stored_at = 0.0
+    
+    def get(self, fingerprint: Optional[str]) -> Optional[Any]:
+        """
+        Get the cached result if the screen has not changed
+        
+        Args:
+            fingerprint: Current frame fingerprint (None = unknown)
+            
+        Returns:
+            Cached result, or None if a fresh dump is needed
+        """
+        if (fingerprint is not None
+                and fingerprint == self._fingerprint
+                and time.monotonic() - self._stored_at < self.max_age):
+            self.hits += 1
+            return self._value
+        
+        self.misses += 1
+        return None
+    
+    def put(self, fingerprint: Optional[str], value: Any):
+        """
+        Store the result of a fresh dump
+        
+        Args:
+            fingerprint: Frame fingerprint taken before the dump
+            value: Result to reuse for that frame
+        """
+        self._fingerprint = fingerprint
+        self._value = value
+        self._stored_at = time.monotonic()
+    
+    def invalidate(self):
+        """Forget the cached result (e.g. after relaunching the app)"""
+        self._fingerprint = None
+        self._value = None
@@ -1,24 +1,112 @@
 """
 Screenshot Module
-Handles taking screenshots for debugging
+Keeps the last raw frames in memory and writes them as PNG when something goes wrong
 """
 
+import collections
 import os
+import queue
+import struct
+import threading
+import time
+import zlib
 from datetime import datetime
+from typing import Deque, List, Optional, Tuple
 from .adb_helper import ADBHelper
 from .logger import ColoredLogger
+from .screen_cache import parse_frame_header
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# A buffered frame this recent (seconds) is what the failing check saw; no new capture
+FRAME_REUSE_SECONDS = 2.0
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    """One PNG chunk: length, type, data, CRC"""
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def encode_png(data: Optional[bytes], level: int = 6) -> Optional[bytes]:
+    """
+    Encode a raw `screencap` frame as an RGBA PNG
+    
+    Rows are fed to the compressor straight from the frame, so no second
+    full-size copy of the pixels is made.
+    
+    Args:
+        data: Raw screencap output
+        level: zlib compression level
+        
+    Returns:
+        PNG file contents, or None if the frame could not be read
+    """
+    frame = parse_frame_header(data)
+    if frame is None:
+        return None
+    
+    width, height, header = frame
+    stride = width * 4
+    pixels = memoryview(data)
+    compressor = zlib.compressobj(level)
+    parts = []
+    
+    for y in range(height):
+        start = header + y * stride
+        # Filter type 0 (none) before every row
+        parts.append(compressor.compress(b'\x00'))
+        parts.append(compressor.compress(pixels[start:start + stride]))
+    parts.append(compressor.flush())
+    
+    return b''.join([
+        PNG_SIGNATURE,
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)),
+        _png_chunk(b'IDAT', b''.join(parts)),
+        _png_chunk(b'IEND', b'')
+    ])
 
 
 class ScreenshotManager:
     """Manages screenshots for debugging"""
     
-    def __init__(self, adb: ADBHelper, logger: ColoredLogger, screenshot_dir: str = "logs/screenshots"):
+    def __init__(self, adb: ADBHelper, logger: ColoredLogger, screenshot_dir: str = "logs/screenshots",
+                 buffer_frames: int = 3, max_disk_bytes: int = 50 * 1024 * 1024):
+        """
+        Args:
+            adb: ADB helper
+            logger: Logger
+            screenshot_dir: Where PNGs are written
+            buffer_frames: Raw frames kept in memory (the ones before an error are saved with it)
+            max_disk_bytes: Size of screenshot_dir above which the oldest PNGs are deleted (0 = no limit)
+        """
         self.adb = adb
         self.logger = logger
         self.screenshot_dir = screenshot_dir
+        self.max_disk_bytes = max_disk_bytes
+        
+        # Last raw frames as (monotonic time, data), newest last; older than _saved_until are on disk
+        self.frames: Deque[Tuple[float, bytes]] = collections.deque(maxlen=max(1, buffer_frames))
+        self._saved_until = 0.0
+        self._lock = threading.Lock()
+        
+        # Capture, encoding and writing of error screenshots happen on this thread
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
         
         # Create screenshot directory
         os.makedirs(screenshot_dir, exist_ok=True)
+        self._enforce_quota()
+    
+    def add_frame(self, data: bytes):
+        """
+        Keep a captured raw frame; the oldest one drops out of the ring (any thread)
+        
+        Args:
+            data: Raw screencap output
+        """
+        with self._lock:
+            self.frames.append((time.monotonic(), data))
     
     def take_screenshot(self, prefix: str = "screen") -> str:
         """
@@ -40,6 +128,7 @@ class ScreenshotManager:
         
         if success:
             self.logger.debug(f"Screenshot saved: {filepath}")
+            self._enforce_quota()
             return filepath
         else:
             self.logger.error("Failed to take screenshot")
@@ -47,9 +136,121 @@ class ScreenshotManager:
     
     def screenshot_on_error(self, error_type: str = "error"):
         """
-        Take screenshot when error occurs
+        Save the buffered frames plus a fresh capture, without blocking the caller
         
         Args:
             error_type: Type of error
         """
-        self.take_screenshot(f"error_{error_type}")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+            self._thread.start()
+        
+        self._jobs.put(f"error_{error_type}")
+    
+    def close(self, timeout: float = 10):
+        """
+        Finish queued screenshots and stop the writer thread
+        
+        Args:
+            timeout: Longest wait in seconds
+        """
+        if self._thread is None:
+            return
+        
+        self._jobs.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def _run(self):
+        """Writer thread: one queued error at a time"""
+        while True:
+            prefix = self._jobs.get()
+            if prefix is None:
+                return
+            
+            try:
+                self._save_frames(prefix)
+            except Exception as e:
+                self.logger.error(f"Failed to save screenshot: {e}")
+    
+    def _save_frames(self, prefix: str) -> List[str]:
+        """
+        Capture the current frame unless the check just did, then write every frame not saved yet
+        
+        The capture gives way to the monitor: it is refused while a check's
+        screencap runs (the buffered frames are saved instead) and never
+        gets the check's screencap refused.
+        
+        Args:
+            prefix: Filename prefix
+            
+        Returns:
+            Written paths (newest last)
+        """
+        with self._lock:
+            fresh = bool(self.frames) and time.monotonic() - self.frames[-1][0] < FRAME_REUSE_SECONDS
+        
+        data = None if fresh else self.adb.get_screen_frame(label='screenshot')
+        
+        with self._lock:
+            if data is not None and not (self.frames and self.frames[-1][1] is data):
+                self.frames.append((time.monotonic(), data))
+            
+            pending = [(taken, frame) for taken, frame in self.frames if taken > self._saved_until]
+            if pending:
+                self._saved_until = pending[-1][0]
+        
+        if not pending:
+            self.logger.error("Failed to take screenshot")
+            return []
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        newest = pending[-1][0]
+        paths = []
+        
+        for taken, frame in pending:
+            png = encode_png(frame)
+            if png is None:
+                continue
+            
+            # Earlier frames are named by how long before the newest one they were taken
+            age = newest - taken
+            suffix = f"_-{age:.1f}s" if age >= 0.05 else ""
+            filepath = os.path.join(self.screenshot_dir, f"{prefix}_{timestamp}{suffix}.png")
+            
+            with open(filepath, 'wb') as f:
+                f.write(png)
+            paths.append(filepath)
+        
+        if paths:
+            self.logger.info(f"📸 Screenshot saved: {paths[-1]}"
+                             + (f" (+{len(paths) - 1} earlier)" if len(paths) > 1 else ""))
+            self._enforce_quota()
+        
+        return paths
+    
+    def _enforce_quota(self):
+        """Delete the oldest PNGs until screenshot_dir fits max_disk_bytes"""
+        if not self.max_disk_bytes:
+            return
+        
+        entries = []
+        try:
+            with os.scandir(self.screenshot_dir) as scan:
+                for entry in scan:
+                    if entry.name.endswith('.png') and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        
+        total = sum(size for _, size, _ in entries)
+        
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
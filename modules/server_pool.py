@@ -0,0 +1,209 @@
+"""
+Server Pool Module
+Several join targets (VIP links / place IDs) with latency-ranked failover
+"""
+
+import re
+import time
+from typing import Callable, List, Optional
+
+
+class ServerTarget:
+    """One join target with its resolved deep link and join history"""
+    
+    # Weight of the newest join in the latency average
+    SMOOTHING = 0.3
+    
+    def __init__(self, source: str, link: str, label: str):
+        """
+        Args:
+            source: As configured (VIP link or place ID)
+            link: Deep link resolved once at startup
+            label: Short name for logs and metrics
+        """
+        self.source = source
+        self.link = link
+        self.label = label
+        
+        self.attempts = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None
+        
+        # Monotonic time before which the target is not picked again
+        self.cooldown_until = 0.0
+    
+    @property
+    def is_vip(self) -> bool:
+        """Whether this is a private server link"""
+        return self.label.startswith('vip:')
+    
+    @property
+    def place_id(self) -> Optional[str]:
+        """Place the target joins, if its source or link names one (share links don't)"""
+        if self.source.isdigit():
+            return self.source
+        
+        match = re.search(r'placeId=(\d+)', f"{self.link} {self.source}")
+        return match.group(1) if match else None
+    
+    @property
+    def success_rate(self) -> float:
+        """Smoothed success rate (0.5 before the first join)"""
+        return (self.attempts - self.failures + 1) / (self.attempts + 2)
+    
+    def record(self, success: bool, seconds: float):
+        """
+        Add one join
+        
+        Args:
+            success: Whether it got in game
+            seconds: Link opened to verified (or given up)
+        """
+        self.attempts += 1
+        
+        if success:
+            self.consecutive_failures = 0
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency += (seconds - self.latency) * self.SMOOTHING
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+    
+    def cost(self, default_latency: float) -> float:
+        """Expected seconds to a successful join (latency / success rate)"""
+        latency = self.latency if self.latency is not None else default_latency
+        return latency / self.success_rate
+
+
+class ServerPool:
+    """Picks the join target; rotates away from one that keeps failing or slows down"""
+    
+    def __init__(self, targets: List[ServerTarget], failover_after: int = 2,
+                 slow_factor: float = 2.0, cooldown: float = 300):
+        """
+        Args:
+            targets: Join targets, preferred first
+            failover_after: Consecutive failures before rotating away
+            slow_factor: Rotate when the current target's latency is this
+                many times the best other healthy one
+            cooldown: Seconds a failed-over target is left alone
+        """
+        if not targets:
+            raise ValueError("No game to join: set game_id, vip_server_link or servers")
+        
+        self.targets = targets
+        self.failover_after = failover_after
+        self.slow_factor = slow_factor
+        self.cooldown = cooldown
+        self.current = targets[0]
+        
+        # Current target was picked only to measure it (see select)
+        self._exploring = False
+    
+    @classmethod
+    def from_sources(cls, sources: List[str], resolve: Callable[[str], str], **options) -> 'ServerPool':
+        """
+        Build a pool, resolving each configured target to a deep link once
+        
+        Args:
+            sources: VIP server links and/or place IDs
+            resolve: VIP link -> deep link
+            **options: ServerPool settings
+            
+        Returns:
+            Pool with one target per distinct source
+        """
+        targets = []
+        seen = set()
+        
+        for source in sources:
+            source = str(source).strip()
+            if not source or source in seen:
+                continue
+            seen.add(source)
+            
+            if source.isdigit():
+                targets.append(ServerTarget(source, f"roblox://placeId={source}", f"place:{source}"))
+            else:
+                link = resolve(source)
+                code = link.split('code=', 1)[1].split('&', 1)[0] if 'code=' in link else str(len(targets))
+                targets.append(ServerTarget(source, link, f"vip:{code[:8]}"))
+        
+        return cls(targets, **options)
+    
+    def _healthy(self, target: ServerTarget, now: float) -> bool:
+        """Whether a target may be picked"""
+        return now >= target.cooldown_until and target.consecutive_failures < self.failover_after
+    
+    def _default_latency(self) -> float:
+        """Latency assumed for targets never joined (mean of the measured ones)"""
+        measured = [target.latency for target in self.targets if target.latency is not None]
+        return sum(measured) / len(measured) if measured else 30.0
+    
+    def select(self) -> ServerTarget:
+        """
+        Pick the target for the next join
+        
+        Keeps the current target while it is healthy and not much slower
+        than the best alternative; otherwise moves to the healthy target
+        with the lowest expected join time. Once the current target has a
+        measured join, each healthy target never joined is tried once so
+        there is a latency to compare against; after that try the cheapest
+        healthy target is picked.
+        
+        Returns:
+            Target to join
+        """
+        if len(self.targets) == 1:
+            return self.current
+        
+        now = time.monotonic()
+        default_latency = self._default_latency()
+        current = self.current
+        
+        candidates = [target for target in self.targets if target is not current and self._healthy(target, now)]
+        best = min(candidates, key=lambda target: target.cost(default_latency), default=None)
+        untried = next((target for target in candidates if target.attempts == 0), None)
+        
+        if self._healthy(current, now):
+            if self._exploring:
+                # Measured: settle on the cheapest healthy target, maybe the one before
+                self._exploring = False
+                if best is None or current.cost(default_latency) <= best.cost(default_latency):
+                    return current
+            elif current.latency is not None and untried is not None:
+                self._exploring = True
+                best = untried
+            else:
+                slow = (best is not None and best.latency is not None and current.latency is not None
+                        and current.latency > best.latency * self.slow_factor)
+                if not slow:
+                    return current
+        else:
+            self._exploring = False
+            
+            if current.consecutive_failures >= self.failover_after:
+                # Give it a rest, then a fresh chance
+                current.cooldown_until = now + self.cooldown
+                current.consecutive_failures = 0
+        
+        if best is None:
+            # Everything is cooling down: least recently failed target
+            best = min(self.targets, key=lambda target: target.cooldown_until)
+        
+        self.current = best
+        return best
+    
+    def record(self, target: ServerTarget, success: bool, seconds: float):
+        """
+        Add a join result
+        
+        Args:
+            target: Target that was joined
+            success: Whether it got in game
+            seconds: Join duration
+        """
+        target.record(success, seconds)
@@ -0,0 +1,188 @@
+"""
+Shell Session Module
+Keeps one long-lived shell open so commands don't fork a new /bin/sh each time
+"""
+
+import os
+import select
+import signal
+import subprocess
+import threading
+import time
+from typing import List, Optional, Tuple, Union
+
+
+class ShellSessionError(RuntimeError):
+    """Raised when the persistent shell cannot be started or has died"""
+
+
+class ShellSession:
+    """Persistent sh/su process driven through stdin with sentinel-framed output"""
+    
+    def __init__(self, shell: Union[str, List[str]] = "sh"):
+        """
+        Args:
+            shell: Shell program, or its full command line (e.g. ['adb', '-s', serial, 'shell'])
+        """
+        self.shell = shell
+        self.process: Optional[subprocess.Popen] = None
+        self._buffer = bytearray()
+        self._counter = 0
+        self._lock = threading.Lock()
+    
+    def start(self) -> bool:
+        """
+        Start the shell process
+        
+        Returns:
+            True if the shell answered a test command
+        """
+        self.close()
+        
+        try:
+            self.process = subprocess.Popen(
+                [self.shell] if isinstance(self.shell, str) else list(self.shell),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+                start_new_session=True
+            )
+        except OSError:
+            self.process = None
+            return False
+        
+        # su may be denied or prompt; make sure the shell actually answers
+        try:
+            returncode, output = self._execute("echo ready", timeout=10)
+        except (ShellSessionError, subprocess.TimeoutExpired):
+            self.close()
+            return False
+        
+        if returncode != 0 or output.strip() != "ready":
+            self.close()
+            return False
+        
+        return True
+    
+    def describe(self) -> str:
+        """Shell command line for messages"""
+        return self.shell if isinstance(self.shell, str) else ' '.join(self.shell)
+    
+    def is_alive(self) -> bool:
+        """
+        Check if the shell process is still running
+        
+        Returns:
+            True if alive
+        """
+        return self.process is not None and self.process.poll() is None
+    
+    def close(self):
+        """Terminate the shell process and everything it spawned"""
+        if self.process is None:
+            return
+        
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
+        
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        
+        self.process = None
+        self._buffer = bytearray()
+    
+    def run(self, command: str, timeout: float = 10) -> Tuple[int, str]:
+        """
+        Run a command in the persistent shell
+        
+        Restarts the shell first if it has died. On timeout the shell is
+        killed (the command may still be writing to it) and restarted on
+        the next call.
+        
+        Args:
+            command: Shell command to execute
+            timeout: Command timeout in seconds
+            
+        Returns:
+            (exit code, stdout)
+            
+        Raises:
+            ShellSessionError: Shell could not be (re)started
+            subprocess.TimeoutExpired: Command did not finish in time
+        """
+        with self._lock:
+            if not self.is_alive() and not self.start():
+                raise ShellSessionError(f"Cannot start shell '{self.describe()}'")
+            
+            try:
+                return self._execute(command, timeout)
+            except subprocess.TimeoutExpired:
+                self.close()
+                raise
+            except ShellSessionError:
+                self.close()
+                raise
+    
+    def _execute(self, command: str, timeout: float) -> Tuple[int, str]:
+        """Write a framed command and read until its end marker"""
+        self._counter += 1
+        marker = f"__AUTOREJOIN_{os.getpid()}_{self._counter}__"
+        
+        # Braces keep the command in the current shell (no subshell fork);
+        # stdin is detached so commands can't swallow the next frame
+        script = (
+            f"{{ {command}\n}} </dev/null\n"
+            f"printf '\\n{marker} %d\\n' $?\n"
+        )
+        
+        try:
+            self.process.stdin.write(script.encode('utf-8'))
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, AttributeError) as e:
+            raise ShellSessionError(f"Shell write failed: {e}")
+        
+        end = b"\n" + marker.encode('ascii') + b" "
+        deadline = time.monotonic() + timeout
+        fd = self.process.stdout.fileno()
+        
+        # Grown in place and searched only past what was already searched,
+        # so big outputs (uiautomator dumps, base64 frames) stay linear
+        searched = 0
+        
+        while True:
+            index = self._buffer.find(end, searched)
+            if index != -1:
+                newline = self._buffer.find(b"\n", index + len(end))
+                if newline != -1:
+                    output = self._buffer[:index].decode('utf-8', errors='replace')
+                    returncode = int(self._buffer[index + len(end):newline] or b"1")
+                    del self._buffer[:newline + 1]
+                    return returncode, output
+            else:
+                # The marker may straddle the next chunk
+                searched = max(0, len(self._buffer) - len(end) + 1)
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(command, timeout)
+            
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise ShellSessionError("Shell closed its output")
+            
+            self._buffer += chunk
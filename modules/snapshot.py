@@ -0,0 +1,189 @@
+"""
+Snapshot Module
+Per-tick view of the device that loads each fact at most once
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+from .adb_helper import ADBHelper
+from .ui_parser import UINode
+from .screen_cache import fingerprint_frame
+
+
+# Marks a fact that has not been loaded yet (None is a valid loaded value)
+_NOT_LOADED = object()
+
+
+class DeviceSnapshot:
+    """Lazily loaded, memoized device facts shared by everything in one tick"""
+    
+    def __init__(self, adb: ADBHelper, packages: Optional[List[str]] = None, ui: bool = True):
+        """
+        Args:
+            adb: ADB helper
+            packages: Packages checked this tick; with more than one, a single
+                process listing answers every is_package_running() call
+            ui: Whether this tick is expected to need UI texts, so the probe
+                script (if installed) dumps them in the same call
+        """
+        self.adb = adb
+        self.packages = list(packages or [])
+        self.ui = ui
+        self._probe = _NOT_LOADED
+        self._running: Dict[str, bool] = {}
+        self._running_packages = _NOT_LOADED
+        self._current_activity = _NOT_LOADED
+        self._screen_texts = _NOT_LOADED
+        self._ui_nodes = _NOT_LOADED
+        self._screen_size = _NOT_LOADED
+        self._screen_frame = _NOT_LOADED
+        self._screen_fingerprint = _NOT_LOADED
+        self._derived: Dict[Hashable, Any] = {}
+    
+    def is_package_running(self, package_name: str) -> bool:
+        """
+        Check if a package is running (/proc when available, else the probe
+        script, one shared process listing, or pidof once per package)
+        
+        Args:
+            package_name: Android package name
+            
+        Returns:
+            True if package is running
+        """
+        if package_name not in self._running:
+            if self.adb.process_tracker is not None:
+                # /proc lookups are cheaper than anything a command can do
+                self._running[package_name] = self.adb.is_package_running(package_name)
+                return self._running[package_name]
+            
+            probe = self._probe_facts()
+            running = self._shared_running_packages()
+            
+            if probe is not None and package_name in probe['pids']:
+                self._running[package_name] = bool(probe['pids'][package_name])
+            elif running is not None and package_name in self.packages:
+                self._running[package_name] = package_name in running
+            else:
+                self._running[package_name] = self.adb.is_package_running(package_name)
+        
+        return self._running[package_name]
+    
+    def _probe_facts(self) -> Optional[dict]:
+        """All facts from one probe script call (None if not installed or failed)"""
+        if not self.adb.probe_path:
+            return None
+        
+        if self._probe is _NOT_LOADED:
+            self._probe = self.adb.probe(self.packages, include_ui=self.ui)
+        
+        return self._probe
+    
+    def _shared_running_packages(self) -> Optional[Set[str]]:
+        """Running subset of self.packages from one process listing"""
+        if len(self.packages) < 2 or self._probe_facts() is not None:
+            return None
+        
+        if self._running_packages is _NOT_LOADED:
+            self._running_packages = self.adb.get_running_packages(self.packages)
+        
+        return self._running_packages
+    
+    @property
+    def current_activity(self) -> Optional[str]:
+        """Current foreground activity (dumpsys window, once)"""
+        if self._current_activity is _NOT_LOADED:
+            probe = self._probe_facts()
+            
+            if probe is not None:
+                self._current_activity = probe['current_activity']
+            else:
+                self._current_activity = self.adb.get_current_activity()
+        
+        return self._current_activity
+    
+    @property
+    def screen_texts(self) -> List[str]:
+        """Visible screen texts (uiautomator dump, once)"""
+        if self._screen_texts is _NOT_LOADED:
+            probe = self._probe_facts()
+            
+            if probe is not None and probe['screen_texts'] is not None:
+                self._screen_texts = probe['screen_texts']
+            else:
+                # Parse the dump into nodes so bounds are there if needed later
+                self._screen_texts = [node.text for node in self.ui_nodes]
+        
+        return self._screen_texts
+    
+    @property
+    def ui_nodes(self) -> List[UINode]:
+        """UI nodes with text (uiautomator dump, once)"""
+        if self._ui_nodes is _NOT_LOADED:
+            self._ui_nodes = self.adb.get_ui_nodes()
+        
+        return self._ui_nodes
+    
+    def find_nodes(self, predicate: Callable[[UINode], bool], limit: Optional[int] = None) -> List[UINode]:
+        """
+        Find UI nodes, reusing this tick's dump if one was parsed
+        
+        Without a parsed dump, a new dump is streamed and stops as soon as
+        `limit` nodes matched.
+        
+        Args:
+            predicate: Node filter
+            limit: Max nodes to return
+            
+        Returns:
+            Matching nodes
+        """
+        if self._ui_nodes is _NOT_LOADED:
+            return self.adb.get_ui_nodes(predicate, limit)
+        
+        found = [node for node in self._ui_nodes if predicate(node)]
+        return found if limit is None else found[:limit]
+    
+    @property
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        """Screen resolution (wm size, once)"""
+        if self._screen_size is _NOT_LOADED:
+            probe = self._probe_facts()
+            
+            if probe is not None and probe['screen_size'] is not None:
+                self._screen_size = probe['screen_size']
+            else:
+                self._screen_size = self.adb.get_screen_size()
+        
+        return self._screen_size
+    
+    @property
+    def screen_frame(self) -> Optional[bytes]:
+        """Raw frame (screencap, once)"""
+        if self._screen_frame is _NOT_LOADED:
+            self._screen_frame = self.adb.get_screen_frame()
+        
+        return self._screen_frame
+    
+    @property
+    def screen_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the current frame (shares the screencap with screen_frame)"""
+        if self._screen_fingerprint is _NOT_LOADED:
+            self._screen_fingerprint = fingerprint_frame(self.screen_frame)
+        
+        return self._screen_fingerprint
+    
+    def memoize(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Compute a value derived from this snapshot once
+        
+        Args:
+            key: Cache key
+            loader: Computes the value on first request
+            
+        Returns:
+            Cached value
+        """
+        if key not in self._derived:
+            self._derived[key] = loader()
+        
+        return self._derived[key]
@@ -0,0 +1,223 @@
+"""
+Tracing Module
+Opt-in timed spans (--profile) written as Chrome trace / Perfetto JSON
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+# Span id of the innermost open span (per thread and per asyncio task)
+_current_span: contextvars.ContextVar = contextvars.ContextVar('trace_span', default=None)
+
+# Shared no-op context for when tracing is off
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    """Collects spans in a bounded buffer"""
+    
+    def __init__(self, max_events: int = 200000):
+        """
+        Args:
+            max_events: Spans kept (oldest dropped first)
+        """
+        self.pid = os.getpid()
+        self.events = deque(maxlen=max_events)
+        self._ids = itertools.count(1)
+    
+    @staticmethod
+    def _track() -> str:
+        """Trace row: the asyncio task if inside one, else the thread"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        
+        if task is not None:
+            return f"task {task.get_name()}"
+        return f"thread {threading.current_thread().name}"
+    
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, **args):
+        """
+        Time a block; spans opened inside it become its children
+        
+        Args:
+            name: Span name
+            category: Span category (adb, detector, launcher, monitor)
+            **args: Extra details shown in the trace viewer
+        """
+        span_id = next(self._ids)
+        parent = _current_span.get()
+        token = _current_span.set(span_id)
+        start = time.monotonic()
+        
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+            self.events.append((name, category, start, time.monotonic() - start,
+                                self._track(), span_id, parent, args))
+    
+    def record(self, name: str, category: str, start: float, duration: float, **args):
+        """
+        Add an already timed leaf span (e.g. a shell command)
+        
+        Args:
+            name: Span name
+            category: Span category
+            start: time.monotonic() at the start
+            duration: Seconds
+            **args: Extra details
+        """
+        self.events.append((name, category, start, duration, self._track(),
+                            next(self._ids), _current_span.get(), args))
+    
+    def to_chrome_trace(self) -> dict:
+        """Spans as a Chrome trace (open in Perfetto or chrome://tracing)"""
+        events = list(self.events)
+        origin = min((event[2] for event in events), default=0.0)
+        track_ids: Dict[str, int] = {}
+        for event in events:
+            track_ids.setdefault(event[4], len(track_ids) + 1)
+        
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': track}}
+            for track, tid in track_ids.items()
+        ]
+        
+        for name, category, start, duration, track, span_id, parent, args in events:
+            trace_events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': round((start - origin) * 1e6, 3),
+                'dur': round(duration * 1e6, 3),
+                'pid': self.pid,
+                'tid': track_ids[track],
+                'args': {'id': span_id, 'parent': parent, **args}
+            })
+        
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+    
+    def summary(self, category: str = 'adb') -> List[str]:
+        """
+        Latency table per span name
+        
+        Args:
+            category: Spans to summarize (default: shell commands)
+            
+        Returns:
+            Report lines
+        """
+        durations: Dict[str, List[float]] = {}
+        for name, event_category, _, duration, *_ in self.events:
+            if event_category == category:
+                durations.setdefault(name, []).append(duration * 1000)
+        
+        lines = [f"{'name':<24} {'count':>7} {'total ms':>11} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}"]
+        
+        for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            values.sort()
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            lines.append(f"{name:<24} {len(values):>7} {sum(values):>11.1f} {statistics.fmean(values):>9.2f} "
+                         f"{statistics.median(values):>9.2f} {p95:>9.2f} {values[-1]:>9.2f}")
+        
+        return lines
+    
+    def save(self, path: str) -> str:
+        """
+        Write the trace JSON and a command latency summary next to it
+        
+        Args:
+            path: Trace file (.json)
+            
+        Returns:
+            Summary text
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+        
+        text = "\n".join(self.summary())
+        with open(os.path.splitext(path)[0] + "_summary.txt", 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        
+        return text
+
+
+# Process-wide tracer; None until --profile enables it
+_tracer: Optional[Tracer] = None
+
+
+def enable(max_events: int = 200000) -> Tracer:
+    """Turn tracing on for the whole process"""
+    global _tracer
+    _tracer = Tracer(max_events)
+    return _tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Active tracer (None when tracing is off)"""
+    return _tracer
+
+
+def span(name: str, category: str, **args):
+    """Span context manager, or a shared no-op when tracing is off"""
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.span(name, category, **args)
+
+
+def record(name: str, category: str, start: float, duration: float, **args):
+    """Record a leaf span if tracing is on (see Tracer.record)"""
+    if _tracer is not None:
+        _tracer.record(name, category, start, duration, **args)
+
+
+def traced(category: str, name: Optional[str] = None) -> Callable:
+    """
+    Decorator wrapping every call of a function (sync or async) in a span
+    
+    Args:
+        category: Span category
+        name: Span name (default: Class.method)
+    """
+    def decorate(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with _tracer.span(span_name, category):
+                    return await func(*args, **kwargs)
+            
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.span(span_name, category):
+                return func(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorate
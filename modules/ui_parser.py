@@ -0,0 +1,146 @@
+"""
+UI Parser Module
+Incremental parser for uiautomator dumps producing compact node records
+"""
+
+import codecs
+import re
+import xml.etree.ElementTree as ET
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+_BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+
+
+class UINode:
+    """One node of the UI hierarchy (only the fields the tool uses)"""
+    
+    __slots__ = ('text', 'resource_id', 'class_name', 'bounds')
+    
+    def __init__(self, text: str, resource_id: str, class_name: str,
+                 bounds: Optional[Tuple[int, int, int, int]]):
+        self.text = text
+        self.resource_id = resource_id
+        self.class_name = class_name
+        self.bounds = bounds
+    
+    @property
+    def center(self) -> Optional[Tuple[int, int]]:
+        """Center point of the node bounds"""
+        if self.bounds is None:
+            return None
+        
+        left, top, right, bottom = self.bounds
+        return ((left + right) // 2, (top + bottom) // 2)
+    
+    def __repr__(self) -> str:
+        return f"UINode(text={self.text!r}, resource_id={self.resource_id!r}, bounds={self.bounds})"
+
+
+def parse_bounds(value: Optional[str]) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Parse a uiautomator bounds attribute
+    
+    Args:
+        value: e.g. "[0,0][720,1280]"
+        
+    Returns:
+        (left, top, right, bottom) or None
+    """
+    if not value:
+        return None
+    
+    match = _BOUNDS_PATTERN.match(value)
+    if not match:
+        return None
+    
+    return tuple(int(group) for group in match.groups())
+
+
+def iter_nodes(chunks: Union[str, bytes, Iterable[Union[str, bytes]]]) -> Iterator[UINode]:
+    """
+    Parse a UI dump incrementally, yielding nodes as they are read
+    
+    Elements are cleared once converted, so memory stays bounded by the
+    depth of the hierarchy rather than its size. Anything after the root
+    element (uiautomator prints a status line) is ignored, and a truncated
+    or malformed dump just ends the iteration.
+    
+    Args:
+        chunks: Whole dump, or an iterable of chunks as they arrive
+        
+    Yields:
+        Nodes in document order
+    """
+    if isinstance(chunks, (str, bytes)):
+        chunks = [chunks]
+    
+    # Decode incrementally so multi-byte characters split across chunks survive
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+    started = False
+    
+    for chunk in chunks:
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        
+        if not started:
+            # Skip anything before the XML declaration/root
+            index = text.find('<')
+            if index == -1:
+                continue
+            text = text[index:]
+            started = True
+        
+        try:
+            parser.feed(text)
+            for event, element in parser.read_events():
+                if event == 'start':
+                    stack.append(element)
+                    
+                    # Attributes are complete at the start tag: parents come before their children
+                    if element.tag == 'node':
+                        yield UINode(
+                            element.get('text', ''),
+                            element.get('resource-id', ''),
+                            element.get('class', ''),
+                            parse_bounds(element.get('bounds'))
+                        )
+                    continue
+                
+                stack.pop()
+                
+                # Drop the finished subtree so only the open path stays in memory
+                element.clear()
+                if stack:
+                    stack[-1].remove(element)
+                else:
+                    return
+        except ET.ParseError:
+            return
+
+
+def find_nodes(chunks: Union[str, bytes, Iterable[Union[str, bytes]]],
+               predicate: Optional[Callable[[UINode], bool]] = None,
+               limit: Optional[int] = None) -> List[UINode]:
+    """
+    Collect matching nodes, stopping as soon as enough are found
+    
+    Args:
+        chunks: Whole dump, or an iterable of chunks
+        predicate: Node filter (default: nodes with text)
+        limit: Stop after this many matches
+        
+    Returns:
+        Matching nodes
+    """
+    predicate = predicate or (lambda node: bool(node.text))
+    found = []
+    
+    for node in iter_nodes(chunks):
+        if predicate(node):
+            found.append(node)
+            if limit is not None and len(found) >= limit:
+                break
+    
+    return found
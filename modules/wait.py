@@ -0,0 +1,62 @@
+"""
+Wait Module
+Condition-based waiting with backoff, used instead of fixed sleeps
+"""
+
+import random
+import time
+from typing import Callable
+
+
+def wait_until(condition: Callable[[], bool], timeout: float, interval: float = 0.25,
+               max_interval: float = 2.0, backoff: float = 1.5) -> bool:
+    """
+    Poll a condition until it holds or the deadline passes
+    
+    The first check runs immediately; the delay between checks starts at
+    `interval` and grows by `backoff` up to `max_interval`.
+    
+    Args:
+        condition: Returns True when ready
+        timeout: Deadline in seconds
+        interval: First delay between checks in seconds
+        max_interval: Longest delay between checks in seconds
+        backoff: Delay multiplier after each failed check
+        
+    Returns:
+        True if the condition held before the deadline
+    """
+    deadline = time.monotonic() + timeout
+    delay = interval
+    
+    while True:
+        if condition():
+            return True
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        
+        time.sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_interval)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, jitter: float = 0.5) -> float:
+    """
+    Exponential backoff with jitter
+    
+    The delay doubles per attempt from `base` up to `cap`; the last
+    `jitter` fraction of it is random so retries of several instances
+    do not line up.
+    
+    Args:
+        attempt: Failed attempts so far (1 = first retry)
+        base: Delay after the first failure in seconds
+        cap: Longest delay in seconds
+        jitter: Randomized fraction of the delay (0 - 1)
+        
+    Returns:
+        Seconds to wait
+    """
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    return delay * (1 - jitter) + random.uniform(0, delay * jitter)